@@ -0,0 +1,4 @@
+"""
+离线基准测试
+使用本地桩服务与固定页面样本复现爬取、解析、AI 提取与保存的性能，不访问外网、不消耗 API
+"""
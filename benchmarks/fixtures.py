@@ -0,0 +1,260 @@
+"""
+基准测试页面样本
+优先使用 benchmarks/fixtures/ 中录制的真实页面（python -m benchmarks.fixtures --record），
+没有录制样本时根据 data/raw 中的提取结果生成结构相同的列表页与文章页
+"""
+import argparse
+import json
+import os
+import re
+from datetime import datetime, timedelta
+from html import escape
+from typing import Dict, List, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import TARGET_SITES, REQUEST_CONFIG, OUTPUT_CONFIG
+
+
+# 录制样本目录
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 样本中的站点地址（桩服务返回页面时替换为本地地址）
+SITE_URL = TARGET_SITES["gwvps"]["base_url"]
+
+# 每个列表页的文章数（与站点一致）
+ARTICLES_PER_PAGE = 10
+
+_ARTICLE_ID_PATTERN = re.compile(r"/(\d+)\.html$")
+
+
+def _boilerplate(kind: str, count: int) -> str:
+    """生成页头导航、侧边栏、页脚等模板内容（真实页面中占大部分字节）"""
+    links = "".join(
+        f'<li><a href="{SITE_URL}/{kind}/{i}">{kind} 推荐 VPS 测评 {i}</a></li>' for i in range(count)
+    )
+    return f'<aside class="widget widget-{kind}"><h3>{kind}</h3><ul>{links}</ul></aside>'
+
+
+def _page(title: str, body: str, meta: str = "") -> str:
+    """套用站点页面框架"""
+    return (
+        '<!DOCTYPE html><html lang="zh-CN"><head><meta charset="UTF-8">'
+        f"<title>{escape(title)} - 狗汪 VPS 测评网</title>{meta}"
+        '<link rel="stylesheet" href="/wp-content/themes/theme/style.css"></head><body>'
+        '<header class="site-header"><nav><ul>'
+        + "".join(f'<li><a href="{SITE_URL}/category/{c}">{c}</a></li>' for c in ("美国VPS", "香港VPS", "日本VPS", "优惠", "测评"))
+        + "</ul></nav></header>"
+        f'<main class="site-main">{body}</main>'
+        f'<div class="sidebar">{_boilerplate("hot", 30)}{_boilerplate("tag", 40)}</div>'
+        '<footer class="site-footer"><p>Copyright © 狗汪 VPS 测评网 版权所有</p></footer>'
+        "</body></html>"
+    )
+
+
+def _value(field: Optional[Dict], default: str = "-") -> str:
+    """格式化 {value, unit} 字段"""
+    if not isinstance(field, dict) or field.get("value") is None:
+        return default
+    return f"{field.get('value')}{field.get('unit') or ''}"
+
+
+def _render_article(article_id: str, result: Dict, date: str) -> str:
+    """根据提取结果生成文章页：简介 + 套餐表 + 特点"""
+    title = result.get("article_title") or f"VPS 测评 {article_id}"
+    sections = [f'<h1 class="article-title">{escape(title)}</h1>', f'<time datetime="{date}">{date}</time>']
+    sections.append(f"<p>{escape(result.get('article_summary') or '')}</p>")
+
+    for product in result.get("products", []):
+        sections.append(f"<h2>{escape(str(product.get('vendor')))} {escape(str(product.get('product_name')))}</h2>")
+        sections.append(f"<p>机房位置：{escape(str(product.get('location')))}。{escape(str(product.get('summary') or ''))}</p>")
+        rows = []
+        for plan in product.get("plans", []):
+            prices = plan.get("price")
+            if isinstance(prices, dict):
+                prices = [prices]
+            price_text = " / ".join(
+                f"{p.get('value')} {p.get('currency') or ''}/{p.get('period') or ''}"
+                for p in (prices or []) if isinstance(p, dict)
+            )
+            rows.append(
+                "<tr>"
+                f"<td>{escape(str(plan.get('name')))}</td>"
+                f"<td>{(plan.get('cpu') or {}).get('cores', '-')} 核</td>"
+                f"<td>{_value(plan.get('memory'))}</td>"
+                f"<td>{_value(plan.get('storage'))}</td>"
+                f"<td>{_value(plan.get('bandwidth'))}</td>"
+                f"<td>{_value(plan.get('traffic'))}</td>"
+                f"<td>{escape(price_text)}</td>"
+                "</tr>"
+            )
+        sections.append(
+            "<table><thead><tr><th>套餐</th><th>CPU</th><th>内存</th><th>硬盘</th>"
+            "<th>带宽</th><th>流量</th><th>价格</th></tr></thead>"
+            f"<tbody>{''.join(rows)}</tbody></table>"
+        )
+        features = "".join(f"<li>{escape(str(f))}</li>" for f in product.get("features") or [])
+        sections.append(f"<ul>{features}</ul>")
+        if product.get("purchase_url"):
+            sections.append(f'<p>购买地址：<a href="{escape(product["purchase_url"])}">{escape(product["purchase_url"])}</a></p>')
+        if product.get("coupon_code"):
+            sections.append(f"<p>优惠码：{escape(str(product['coupon_code']))}</p>")
+
+    meta = f'<meta property="article:published_time" content="{date}T08:00:00+08:00">'
+    body = f'<article class="article-content">{"".join(sections)}</article>'
+    return _page(title, body, meta)
+
+
+def _render_listing(articles: List[Dict[str, str]], page: int) -> str:
+    """生成列表页"""
+    items = "".join(
+        "<article>"
+        f'<h2><a href="{SITE_URL}/{a["id"]}.html">{escape(a["title"])}</a></h2>'
+        f'<time datetime="{a["date"]}">{a["date"]}</time>'
+        "<p>测评摘要……</p>"
+        "</article>"
+        for a in articles
+    )
+    return _page(f"第 {page} 页", items)
+
+
+def synthesize_fixtures(raw_dir: Optional[str] = None, copies: int = 1) -> Dict:
+    """
+    根据 data/raw 中的提取结果生成站点样本
+
+    文章日期从今天起每两篇递减一天，保证“最近 N 天”场景有稳定的文章数
+
+    Args:
+        raw_dir: 提取结果目录，默认使用 OUTPUT_CONFIG["raw_dir"]
+        copies: 样本复制份数（扩大样本量，文章 ID 依次偏移）
+
+    Returns:
+        {"articles": [{"id", "title", "date"}], "older": 窗口外的旧文章,
+         "pages": {文章 ID: HTML 字节}, "listings": {页码: HTML 字节},
+         "extractions": {文章 ID: 提取结果}}
+    """
+    raw_dir = raw_dir or OUTPUT_CONFIG["raw_dir"]
+    results = []
+    for name in sorted(os.listdir(raw_dir)):
+        if name.endswith(".json"):
+            with open(os.path.join(raw_dir, name), "r", encoding="utf-8") as f:
+                results.append((name[:-len(".json")], json.load(f)))
+
+    today = datetime.now()
+    articles, pages, extractions = [], {}, {}
+    index = 0
+    for copy in range(copies):
+        for base_id, result in sorted(results, key=lambda item: int(item[0]), reverse=True):
+            article_id = str(int(base_id) - copy * 10000)
+            date = (today - timedelta(days=index // 2)).strftime("%Y-%m-%d")
+            title = result.get("article_title") or f"VPS 测评 {article_id}"
+            articles.append({"id": article_id, "title": title, "date": date})
+            pages[article_id] = _render_article(article_id, result, date).encode("utf-8")
+            extractions[article_id] = result
+            index += 1
+
+    return _assemble(articles, pages, extractions)
+
+
+def _assemble(articles: List[Dict[str, str]], pages: Dict[str, bytes], extractions: Dict[str, Dict]) -> Dict:
+    """
+    按每页文章数生成列表页
+
+    末尾追加一页早于全部样本一年的旧文章（只有列表项、没有文章页），
+    与真实站点一样让列表页与 RSS 发现能遇到旧文章而停止
+    """
+    oldest = min(datetime.strptime(a["date"], "%Y-%m-%d") for a in articles)
+    older_date = (oldest - timedelta(days=365)).strftime("%Y-%m-%d")
+    lowest_id = min(int(a["id"]) for a in articles)
+    older = [
+        {"id": str(lowest_id - i - 1), "title": f"旧文章 {lowest_id - i - 1}", "date": older_date}
+        for i in range(ARTICLES_PER_PAGE)
+    ]
+
+    listings = {}
+    for start in range(0, len(articles) + len(older), ARTICLES_PER_PAGE):
+        page = start // ARTICLES_PER_PAGE + 1
+        items = (articles + older)[start:start + ARTICLES_PER_PAGE]
+        listings[page] = _render_listing(items, page).encode("utf-8")
+    return {"articles": articles, "older": older, "pages": pages, "listings": listings, "extractions": extractions}
+
+
+def load_fixtures(copies: int = 1) -> Dict:
+    """
+    加载站点样本：有录制样本时使用录制样本，否则生成样本
+
+    Args:
+        copies: 生成样本时的复制份数
+    """
+    index_path = os.path.join(FIXTURE_DIR, "index.json")
+    if not os.path.exists(index_path):
+        return synthesize_fixtures(copies=copies)
+
+    with open(index_path, "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    pages = {}
+    for article in articles:
+        with open(os.path.join(FIXTURE_DIR, f"{article['id']}.html"), "rb") as f:
+            pages[article["id"]] = f.read()
+
+    extractions = {}
+    raw_dir = OUTPUT_CONFIG["raw_dir"]
+    for article in articles:
+        path = os.path.join(raw_dir, f"{article['id']}.json")
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                extractions[article["id"]] = json.load(f)
+    return _assemble(articles, pages, extractions)
+
+
+def record_fixtures(pages: int = 2) -> int:
+    """
+    从线上站点录制列表页中的文章页面到 benchmarks/fixtures/
+
+    Args:
+        pages: 录制的列表页数
+
+    Returns:
+        录制的文章数
+    """
+    import requests
+    from src.scrapers.parsers import parse_articles_with_date
+
+    session = requests.Session()
+    session.headers.update({"User-Agent": REQUEST_CONFIG["user_agent"]})
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    articles = []
+    for page in range(1, pages + 1):
+        url = SITE_URL if page == 1 else f"{SITE_URL}/page/{page}"
+        listing = session.get(url, timeout=REQUEST_CONFIG["timeout"]).content
+        for item in parse_articles_with_date(listing, SITE_URL):
+            match = _ARTICLE_ID_PATTERN.search(item["link"])
+            if not match:
+                continue
+            article_id = match.group(1)
+            html = session.get(item["link"], timeout=REQUEST_CONFIG["timeout"]).content
+            with open(os.path.join(FIXTURE_DIR, f"{article_id}.html"), "wb") as f:
+                f.write(html)
+            articles.append({"id": article_id, "title": item["title"], "date": item["date"]})
+            print(f"   ✓ {article_id} {item['title'][:30]}")
+
+    with open(os.path.join(FIXTURE_DIR, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(articles, f, ensure_ascii=False, indent=2)
+    return len(articles)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="基准测试页面样本")
+    parser.add_argument("--record", action="store_true", help="从线上站点录制样本到 benchmarks/fixtures/")
+    parser.add_argument("--pages", type=int, default=2, help="录制的列表页数（默认: 2）")
+    args = parser.parse_args()
+
+    if args.record:
+        count = record_fixtures(args.pages)
+        print(f"✅ 已录制 {count} 篇文章到: {FIXTURE_DIR}")
+    else:
+        fixtures = load_fixtures()
+        total = sum(len(page) for page in fixtures["pages"].values())
+        print(f"📄 {len(fixtures['articles'])} 篇文章，{len(fixtures['listings'])} 个列表页，共 {total} 字节")
@@ -0,0 +1,355 @@
+"""
+离线基准测试入口
+
+场景:
+- get_recent_articles      文章发现（RSS / 列表页）
+- html_to_text             HTML 转纯文本
+- pipeline_recent_to_json  完整 Pipeline（桩服务模拟站点与智谱 AI）
+- save_throughput          提取结果 JSON 保存吞吐
+- cli_startup[--help]      命令行启动耗时（子进程，附 -X importtime 的导入耗时）
+
+用法:
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --latency 0.05 --llm-latency 0.5 --error-rate 0.05
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/20260101_120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import API_KEYS, AI_CONFIG, OUTPUT_CONFIG, SCRAPE_CONFIG
+from benchmarks.fixtures import load_fixtures
+from benchmarks.stub_server import StubServer
+from src.scrapers import GWVPSScraper
+from src.utils import html_to_text, save_to_json, flush_writes, get_file_writer, setup_logging, flush_logs
+
+
+# 结果目录
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# 默认回归阈值：吞吐下降超过 10% 视为回归
+DEFAULT_THRESHOLD = 0.10
+
+
+@contextmanager
+def isolated_environment(server: StubServer) -> Iterator[str]:
+    """
+    将输出目录、API 地址与 Key 临时指向临时目录与桩服务，退出时恢复
+
+    Yields:
+        临时目录路径
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="vps_bench_")
+    saved_output = dict(OUTPUT_CONFIG)
+    saved_keys = dict(API_KEYS)
+    saved_zhipu = AI_CONFIG["zhipu"].get("base_url")
+    saved_local = AI_CONFIG.get("local", {}).get("base_url")
+    saved_tavily = AI_CONFIG.get("tavily", {}).get("base_url")
+    try:
+        for key, value in saved_output.items():
+            OUTPUT_CONFIG[key] = os.path.join(tmp_dir, value)
+        API_KEYS.update({"zhipu": "stub.key", "tavily": "tvly-stub"})
+        AI_CONFIG["zhipu"]["base_url"] = f"{server.url}/zhipu"
+        AI_CONFIG.setdefault("local", {})["base_url"] = f"{server.url}/local/v1"
+        AI_CONFIG.setdefault("tavily", {})["base_url"] = f"{server.url}/tavily"
+        yield tmp_dir
+    finally:
+        OUTPUT_CONFIG.update(saved_output)
+        API_KEYS.clear()
+        API_KEYS.update(saved_keys)
+        AI_CONFIG["zhipu"]["base_url"] = saved_zhipu
+        AI_CONFIG["local"]["base_url"] = saved_local
+        AI_CONFIG["tavily"]["base_url"] = saved_tavily
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _measure(func: Callable[[], int], repeat: int, warmup: bool = True) -> Dict[str, float]:
+    """
+    重复执行场景，取中位数
+
+    Args:
+        func: 场景函数，返回处理的条目数
+        repeat: 重复次数
+        warmup: 是否先执行一次不计时的预热（建立连接、加载模块）
+
+    Returns:
+        {"seconds": 中位耗时, "items": 条目数, "items_per_sec": 吞吐, "runs": [各次耗时]}
+    """
+    if warmup:
+        func()
+    runs, items = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        items = func()
+        runs.append(time.perf_counter() - start)
+    seconds = statistics.median(runs)
+    return {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_sec": round(items / seconds, 2) if seconds > 0 else 0.0,
+        "runs": [round(r, 4) for r in runs],
+    }
+
+
+def bench_get_recent_articles(fixtures: Dict, server: StubServer, repeat: int, discovery: str) -> Dict:
+    """文章发现：覆盖全部样本文章的时间窗口"""
+    oldest = min(datetime.strptime(a["date"], "%Y-%m-%d") for a in fixtures["articles"])
+    days = (datetime.now() - oldest).days + 1
+    saved = SCRAPE_CONFIG.get("discovery")
+
+    def run() -> int:
+        scraper = GWVPSScraper(parse_workers=0)
+        scraper.base_url = server.url
+        try:
+            return len(scraper.get_recent_articles(days=days))
+        finally:
+            scraper.close()
+
+    SCRAPE_CONFIG["discovery"] = discovery
+    try:
+        return _measure(run, repeat)
+    finally:
+        SCRAPE_CONFIG["discovery"] = saved
+
+
+def bench_html_to_text(fixtures: Dict, repeat: int) -> Dict:
+    """HTML 转纯文本：全部文章页，附带 MB/s"""
+    pages = list(fixtures["pages"].values())
+    total_bytes = sum(len(page) for page in pages)
+
+    def run() -> int:
+        for page in pages:
+            html_to_text(page)
+        return len(pages)
+
+    result = _measure(run, repeat)
+    result["mb_per_sec"] = round(total_bytes / result["seconds"] / 1_000_000, 2) if result["seconds"] > 0 else 0.0
+    return result
+
+
+def bench_pipeline(fixtures: Dict, server: StubServer, repeat: int, ai_threads: int, parse_workers: int) -> Dict:
+    """完整 Pipeline：每次使用新的临时输出目录，提取缓存不会跨次命中"""
+    oldest = min(datetime.strptime(a["date"], "%Y-%m-%d") for a in fixtures["articles"])
+    days = (datetime.now() - oldest).days + 1
+
+    def run() -> int:
+        with isolated_environment(server):
+            scraper = GWVPSScraper(parse_workers=parse_workers)
+            scraper.base_url = server.url
+            results = scraper.pipeline_recent_to_json(days=days, ai_threads=ai_threads)
+            return len(results)
+
+    # 单次 Pipeline 耗时以秒计，无需预热
+    return _measure(run, repeat, warmup=False)
+
+
+def bench_save_throughput(fixtures: Dict, server: StubServer, repeat: int, flush_interval: float = 0.005) -> Dict:
+    """
+    提取结果保存吞吐：全部样本结果写入临时目录并等待落盘
+
+    写入器攒批最多等待 flush_interval 秒，样本数不足一批时耗时以该等待为下限，
+    因此测量期间临时缩短共享写入器的攒批间隔，结果中附带所用间隔
+    """
+    results = list(fixtures["extractions"].items())
+    writer = get_file_writer()
+    saved_interval = writer.flush_interval
+
+    def run() -> int:
+        with isolated_environment(server):
+            for article_id, result in results:
+                save_to_json(result, article_id, OUTPUT_CONFIG["raw_dir"])
+            flush_writes()
+            return len(results)
+
+    writer.flush_interval = flush_interval
+    try:
+        result = _measure(run, repeat)
+    finally:
+        writer.flush_interval = saved_interval
+    result["flush_interval"] = flush_interval
+    return result
+
+
+def bench_cli_startup(repeat: int, top: int = 10) -> Dict:
+    """命令行启动：子进程执行 main.py --help，附导入总耗时与累计耗时最多的模块（-X importtime）"""
+    main_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    command = [sys.executable, "-X", "importtime", main_path, "--help"]
+    samples: List[tuple] = []
+
+    def run() -> int:
+        stderr = subprocess.run(command, capture_output=True, text=True, check=True).stderr
+        # 每行格式：import time: 自身耗时 | 累计耗时 | 模块名（微秒，模块名前的缩进表示层级）
+        total, modules = 0, {}
+        for line in stderr.splitlines():
+            fields = line[len("import time:"):].split("|")
+            if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            cumulative, name = int(fields[1]), fields[2].strip()
+            modules[name] = max(modules.get(name, 0), cumulative)
+            if not fields[2].startswith("  "):
+                total += cumulative
+        samples.append((total, modules))
+        return 1
+
+    result = _measure(run, repeat)
+    # 取导入总耗时为中位数的那一次（不含预热）
+    total, modules = sorted(samples[-repeat:], key=lambda sample: sample[0])[repeat // 2]
+    result["import_ms"] = round(total / 1000, 2)
+    result["top_imports_ms"] = {
+        name: round(cumulative / 1000, 2)
+        for name, cumulative in sorted(modules.items(), key=lambda item: -item[1])[:top]
+    }
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    """当前 git 提交（用于标记结果）"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(args: argparse.Namespace) -> Dict:
+    """执行全部场景，返回结果字典"""
+    fixtures = load_fixtures(copies=args.copies)
+    scenarios = {}
+
+    with StubServer(
+        fixtures,
+        latency=args.latency,
+        llm_latency=args.llm_latency,
+        error_rate=args.error_rate,
+        seed=args.seed
+    ) as server:
+        print(f"📄 样本: {len(fixtures['articles'])} 篇文章，桩服务: {server.url}")
+
+        print("⏱️  get_recent_articles ...")
+        scenarios["get_recent_articles[auto]"] = bench_get_recent_articles(fixtures, server, args.repeat, "auto")
+        scenarios["get_recent_articles[listing]"] = bench_get_recent_articles(fixtures, server, args.repeat, "listing")
+
+        print("⏱️  html_to_text ...")
+        scenarios["html_to_text"] = bench_html_to_text(fixtures, args.repeat)
+
+        print("⏱️  pipeline_recent_to_json ...")
+        scenarios["pipeline_recent_to_json"] = bench_pipeline(
+            fixtures, server, args.repeat, args.ai_threads, args.parse_workers
+        )
+
+        print("⏱️  save_throughput ...")
+        scenarios["save_throughput"] = bench_save_throughput(fixtures, server, args.repeat)
+
+        requests_served = dict(server.counts)
+
+    print("⏱️  cli_startup ...")
+    scenarios["cli_startup[--help]"] = bench_cli_startup(args.repeat)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "articles": len(fixtures["articles"]),
+            "repeat": args.repeat,
+            "latency": args.latency,
+            "llm_latency": args.llm_latency,
+            "error_rate": args.error_rate,
+            "seed": args.seed,
+            "ai_threads": args.ai_threads,
+            "parse_workers": args.parse_workers,
+        },
+        "requests_served": requests_served,
+        "scenarios": scenarios,
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    与基线结果对比吞吐
+
+    Args:
+        current: 本次结果
+        baseline: 基线结果
+        threshold: 回归阈值（吞吐下降比例）
+
+    Returns:
+        出现回归的场景名列表
+    """
+    regressions = []
+    print(f"\n📊 对比基线: {baseline.get('created_at')} ({baseline.get('git_commit') or '-'})")
+    print(f"   {'场景':<32} {'基线 /s':>12} {'本次 /s':>12} {'变化':>9}")
+    for name, result in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base or not base.get("items_per_sec"):
+            print(f"   {name:<32} {'-':>12} {result['items_per_sec']:>12.2f} {'新增':>9}")
+            continue
+        change = result["items_per_sec"] / base["items_per_sec"] - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = " ❌"
+        print(f"   {name:<32} {base['items_per_sec']:>12.2f} {result['items_per_sec']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="离线基准测试（本地桩服务，不访问外网）")
+    parser.add_argument("--repeat", type=int, default=3, help="每个场景的重复次数，取中位数（默认: 3）")
+    parser.add_argument("--copies", type=int, default=1, help="生成样本的复制份数（默认: 1）")
+    parser.add_argument("--latency", type=float, default=0.0, help="站点响应延迟（秒，默认: 0）")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="智谱 AI 响应延迟（秒，默认: 0.2）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="站点页面 503 概率（默认: 0）")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子（默认: 0）")
+    parser.add_argument("--ai-threads", type=int, default=2, help="Pipeline AI 线程数（默认: 2）")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Pipeline 解析进程数（默认: 0，当前线程解析）")
+    parser.add_argument("--compare", metavar="BASELINE", help="与指定的基线结果文件对比")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="回归阈值（默认: 0.10）")
+    parser.add_argument("--no-save", action="store_true", help="不保存结果文件")
+    args = parser.parse_args()
+
+    # 场景内部日志只保留警告和错误
+    setup_logging("WARNING")
+
+    result = run_benchmarks(args)
+    flush_logs()
+
+    print(f"\n{'场景':<32} {'中位耗时':>10} {'条目':>6} {'吞吐 /s':>12}")
+    for name, scenario in result["scenarios"].items():
+        print(f"{name:<32} {scenario['seconds']:>9.3f}s {scenario['items']:>6} {scenario['items_per_sec']:>12.2f}")
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 结果已保存: {path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_results(result, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ 吞吐回归超过 {args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+        print("\n✅ 未发现回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
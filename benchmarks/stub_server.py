@@ -0,0 +1,322 @@
+"""
+本地桩服务
+在一个端口上同时模拟 gwvps 站点（列表页、文章页、RSS）、智谱 AI 与 Tavily 接口，
+可配置网络延迟、LLM 延迟与错误率，随机数使用固定种子保证结果可复现；
+LLM 接口模拟服务端前缀缓存：与之前请求相同的前导消息计入 cached_tokens；
+站点页面带 ETag，支持 If-None-Match 条件请求（返回 304）
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from email.utils import format_datetime
+from datetime import datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlsplit, parse_qs
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import SITE_URL
+from src.scrapers.parsers import page_to_text
+from src.ai_clients.zhipu_client import NARRATIVE_PRODUCT_FIELDS, NARRATIVE_ARTICLE_FIELDS
+
+
+# RSS 每页条目数（与 WordPress 默认一致）
+FEED_PAGE_SIZE = 10
+
+# 分层提取的系统提示词中用于区分请求层级的文字（见 zhipu_client.build_system_prompt）
+_FAST_MARKER = "本次只提取套餐与价格等结构化字段"
+_NARRATIVE_MARKER = "请为列表中的每个产品补充叙述字段"
+
+
+def count_tokens(text: str) -> int:
+    """粗略估计 token 数：ASCII 约 3.5 字符 / token，中文约 1.5 字符 / token"""
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return int(ascii_chars / 3.5 + (len(text) - ascii_chars) / 1.5)
+
+
+class StubServer:
+    """
+    本地桩服务
+
+    路由：
+    - GET  /、/page/N、/<id>.html、/feed/?paged=N   站点页面
+    - POST /zhipu/chat/completions                   智谱 AI（OpenAI 兼容格式）
+    - POST /local/v1/chat/completions、GET /local/v1/models   本地推理服务（同一套提取结果）
+    - POST /tavily/extract                           Tavily 页面提取
+
+    用法:
+        with StubServer(fixtures, latency=0.05) as server:
+            scraper.base_url = server.url
+    """
+
+    def __init__(
+        self,
+        fixtures: Dict,
+        latency: float = 0.0,
+        llm_latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        初始化桩服务
+
+        Args:
+            fixtures: load_fixtures() 返回的页面样本
+            latency: 站点页面与 Tavily 的响应延迟（秒）
+            llm_latency: 智谱 AI 的响应延迟（秒）
+            error_rate: 站点页面返回 503 的概率
+            seed: 随机数种子
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.llm_latency = llm_latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {}
+        self._seen_prefixes: Set[str] = set()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """桩服务地址（同时作为站点 base_url）"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """在后台线程启动服务（随机端口）"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server._handle_get(self)
+
+            def do_POST(self):
+                server._handle_post(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _count(self, route: str) -> None:
+        with self._lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _send(
+        self,
+        handler: BaseHTTPRequestHandler,
+        status: int,
+        body: bytes,
+        content_type: str,
+        etag: Optional[str] = None
+    ) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        if etag:
+            handler.send_header("ETag", etag)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _localize(self, body: bytes) -> bytes:
+        """将页面中的站点地址替换为桩服务地址"""
+        return body.replace(SITE_URL.encode(), self.url.encode())
+
+    def _handle_get(self, handler: BaseHTTPRequestHandler) -> None:
+        parts = urlsplit(handler.path)
+        path = parts.path.rstrip("/") or "/"
+
+        if path == "/" or path.startswith("/page/"):
+            route, page = "listing", 1 if path == "/" else int(path.rsplit("/", 1)[-1])
+            body = self.fixtures["listings"].get(page)
+            content_type = "text/html; charset=utf-8"
+        elif path == "/feed":
+            route, page = "feed", int(parse_qs(parts.query).get("paged", ["1"])[0])
+            body = self._render_feed(page)
+            content_type = "application/rss+xml; charset=utf-8"
+        elif path.endswith(".html"):
+            route = "article"
+            body = self.fixtures["pages"].get(path[1:-len(".html")])
+            content_type = "text/html; charset=utf-8"
+        elif path.endswith("/models"):
+            route = "models"
+            body = json.dumps({"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]}).encode()
+            content_type = "application/json"
+        else:
+            route, body, content_type = "other", None, "text/plain"
+
+        self._count(route)
+        if self.latency:
+            time.sleep(self.latency)
+        if self._should_fail():
+            self._count("errors")
+            self._send(handler, 503, b"Service Unavailable", "text/plain")
+        elif body is None:
+            self._send(handler, 404, b"Not Found", "text/plain")
+        else:
+            body = self._localize(body)
+            etag = '"%s"' % hashlib.md5(body).hexdigest()[:16]
+            if handler.headers.get("If-None-Match") == etag:
+                self._count("not_modified")
+                self._send(handler, 304, b"", content_type, etag)
+            else:
+                self._send(handler, 200, body, content_type, etag)
+
+    def _render_feed(self, page: int) -> Optional[bytes]:
+        """按文章日期生成 RSS 分页（WordPress 超出末页时返回 404）"""
+        start = (page - 1) * FEED_PAGE_SIZE
+        articles = (self.fixtures["articles"] + self.fixtures.get("older", []))[start:start + FEED_PAGE_SIZE]
+        if page > 1 and not articles:
+            return None
+        items = "".join(
+            "<item>"
+            f"<title>{escape(a['title'])}</title>"
+            f"<link>{SITE_URL}/{a['id']}.html</link>"
+            f"<pubDate>{format_datetime(datetime.strptime(a['date'], '%Y-%m-%d'))}</pubDate>"
+            "</item>"
+            for a in articles
+        )
+        return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'.encode("utf-8")
+
+    def _handle_post(self, handler: BaseHTTPRequestHandler) -> None:
+        length = int(handler.headers.get("Content-Length") or 0)
+        payload = json.loads(handler.rfile.read(length) or b"{}")
+        path = urlsplit(handler.path).path
+
+        if path.endswith("/chat/completions"):
+            self._count("llm")
+            if self.llm_latency:
+                time.sleep(self.llm_latency)
+            body = self._chat_completion(payload)
+        elif path.endswith("/extract"):
+            self._count("tavily")
+            if self.latency:
+                time.sleep(self.latency)
+            body = self._tavily_extract(payload)
+        else:
+            self._send(handler, 404, b"Not Found", "text/plain")
+            return
+        self._send(handler, 200, json.dumps(body, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _match_extraction(self, text: str) -> Dict:
+        """
+        按文章标题找到对应的提取结果（找不到时返回空结果）；
+        补充提取请求中列出的已提取产品（"商家 / 产品名"）不再返回；
+        分层提取的快速请求不返回叙述字段，叙述字段补充请求只返回叙述字段
+        """
+        for article in self.fixtures["articles"]:
+            if article["title"] in text and article["id"] in self.fixtures["extractions"]:
+                result = self.fixtures["extractions"][article["id"]]
+                if _NARRATIVE_MARKER in text:
+                    return {
+                        "products": [
+                            {key: product.get(key) for key in ("vendor", "product_name", *NARRATIVE_PRODUCT_FIELDS)}
+                            for product in result.get("products", [])
+                        ],
+                        **{key: result.get(key) for key in NARRATIVE_ARTICLE_FIELDS},
+                    }
+                products = result.get("products", [])
+                if "已提取的产品" in text:
+                    extracted = text.split("已提取的产品", 1)[1]
+                    products = [
+                        product for product in products
+                        if f"- {product.get('vendor')} / {product.get('product_name')}" not in extracted
+                    ]
+                    result = {"products": products}
+                if _FAST_MARKER in text:
+                    result = {key: value for key, value in result.items() if key not in NARRATIVE_ARTICLE_FIELDS}
+                    result["products"] = [
+                        {key: value for key, value in product.items() if key not in NARRATIVE_PRODUCT_FIELDS}
+                        for product in products
+                    ]
+                return result
+        return {"products": []}
+
+    def _cached_tokens(self, messages: List[Dict]) -> int:
+        """
+        模拟前缀缓存：按消息粒度匹配之前请求过的前缀，返回命中的 token 数，
+        并登记本次请求的所有前缀（与服务端缓存一样，只有逐字节相同的前缀才会命中）
+        """
+        cached, prefix, hit = 0, "", True
+        with self._lock:
+            for message in messages:
+                prefix += json.dumps(message, ensure_ascii=False, sort_keys=True)
+                if hit and prefix in self._seen_prefixes:
+                    cached += count_tokens(str(message.get("content", "")))
+                else:
+                    hit = False
+                    self._seen_prefixes.add(prefix)
+        return cached
+
+    def _chat_completion(self, payload: Dict) -> Dict:
+        """
+        返回 OpenAI 兼容格式的补全结果，token 数按 count_tokens 估算；
+        输出超过请求的 max_tokens 时按比例截断并返回 finish_reason=length
+        """
+        messages = payload.get("messages", [])
+        prompt = "".join(str(m.get("content", "")) for m in messages)
+        content = json.dumps(self._match_extraction(prompt), ensure_ascii=False, indent=2)
+        prompt_tokens, completion_tokens = count_tokens(prompt), count_tokens(content)
+        cached_tokens = self._cached_tokens(messages)
+        finish_reason = "stop"
+        max_tokens = payload.get("max_tokens")
+        if max_tokens and completion_tokens > max_tokens:
+            content = content[:len(content) * max_tokens // completion_tokens]
+            completion_tokens, finish_reason = max_tokens, "length"
+        return {
+            "id": "stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": finish_reason,
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _tavily_extract(self, payload: Dict) -> Dict:
+        """返回 Tavily 格式的提取结果"""
+        results = []
+        for url in payload.get("urls", []):
+            page = self.fixtures["pages"].get(url.rsplit("/", 1)[-1].replace(".html", ""))
+            if page is not None:
+                results.append({"url": url, "raw_content": page_to_text(page)})
+        return {"results": results, "failed_results": []}
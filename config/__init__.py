@@ -10,6 +10,7 @@ from .settings import (
     SCRAPE_CONFIG,
     AI_CONFIG,
     OUTPUT_CONFIG,
+    API_CONFIG,
 )
 
 __all__ = [
@@ -19,4 +20,5 @@ __all__ = [
     "SCRAPE_CONFIG",
     "AI_CONFIG",
     "OUTPUT_CONFIG",
+    "API_CONFIG",
 ]
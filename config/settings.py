@@ -23,6 +23,8 @@ API_KEYS = {
     "nvidia": os.getenv("NVIDIA_API_KEY", ""),
     # Tavily API Key
     "tavily": os.getenv("TAVILY_API_KEY", ""),
+    # 本地推理服务的 Key（llama.cpp / vLLM 默认不校验，可留空）
+    "local": os.getenv("LOCAL_LLM_API_KEY", ""),
 }
 
 # ============================================================
@@ -59,6 +61,15 @@ REQUEST_CONFIG: Dict[str, Any] = {
 SCRAPE_CONFIG: Dict[str, Any] = {
     "default_pages": 1,  # 默认爬取页数
     "max_filename_length": 50,  # 文件名最大长度
+    "parse_workers": None,  # HTML 解析进程数（None=CPU 核数，0=不使用进程池）
+    "discovery": "auto",  # 文章发现方式（auto=RSS→sitemap→列表页，listing=只爬列表页）
+    "backfill_rate": 4.0,  # 全站回填请求速率（次/秒）
+    # 常驻监听（--watch）：最短 / 最长轮询间隔（秒），无变化时间隔按 watch_backoff 倍数放大
+    "watch_interval": 120,
+    "watch_max_interval": 1800,
+    "watch_backoff": 1.5,
+    "watch_max_attempts": 3,  # 新文章处理失败的最多尝试次数
+    "stream_history_batch": 100,  # 流式模式（--stream）下价格历史每批写入的结果数
 }
 
 # ============================================================
@@ -67,15 +78,60 @@ SCRAPE_CONFIG: Dict[str, Any] = {
 
 AI_CONFIG: Dict[str, Dict[str, Any]] = {
     "zhipu": {
+        "base_url": os.getenv("ZHIPU_BASE_URL") or None,  # None 使用 SDK 默认地址（基准测试指向本地桩服务）
         "default_model": "glm-4.7",
-        "max_tokens": 65536,
+        "fallback_model": "glm-4.5-air",  # 接近预算上限时切换的低价模型（None 表示只限速）
+        "max_tokens": 65536,  # 单次调用 max_tokens 上限（截断重试时最多扩大到该值）
         "temperature": 0.7,
+        # 输出预算：max_tokens = (base + per_row × 套餐行数) × margin，不低于 min；
+        # 叙述字段补充按产品数估计：(base + per_product × 产品数) × margin
+        "output_budget": {"base": 400, "per_row": 220, "per_product": 300, "margin": 1.3, "min": 1024},
+        # 提取方式：full 一次提取全部字段；two_tier 先快速提取套餐与价格并保存，
+        # 叙述字段（特点、适用场景、总结）由低优先级的第二遍补充
+        "extraction_mode": "full",
+        # 提示词中的 Schema 渲染方式：compact（同形骨架，无空白）或 pretty（完整 JSON Schema）
+        "schema_format": "compact",
+        # 价格表：元 / 百万 token（以官网价格为准，未列出的模型按 0 计；cached_input 为命中前缀缓存的输入单价）
+        "prices": {
+            "glm-4.7": {"input": 4.0, "cached_input": 0.8, "output": 16.0},
+            "glm-4.5-air": {"input": 0.8, "cached_input": 0.16, "output": 2.0},
+            "glm-4-flash": {"input": 0.0, "output": 0.0},
+        },
     },
     "nvidia": {
         "base_url": "https://integrate.api.nvidia.com/v1",
         "default_model": "deepseek-ai/deepseek-r1",
         "max_tokens": 65536,
         "temperature": 1,
+        "prices": {
+            "deepseek-ai/deepseek-r1": {"input": 0.0, "output": 0.0},
+        },
+    },
+    # 本地推理服务（llama.cpp server / vLLM 等 OpenAI 兼容接口），不按 token 计费
+    "local": {
+        "base_url": os.getenv("LOCAL_LLM_BASE_URL", "http://127.0.0.1:8080/v1"),
+        "default_model": os.getenv("LOCAL_LLM_MODEL", "qwen2.5-7b-instruct"),
+        "max_tokens": 8192,  # 受本地模型上下文长度限制
+        "temperature": 0.1,
+        "timeout": 600,  # 单次请求超时（秒），本地模型生成较慢
+        # 同时在途的请求数，与服务端并行槽位一致（llama.cpp --parallel / vLLM --max-num-seqs），
+        # 服务端连续批处理，排队的请求按预估 token 数从小到大发送
+        "max_inflight": int(os.getenv("LOCAL_LLM_MAX_INFLIGHT", "4")),
+        "prices": {},
+    },
+    "tavily": {
+        "base_url": os.getenv("TAVILY_BASE_URL") or None,  # None 使用 SDK 默认地址
+    },
+    # 结构化提取使用的服务：zhipu（智谱 AI）或 local（本地推理服务），--provider 覆盖
+    "extraction": {
+        "provider": os.getenv("EXTRACTION_PROVIDER", "zhipu"),
+    },
+    # 单次运行预算（--max-tokens / --max-cost 覆盖）
+    "budget": {
+        "max_tokens": None,  # token 上限（输入 + 输出，None 表示不限制）
+        "max_cost": None,  # 费用上限（元，None 表示不限制）
+        "soft_limit": 0.8,  # 达到该比例后切换 fallback_model 或限速
+        "throttle_seconds": 5.0,  # 无低价模型可切换时，每次调用前等待的秒数
     },
 }
 
@@ -87,5 +143,27 @@ OUTPUT_CONFIG: Dict[str, str] = {
     "base_dir": "data",
     "articles_dir": "data/articles",  # Markdown 文章输出
     "raw_dir": "data/raw",  # 原始 JSON 数据输出
-    "html_dir": "data/html",  # 原始 HTML 页面输出
+    "html_dir": "data/html",  # 原始 HTML 页面输出（zstd 压缩）
+    "html_dict": "data/html.zdict",  # HTML 页面共享压缩字典
+    "history_db": "data/history.db",  # 套餐价格历史（SQLite）
+    "archive_dir": "data/old",  # 内容寻址归档（objects + manifests）
+    "extract_cache_db": "data/extract_cache.db",  # AI 提取结果缓存（SQLite）
+    "backfill_checkpoint": "data/backfill.json",  # 全站回填断点
+    "runs_dir": "data/runs",  # Pipeline 运行日志（JSONL）
+    "metrics_dir": "data/metrics",  # 运行指标报告（JSON）
+    "traces_dir": "data/traces",  # 链路追踪导出（Chrome Trace JSON）
+    "search_db": "data/search.db",  # 文章全文检索索引（SQLite FTS5）
+    "search_export": "data/search_index.json",  # 看板使用的检索索引导出
+}
+
+# ============================================================
+# 查询接口配置（--serve）
+# ============================================================
+
+API_CONFIG: Dict[str, Any] = {
+    "host": "127.0.0.1",  # 监听地址（默认仅本机）
+    "port": 8787,  # 监听端口
+    "page_size": 50,  # 默认每页套餐数
+    "max_page_size": 500,  # 每页套餐数上限
+    "reload_interval": 5,  # 检查 data/raw 是否有新结果的最短间隔（秒）
 }
@@ -4,14 +4,16 @@ VPS 测评文章爬虫 - CLI 入口
 支持多站点爬取，输出 JSON 或 Markdown 格式
 """
 import argparse
+import atexit
 import sys
 import os
+from datetime import datetime
 
 # 确保项目根目录在 Python 路径中
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.scrapers import GWVPSScraper
-from config import SCRAPE_CONFIG
+from src.utils import setup_logging, flush_logs
+from config import SCRAPE_CONFIG, API_CONFIG
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -39,6 +41,49 @@ def create_parser() -> argparse.ArgumentParser:
   # Pipeline: 爬取最近文章并用 AI 总结为 JSON
   python main.py --pipeline 3
   
+  # 常驻监听：轮询首页，新文章几分钟内进入数据（代替 cron 定时运行 pipeline.py）
+  python main.py --watch --interval 120 --ai-threads 2
+  
+  # 继续被中断的 Pipeline 运行（运行 ID 见 data/runs/）
+  python main.py --resume 20260106_020000
+  
+  # 分层提取：套餐与价格先保存，叙述字段在后台补充；预算不足未补充的之后再补
+  python main.py --pipeline 3 --two-tier --max-cost 5
+  python main.py --enrich
+  
+  # 用本地模型（llama.cpp / vLLM 的 OpenAI 兼容接口）批量重处理，不按 token 计费
+  python main.py --reprocess --provider local --ai-threads 8
+  
+  # 修改提示词后，用已存储的 HTML 离线重新提取
+  python main.py --reprocess --ai-threads 4
+  
+  # 全站回填历史页面（可随时 Ctrl-C，重新运行继续），再离线提取
+  python main.py --backfill -t 8 --rate 4
+  python main.py --reprocess
+  
+  # 查询某商家的套餐价格历史
+  python main.py --history WePC --since 2025-01-01
+  
+  # 高并发 Pipeline，只输出警告，JSON 日志写入文件
+  python main.py --pipeline 3 -t 8 --ai-threads 8 -q --log-format json 2> run.log.jsonl
+  
+  # 记录链路追踪，用 Perfetto 查看每篇文章的耗时分布
+  python main.py --pipeline 3 --trace
+  
+  # 全文检索文章正文与特点、适用场景等字段（首次使用先从已有结果建索引）
+  python main.py --rebuild-search
+  python main.py --search "洛杉矶 CN2"
+  
+  # 导出检索索引供看板在本地检索
+  python main.py --export-search
+  
+  # 本地查询接口：只返回匹配的套餐（支持 ETag 条件请求）
+  python main.py --serve --port 8787
+  curl "http://127.0.0.1:8787/api/plans?region=Japan&min_ram=2&max_price=300&page=1"
+  
+  # 对比两次归档运行
+  python main.py --diff-runs 20260101_020000 20260106_020000
+  
   # 使用 uv 运行
   uv run python main.py -p 2
 """
@@ -86,7 +131,7 @@ def create_parser() -> argparse.ArgumentParser:
         "-t", "--threads",
         type=int,
         default=4,
-        help="爬取线程数（用于 --recent 和 --pipeline 模式，默认: 4）"
+        help="爬取线程数（用于 --recent、--pipeline 和 --backfill 模式，默认: 4）"
     )
     
     parser.add_argument(
@@ -97,18 +142,250 @@ def create_parser() -> argparse.ArgumentParser:
         help="Pipeline 模式：爬取最近 N 天文章并用 AI 总结为 JSON"
     )
     
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="按运行日志继续中断的 Pipeline 运行（跳过已完成的文章）"
+    )
+    
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="常驻监听：条件 GET 轮询首页，只处理新文章并增量更新 data/raw、价格历史与 js/config.js（Ctrl-C 停止）"
+    )
+    
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help=f"--watch 的最短轮询间隔，无变化时自动放大（默认: {SCRAPE_CONFIG.get('watch_interval', 120)} 秒）"
+    )
+    
     parser.add_argument(
         "--ai-threads",
         type=int,
         default=2,
-        help="AI 处理线程数（仅用于 --pipeline 模式，默认: 2）"
+        help="AI 处理线程数（用于 --pipeline、--watch 和 --reprocess 模式，默认: 2）"
+    )
+    
+    parser.add_argument(
+        "--reprocess",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        metavar="RUN_ID",
+        help="离线重处理：用已存储的 HTML 重新提取 JSON（可指定归档运行 ID），不发起页面请求"
+    )
+    
+    parser.add_argument(
+        "--provider",
+        type=str,
+        default=None,
+        choices=["zhipu", "local"],
+        help="结构化提取服务：zhipu（智谱 AI）或 local（本地 OpenAI 兼容推理服务，如 llama.cpp / vLLM）"
+             "（默认: AI_CONFIG[\"extraction\"][\"provider\"]）"
+    )
+    
+    parser.add_argument(
+        "--two-tier",
+        action="store_true",
+        help="分层提取（用于 --pipeline 和 --watch）：先提取套餐与价格并保存，特点、适用场景与总结在后台补充"
+    )
+    
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="流式处理（用于 --pipeline、--reprocess 和常规爬取）：结果逐篇保存后即释放，"
+             "限制在途文章数，内存占用与文章数量无关，适合数千篇规模的运行"
+    )
+    
+    parser.add_argument(
+        "--enrich",
+        action="store_true",
+        help="为 data/raw 中尚未补充叙述字段的结果补充特点、适用场景与总结（读取已存储页面）"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="HTML 解析进程数（0 表示不使用进程池，默认: CPU 核数）"
+    )
+    
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="全站回填：按文章 ID 区间抓取全部历史页面（断点续跑，中断后重新运行即可继续）"
+    )
+    
+    parser.add_argument(
+        "--id-range",
+        type=int,
+        nargs=2,
+        default=None,
+        metavar=("START", "END"),
+        help="回填的文章 ID 区间（默认: 1 ~ 最新文章 ID）"
+    )
+    
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help=f"回填请求速率，次/秒（默认: {SCRAPE_CONFIG.get('backfill_rate', 4.0)}，0 表示不限速）"
+    )
+    
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        default=None,
+        help="本次运行的 token 上限（接近上限时切换低价模型或限速，达到后停止 AI 提取）"
+    )
+    
+    parser.add_argument(
+        "--max-cost",
+        type=float,
+        default=None,
+        help="本次运行的费用上限（元，按 AI_CONFIG 价格表计算）"
+    )
+    
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="运行期间在 127.0.0.1:PORT/metrics 提供 Prometheus 指标"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="记录链路追踪，退出时导出到 data/traces/（可用 Perfetto / chrome://tracing 打开）"
+    )
+    
+    parser.add_argument(
+        "-q", "--quiet",
+        action="store_true",
+        help="只输出警告和错误日志（高并发运行时减少控制台输出）"
+    )
+    
+    parser.add_argument(
+        "--log-format",
+        type=str,
+        default="text",
+        choices=["text", "json"],
+        help="日志格式：text 输出到 stdout；json 每行一条 JSON 输出到 stderr，便于机器解析（默认: text）"
+    )
+    
+    parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        metavar="VENDOR",
+        help="查询指定商家的套餐价格历史（从索引读取，不访问网络）"
+    )
+    
+    parser.add_argument(
+        "--since",
+        type=str,
+        default=None,
+        metavar="YYYY-MM-DD",
+        help="价格历史起始日期（仅用于 --history）"
+    )
+    
+    parser.add_argument(
+        "--until",
+        type=str,
+        default=None,
+        metavar="YYYY-MM-DD",
+        help="价格历史截止日期（仅用于 --history）"
+    )
+    
+    parser.add_argument(
+        "--rebuild-history",
+        action="store_true",
+        help="从 data/raw 导入已有结果到价格历史索引"
+    )
+    
+    parser.add_argument(
+        "--search",
+        type=str,
+        default=None,
+        metavar="QUERY",
+        help="全文检索文章标题、正文与提取字段（中文按子串匹配，多个词之间为 AND）"
+    )
+    
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="检索返回条数（用于 --search，默认: 10）"
+    )
+    
+    parser.add_argument(
+        "--rebuild-search",
+        action="store_true",
+        help="从 data/raw 与已存储页面导入全文检索索引（内容未变化的文章跳过）"
+    )
+    
+    parser.add_argument(
+        "--export-search",
+        type=str,
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="导出检索索引 JSON 供看板使用（默认: data/search_index.json）"
+    )
+    
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="启动只读查询接口：/api/plans（商家 / 地区 / 价格 / 内存 / CPU / 带宽筛选与分页）、"
+             "/api/vendors、/api/regions、/api/stats"
+    )
+    
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help=f"查询接口端口（用于 --serve，默认: {API_CONFIG['port']}）"
+    )
+    
+    parser.add_argument(
+        "--archive-runs",
+        action="store_true",
+        help="列出 data/old 中的所有归档运行"
+    )
+    
+    parser.add_argument(
+        "--restore",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="将指定归档运行恢复到 data/restore/<RUN_ID>/"
+    )
+    
+    parser.add_argument(
+        "--diff-runs",
+        type=str,
+        nargs=2,
+        default=None,
+        metavar=("OLD_RUN", "NEW_RUN"),
+        help="对比两次归档运行的文件差异"
     )
     
     return parser
 
 
-def get_scraper(site: str):
+def get_scraper(site: str, parse_workers=None, provider=None):
     """根据站点名称获取对应的爬虫实例"""
+    # 爬虫依赖 requests 等较重的库，需要时才导入（--help、--search、--serve 等不加载）
+    from src.scrapers import GWVPSScraper
+    
     scrapers = {
         "gwvps": GWVPSScraper,
     }
@@ -119,7 +396,164 @@ def get_scraper(site: str):
         print(f"   支持的站点: {', '.join(scrapers.keys())}")
         sys.exit(1)
     
-    return scraper_class()
+    return scraper_class(parse_workers=parse_workers, provider=provider)
+
+
+def print_price_history(vendor: str, since=None, until=None) -> None:
+    """从价格历史索引中查询并打印商家的套餐价格走势"""
+    import time
+    from src.storage import PriceHistory
+    
+    start = time.perf_counter()
+    with PriceHistory() as history:
+        points = history.query(vendor=vendor, since=since, until=until)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if not points:
+        print(f"😕 没有找到商家 {vendor} 的价格历史")
+        return
+    
+    current = None
+    for point in points:
+        if point["fingerprint"] != current:
+            current = point["fingerprint"]
+            print(f"\n📦 {point['vendor']} - {point['product_name'] or '未知产品'} | "
+                  f"{point['plan_name'] or '未命名套餐'} [{current}]")
+        price = point["price"] if point["price"] is not None else "-"
+        print(f"   [{point['publish_date'] or '未知日期'}] {price} {point['currency'] or ''}"
+              f"/{point['period'] or '-'}  🔗 {point['source_url']}")
+    
+    print()
+    print(f"✅ 共 {len(points)} 个价格点，查询耗时 {elapsed_ms:.1f} ms")
+
+
+def run_archive_command(args) -> None:
+    """执行归档相关命令（列出 / 恢复 / 对比）"""
+    from src.storage import ContentArchive
+    from config import OUTPUT_CONFIG
+    
+    archive = ContentArchive()
+    
+    if args.archive_runs:
+        runs = archive.list_runs()
+        print(f"📦 共 {len(runs)} 次归档运行")
+        for run_id in runs:
+            manifest = archive.load_manifest(run_id)
+            print(f"   {run_id}  {len(manifest['files'])} 个文件，"
+                  f"新增 {manifest.get('new_objects', 0)} 个对象")
+    
+    if args.restore:
+        dest_dir = os.path.join(OUTPUT_CONFIG["base_dir"], "restore", args.restore)
+        count = archive.restore_run(args.restore, dest_dir)
+        print(f"✅ 已恢复 {count} 个文件到: {dest_dir}")
+    
+    if args.diff_runs:
+        old_run, new_run = args.diff_runs
+        diff = archive.diff_runs(old_run, new_run)
+        for label, key in (("➕ 新增", "added"), ("➖ 删除", "removed"), ("✏️ 变更", "changed")):
+            print(f"{label}: {len(diff[key])} 个文件")
+            for path in diff[key]:
+                print(f"   {path}")
+
+
+def print_search_results(query: str, limit: int = 10) -> None:
+    """在全文检索索引中查询并打印按相关度排序的文章"""
+    import time
+    from src.storage import SearchIndex
+    
+    start = time.perf_counter()
+    with SearchIndex() as index:
+        results = index.search(query, limit=limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    if not results:
+        print(f"😕 没有找到与「{query}」相关的文章")
+        return
+    
+    for i, result in enumerate(results, 1):
+        print(f"\n{i}. [{result['publish_date'] or '未知日期'}] {result['title'] or result['doc_id']}"
+              f"  (相关度 {result['score']:.2f})")
+        if result["vendors"]:
+            print(f"   🏷️  {result['vendors']}")
+        if result["summary"]:
+            print(f"   📝 {result['summary'][:80]}")
+        print(f"   🔗 {result['source_url']}")
+    
+    print()
+    print(f"✅ 共 {len(results)} 条结果，查询耗时 {elapsed_ms:.1f} ms")
+
+
+def run_search_command(args) -> None:
+    """执行全文检索相关命令（重建 / 查询 / 导出）"""
+    from src.storage import SearchIndex
+    from config import OUTPUT_CONFIG
+    
+    if args.rebuild_search:
+        # 页面存储（zstandard）与页面解析（BeautifulSoup）只在重建时需要
+        from src.storage import PageStore
+        from src.scrapers.parsers import page_to_text
+        
+        page_store = PageStore()
+        
+        def load_text(doc_id: str):
+            html = page_store.get(doc_id)
+            return page_to_text(html) if html is not None else None
+        
+        with SearchIndex() as index:
+            added = index.import_raw_dir(text_loader=load_text)
+            print(f"🔎 已从 data/raw 导入 {added} 篇文章（索引共 {len(index)} 篇）")
+    
+    if args.search is not None:
+        print(f"模式: 全文检索")
+        print(f"查询: {args.search}")
+        print("=" * 50)
+        print_search_results(args.search, args.limit)
+    
+    if args.export_search is not None:
+        with SearchIndex() as index:
+            path = args.export_search or None
+            count = index.export(path)
+        print(f"✅ 已导出 {count} 篇文章的检索索引: {path or OUTPUT_CONFIG['search_export']}")
+
+
+def serve_plan_api(port=None) -> None:
+    """加载 data/raw 到内存索引并启动查询接口，Ctrl-C 停止"""
+    import time
+    from src.storage import PlanIndex
+    
+    index = PlanIndex()
+    count = index.load()
+    server = index.serve(port=port)
+    host, bound_port = server.server_address[:2]
+    print(f"📇 已索引 {count} 个套餐，数据版本 {index.version}")
+    print(f"🌐 查询接口: http://{host}:{bound_port}/api/plans")
+    print("   参数: vendor, region, max_price, min_ram, min_cpu, min_bandwidth, sort, page, page_size")
+    flush_logs()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print("⏹️  查询接口已停止")
+
+
+def enable_trace_export() -> None:
+    """启用链路追踪，并在进程退出时导出到 data/traces/<时间戳>.json"""
+    from src.utils import get_tracer
+    from config import OUTPUT_CONFIG
+    
+    tracer = get_tracer()
+    tracer.enable()
+    trace_path = os.path.join(
+        OUTPUT_CONFIG["traces_dir"], f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    
+    def export() -> None:
+        flush_logs()
+        count = tracer.export(trace_path)
+        print(f"🧭 已导出 {count} 个 span: {trace_path}")
+    
+    atexit.register(export)
 
 
 def main():
@@ -127,27 +561,163 @@ def main():
     parser = create_parser()
     args = parser.parse_args()
     
+    # 日志：后台线程输出，--quiet 只保留警告和错误
+    setup_logging(
+        level="WARNING" if args.quiet else "INFO",
+        log_format=args.log_format,
+        stream=sys.stderr if args.log_format == "json" else sys.stdout
+    )
+    
     print("=" * 50)
     print("🕷️  VPS 测评文章爬虫")
     print("=" * 50)
     print(f"站点: {args.site}")
     
+    # 价格历史模式：只读本地索引，不创建爬虫
+    if args.rebuild_history or args.history is not None:
+        from src.storage import PriceHistory
+        
+        if args.rebuild_history:
+            with PriceHistory() as history:
+                added = history.import_raw_dir()
+            print(f"📈 已从 data/raw 导入 {added} 个价格点")
+        
+        if args.history is not None:
+            print(f"模式: 价格历史查询")
+            print(f"商家: {args.history}")
+            print("=" * 50)
+            print_price_history(args.history, args.since, args.until)
+        return
+    
+    # 全文检索模式：只读本地索引，不创建爬虫
+    if args.rebuild_search or args.search is not None or args.export_search is not None:
+        run_search_command(args)
+        return
+    
+    # 查询接口模式：只读 data/raw，不创建爬虫
+    if args.serve:
+        print(f"模式: 查询接口")
+        print("=" * 50)
+        serve_plan_api(args.port)
+        return
+    
+    # 归档模式：只读清单，不创建爬虫
+    if args.archive_runs or args.restore or args.diff_runs:
+        run_archive_command(args)
+        return
+    
+    # 链路追踪：退出时导出 Chrome Trace 文件
+    if args.trace:
+        enable_trace_export()
+    
+    # 运行预算：未指定的一项沿用 AI_CONFIG["budget"]
+    if args.max_tokens is not None or args.max_cost is not None:
+        from src.ai_clients import get_usage_tracker
+        tracker = get_usage_tracker()
+        tracker.set_budget(
+            max_tokens=args.max_tokens if args.max_tokens is not None else tracker.max_tokens,
+            max_cost=args.max_cost if args.max_cost is not None else tracker.max_cost
+        )
+        print(f"💰 预算: token {tracker.max_tokens or '不限'}，费用 {tracker.max_cost or '不限'} 元")
+    
+    # Prometheus 指标端点（后台线程，随进程退出）
+    if args.metrics_port:
+        from src.utils import get_metrics
+        get_metrics().serve(args.metrics_port)
+        print(f"📊 指标端点: http://127.0.0.1:{args.metrics_port}/metrics")
+    
     # 获取爬虫实例
-    scraper = get_scraper(args.site)
+    scraper = get_scraper(args.site, parse_workers=args.workers, provider=args.provider)
     
-    # Pipeline 模式：爬取 + AI 总结
-    if args.pipeline is not None:
+    # 本地推理服务：启动前确认服务可用
+    if scraper.provider == "local":
+        from src.ai_clients import get_local_client
+        local_client = get_local_client()
+        if not local_client.is_available():
+            print(f"❌ 本地推理服务不可用: {local_client.base_url}")
+            print("   请先启动 llama.cpp server / vLLM，或设置 LOCAL_LLM_BASE_URL")
+            sys.exit(1)
+        print(f"提取服务: 本地 {local_client.base_url}（{local_client.default_model}，"
+              f"在途上限 {local_client.scheduler.max_inflight}）")
+    
+    # Pipeline 模式：爬取 + AI 总结（--resume 时天数取自运行日志）
+    if args.pipeline is not None or args.resume:
         print(f"模式: Pipeline（爬取 + AI 总结）")
-        print(f"天数: {args.pipeline}")
+        if args.resume:
+            print(f"续跑: {args.resume}")
+        else:
+            print(f"天数: {args.pipeline}")
         print(f"爬取线程: {args.threads}")
         print(f"AI 线程: {args.ai_threads}")
+        if args.stream:
+            print("流式处理: 是")
         print("=" * 50)
         print()
         
         results = scraper.pipeline_recent_to_json(
-            days=args.pipeline,
+            days=args.pipeline or 5,
             scrape_threads=args.threads,
-            ai_threads=args.ai_threads
+            ai_threads=args.ai_threads,
+            resume=args.resume,
+            two_tier=True if args.two_tier else None,
+            stream=args.stream
+        )
+        return
+    
+    # 常驻监听模式：每轮有新结果时更新 js/config.js 的文件列表
+    if args.watch:
+        from pipeline import update_js_config
+        
+        print(f"模式: 常驻监听")
+        print(f"最短间隔: {args.interval or SCRAPE_CONFIG.get('watch_interval', 120)} 秒")
+        print(f"AI 线程: {args.ai_threads}")
+        print("=" * 50)
+        print()
+        
+        results = scraper.watch(
+            interval=args.interval,
+            ai_threads=args.ai_threads,
+            two_tier=True if args.two_tier else None,
+            on_update=lambda _results: update_js_config()
+        )
+        return
+    
+    # 叙述字段补充模式：只读已存储页面
+    if args.enrich:
+        print(f"模式: 补充叙述字段")
+        print("=" * 50)
+        print()
+        
+        results = scraper.enrich_saved_results(ai_threads=args.ai_threads)
+        return
+    
+    # 全站回填模式：只抓取并保存页面
+    if args.backfill:
+        start_id, end_id = args.id_range if args.id_range else (1, None)
+        print(f"模式: 全站回填")
+        print(f"ID 区间: {start_id} ~ {end_id or '最新'}")
+        print("=" * 50)
+        print()
+        
+        scraper.backfill(
+            start_id=start_id,
+            end_id=end_id,
+            threads=args.threads,
+            rate=args.rate
+        )
+        return
+    
+    # 离线重处理模式：只读已存储页面
+    if args.reprocess is not None:
+        print(f"模式: 离线重处理")
+        print(f"数据来源: {args.reprocess or 'data/html'}")
+        print("=" * 50)
+        print()
+        
+        results = scraper.reprocess_stored_pages(
+            run_id=args.reprocess or None,
+            ai_threads=args.ai_threads,
+            stream=args.stream
         )
         return
     
@@ -178,16 +748,24 @@ def main():
     print("=" * 50)
     print()
     
-    # 运行爬虫
-    results = scraper.run(
-        max_pages=args.pages,
-        output_format=args.format,
-        single_url=args.url
-    )
+    # 运行爬虫（流式处理时逐篇保存，只统计数量）
+    if args.stream:
+        count = sum(1 for _ in scraper.iter_run(
+            max_pages=args.pages,
+            output_format=args.format,
+            single_url=args.url
+        ))
+    else:
+        count = len(scraper.run(
+            max_pages=args.pages,
+            output_format=args.format,
+            single_url=args.url
+        ))
     
+    flush_logs()
     print()
     print("=" * 50)
-    print(f"✅ 爬取完成，共处理 {len(results)} 篇文章")
+    print(f"✅ 爬取完成，共处理 {count} 篇文章")
     print("=" * 50)
 
 
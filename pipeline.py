@@ -4,16 +4,19 @@ VPS 测评文章爬虫 - Pipeline 脚本
 爬取最近文章并用 AI 总结为 JSON
 
 直接运行: python pipeline.py
+继续中断的运行: python pipeline.py --resume <运行 ID>
 """
+import argparse
 import sys
 import os
-import shutil
-from datetime import datetime
 
 # 确保项目根目录在 Python 路径中
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.scrapers import GWVPSScraper
+from src.storage import ContentArchive
+from src.storage.archive import PAGE_DICT_ENTRY
+from src.utils import flush_logs
 
 # ============================================================
 # 参数配置（在此处修改）
@@ -50,54 +53,27 @@ JS_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "js",
 
 def archive_old_data():
     """
-    将旧数据移入 data/old 文件夹
-    按时间戳创建子目录，保留历史数据
+    将旧数据归档到 data/old 内容寻址归档中
+    文件按内容哈希去重压缩，每次运行生成一份清单，未变化的文件不占用额外空间；
+    data/html 是持久的页面存储（离线重处理、回填与抓取优先级都依赖它），只做快照不删除；
+    页面以共享字典压缩，字典随快照一并归档
     """
     # 需要归档的目录
     dirs_to_archive = ["raw", "html", "articles"]
     
-    # 检查是否有数据需要归档
-    has_data = False
-    for dir_name in dirs_to_archive:
-        dir_path = os.path.join(DATA_DIR, dir_name)
-        if os.path.exists(dir_path) and os.listdir(dir_path):
-            has_data = True
-            break
+    archive = ContentArchive(OLD_DATA_DIR)
+    manifest = archive.archive_dirs(
+        DATA_DIR, dirs_to_archive, keep_dirs=["html"],
+        extra_files={PAGE_DICT_ENTRY: os.path.join(DATA_DIR, PAGE_DICT_ENTRY)}
+    )
     
-    if not has_data:
+    if manifest is None:
         print("📂 没有旧数据需要归档")
         return
     
-    # 创建带时间戳的归档目录
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive_dir = os.path.join(OLD_DATA_DIR, timestamp)
-    os.makedirs(archive_dir, exist_ok=True)
-    
-    print(f"📦 正在归档旧数据到: data/old/{timestamp}/")
-    
-    moved_count = 0
-    for dir_name in dirs_to_archive:
-        src_dir = os.path.join(DATA_DIR, dir_name)
-        if not os.path.exists(src_dir):
-            continue
-        
-        files = os.listdir(src_dir)
-        if not files:
-            continue
-        
-        # 创建目标目录
-        dest_dir = os.path.join(archive_dir, dir_name)
-        os.makedirs(dest_dir, exist_ok=True)
-        
-        # 移动文件
-        for filename in files:
-            src_file = os.path.join(src_dir, filename)
-            dest_file = os.path.join(dest_dir, filename)
-            if os.path.isfile(src_file):
-                shutil.move(src_file, dest_file)
-                moved_count += 1
-    
-    print(f"✅ 已归档 {moved_count} 个文件")
+    print(f"📦 已归档旧数据，运行 ID: {manifest['run_id']}")
+    print(f"✅ 已归档 {len(manifest['files'])} 个文件，"
+          f"新增 {manifest['new_objects']} 个对象（{manifest['stored_bytes']} 字节）")
     print()
 
 
@@ -152,6 +128,16 @@ export const DATA_FILES = [
 
 def main():
     """运行 Pipeline"""
+    parser = argparse.ArgumentParser(description="VPS 测评文章爬虫 - Pipeline")
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_ID",
+        help="按 data/runs/<RUN_ID>.jsonl 继续中断的运行（不归档旧数据）"
+    )
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("🚀 VPS 测评文章爬虫 - Pipeline")
     print("=" * 60)
@@ -181,8 +167,12 @@ def main():
         print("   获取地址: https://tavily.com/")
         sys.exit(1)
     
-    # 归档旧数据
-    archive_old_data()
+    # 归档旧数据（续跑时保留上次运行已保存的数据）
+    if args.resume:
+        print(f"♻️  继续运行: {args.resume}")
+        print()
+    else:
+        archive_old_data()
     
     # 创建爬虫实例
     scraper = GWVPSScraper(use_tavily=USE_TAVILY)
@@ -192,10 +182,12 @@ def main():
         days=DAYS,
         scrape_threads=SCRAPE_THREADS,
         ai_threads=AI_THREADS,
-        max_pages=MAX_PAGES
+        max_pages=MAX_PAGES,
+        resume=args.resume
     )
     
-    # 输出结果摘要
+    # 输出结果摘要（先输出已排队的日志，保证顺序）
+    flush_logs()
     if results:
         print()
         print("📊 处理结果摘要:")
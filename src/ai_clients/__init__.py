@@ -3,12 +3,28 @@ AI 客户端模块入口
 导出所有 AI API 客户端
 """
 
-from .zhipu_client import extract_vps_info, VPS_ARTICLE_SCHEMA
+from .zhipu_client import (
+    extract_vps_info,
+    enrich_vps_info,
+    merge_narrative,
+    extraction_cache_key,
+    VPS_ARTICLE_SCHEMA,
+)
 from .nvidia_client import NvidiaClient
+from .local_client import LocalClient, RequestScheduler, get_local_client
+from .usage import UsageTracker, get_usage_tracker
 
 __all__ = [
     "extract_vps_info",
+    "enrich_vps_info",
+    "merge_narrative",
+    "extraction_cache_key",
 
     "VPS_ARTICLE_SCHEMA",
     "NvidiaClient",
+    "LocalClient",
+    "RequestScheduler",
+    "get_local_client",
+    "UsageTracker",
+    "get_usage_tracker",
 ]
@@ -0,0 +1,254 @@
+"""
+LLM 输出的 JSON 修复与 Schema 校验
+在本地修复常见的输出问题（代码块包裹、多余文字、尾逗号、输出被截断），
+并按 JSON Schema 把字段转换为期望类型，只把无法修复的产品交给模型重新提取
+"""
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# ```json ... ``` 代码块（截断时可能没有结尾的 ```）
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+
+# 数值字段中的数字（如 "1.5GB"、"$10.24"、"1,024"）
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:,\d{3})*(?:\.\d+)?")
+
+# 表示无限的取值（流量等字段约定为 -1）
+_UNLIMITED_VALUES = {"无限", "不限", "unlimited", "无限制"}
+
+# 逗号之后的空白（判断是否为尾逗号）
+_WHITESPACE_PATTERN = re.compile(r"\s*")
+
+_DECODER = json.JSONDecoder()
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """
+    删除对象与数组末尾多余的逗号（,} 或 ,]）
+
+    与截断修复相同地跳过字符串内容，字符串中的 ", }" 等文本保持不变
+    """
+    chars: List[str] = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            after = _WHITESPACE_PATTERN.match(text, i + 1).end()
+            if text[after:after + 1] in ("}", "]"):
+                continue
+        chars.append(char)
+    return "".join(chars)
+
+
+def _close_truncated(text: str) -> Optional[Any]:
+    """
+    修复被截断的 JSON：从末尾向前找到最后一个完整元素的位置，补齐未闭合的括号
+
+    候选截断点为文本末尾、容器内的每个逗号之前、每个左括号之后，
+    从后向前尝试，第一个能解析的即为保留内容最多的结果
+
+    Returns:
+        解析结果，无法修复时返回 None
+    """
+    candidates: List[Tuple[int, str]] = []
+    stack: List[str] = []
+    in_string = escaped = False
+    for i, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            candidates.append((i + 1, "".join(reversed(stack))))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+        elif char == "," and stack:
+            candidates.append((i, "".join(reversed(stack))))
+
+    if not in_string and stack:
+        candidates.append((len(text), "".join(reversed(stack))))
+
+    for end, closers in reversed(candidates):
+        try:
+            return json.loads(text[:end].rstrip().rstrip(",") + closers)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def parse_llm_json(content: str) -> Tuple[Any, List[str]]:
+    """
+    解析模型输出的 JSON，必要时在本地修复
+
+    Args:
+        content: 模型输出文本
+
+    Returns:
+        (解析结果, 应用的修复列表)，修复项为 code_fence / trailing_text / trailing_comma / truncated
+
+    Raises:
+        ValueError: 无法修复
+    """
+    fixes: List[str] = []
+    text = content.strip()
+
+    if text.startswith("```"):
+        match = _FENCE_PATTERN.search(text)
+        if match:
+            text = match.group(1).strip()
+            fixes.append("code_fence")
+
+    start = min((i for i in (text.find("{"), text.find("[")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("输出中没有 JSON 对象")
+    if start > 0:
+        fixes.append("trailing_text")
+
+    try:
+        value, end = _DECODER.raw_decode(text, start)
+        if text[end:].strip():
+            fixes.append("trailing_text")
+        return value, sorted(set(fixes))
+    except json.JSONDecodeError:
+        pass
+
+    # 尾逗号（,} 或 ,]）
+    without_commas = _strip_trailing_commas(text[start:])
+    try:
+        value, _ = _DECODER.raw_decode(without_commas)
+        return value, sorted(set(fixes + ["trailing_comma"]))
+    except json.JSONDecodeError:
+        pass
+
+    value = _close_truncated(without_commas)
+    if value is None:
+        raise ValueError("JSON 无法修复")
+    return value, sorted(set(fixes + ["truncated"]))
+
+
+def _to_number(value: Any) -> Optional[float]:
+    """将字符串转换为数值（取第一个数字，无限记为 -1），无法转换返回 None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        if value.strip().lower() in _UNLIMITED_VALUES:
+            return -1
+        match = _NUMBER_PATTERN.search(value)
+        if match:
+            number = float(match.group().replace(",", ""))
+            return int(number) if number.is_integer() else number
+    return None
+
+
+def coerce_to_schema(value: Any, schema: Dict, path: str = "$") -> Tuple[Any, List[str]]:
+    """
+    按 JSON Schema 转换字段类型，返回无法修复的路径
+
+    - number：字符串取其中的数字（"1.5GB" → 1.5，"无限" → -1），无法转换置为 null
+    - string：数值转为字符串，字符串数组用顿号连接
+    - array：单个值包装为数组，null 视为空数组
+    - object：缺少 required 字段或类型不是对象时报告该路径；
+      对象数组（如多周期价格）保留为数组并逐个转换
+
+    Args:
+        value: 待转换的值
+        schema: JSON Schema
+        path: 当前路径（用于报告）
+
+    Returns:
+        (转换后的值, 无法修复的路径列表)
+    """
+    expected = schema.get("type")
+    if value is None:
+        if expected == "array":
+            return [], []
+        return None, []
+
+    if expected == "number":
+        return _to_number(value), []
+
+    if expected == "string":
+        if isinstance(value, str):
+            return value, []
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), []
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return "、".join(value), []
+        return None, []
+
+    if expected == "array":
+        if not isinstance(value, list):
+            value = [value]
+        item_schema = schema.get("items", {})
+        items, errors = [], []
+        for i, item in enumerate(value):
+            coerced, item_errors = coerce_to_schema(item, item_schema, f"{path}[{i}]")
+            items.append(coerced)
+            errors.extend(item_errors)
+        return items, errors
+
+    if expected == "object":
+        if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            items, errors = [], []
+            for i, item in enumerate(value):
+                coerced, item_errors = coerce_to_schema(item, schema, f"{path}[{i}]")
+                items.append(coerced)
+                errors.extend(item_errors)
+            return items, errors
+        if not isinstance(value, dict):
+            return None, [path]
+        result, errors = dict(value), []
+        for key, prop_schema in schema.get("properties", {}).items():
+            if key in result:
+                result[key], prop_errors = coerce_to_schema(result[key], prop_schema, f"{path}.{key}")
+                errors.extend(prop_errors)
+        missing = [key for key in schema.get("required", []) if result.get(key) in (None, "", [])]
+        if missing:
+            errors.append(path)
+        return result, errors
+
+    return value, []
+
+
+def validate_article(result: Any, schema: Dict) -> Tuple[Dict, List[int]]:
+    """
+    校验文章提取结果，返回转换后的结果与无效产品的下标
+
+    Args:
+        result: parse_llm_json 的解析结果
+        schema: 文章 Schema（VPS_ARTICLE_SCHEMA）
+
+    Returns:
+        (转换后的结果, 无效产品下标列表)
+
+    Raises:
+        ValueError: 结果不是对象
+    """
+    if not isinstance(result, dict):
+        raise ValueError("提取结果不是 JSON 对象")
+    coerced, errors = coerce_to_schema(result, schema)
+    invalid = set()
+    for error in errors:
+        match = re.match(r"\$\.products\[(\d+)\]", error)
+        if match:
+            invalid.add(int(match.group(1)))
+    return coerced, sorted(invalid)
@@ -0,0 +1,147 @@
+"""
+本地推理服务客户端
+通过 OpenAI 兼容接口调用本机的 llama.cpp server / vLLM 等，用于结构化提取；
+服务端对并发请求做连续批处理，调度器把在途请求数限制为服务端的并行槽位数，
+排队的请求先按任务优先级（后台任务最后），再按预估 token 数从小到大发送，
+短请求不被长请求阻塞，槽位保持占满
+"""
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# 确保项目根目录在 Python 路径中
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import API_KEYS, AI_CONFIG
+from src.utils.metrics import get_metrics
+from src.utils.logger import get_logger
+from src.utils.priority_pool import current_priority
+
+
+logger = get_logger("local")
+
+
+class RequestScheduler:
+    """
+    吞吐优先的请求调度器（线程安全）
+
+    - 同时在途的请求不超过 max_inflight
+    - 槽位释放时，等待中优先级最高、预估 token 数最小的请求先发送（相同时按到达顺序）
+    """
+
+    def __init__(self, max_inflight: int):
+        self.max_inflight = max(max_inflight, 1)
+        self._inflight = 0
+        self._waiting: List[Tuple[int, int, int]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def slot(self, cost: int, priority: int = 1) -> Iterator[None]:
+        """
+        占用一个在途槽位，退出时释放
+
+        Args:
+            cost: 预估 token 数（输入 + max_tokens），同一优先级内决定排队顺序
+            priority: 优先级类别（PRIORITY_HIGH / NORMAL / LOW，数值越小越先发送）
+        """
+        ticket = (priority, cost, next(self._order))
+        start = time.perf_counter()
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while self._inflight >= self.max_inflight or self._waiting[0] != ticket:
+                self._cond.wait()
+            heapq.heappop(self._waiting)
+            self._inflight += 1
+            # 队首变化，可能还有空闲槽位
+            self._cond.notify_all()
+        get_metrics().observe("local_queue", time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._inflight -= 1
+                self._cond.notify_all()
+
+    @property
+    def inflight(self) -> int:
+        """当前在途请求数"""
+        with self._cond:
+            return self._inflight
+
+
+class LocalClient:
+    """
+    本地推理服务客户端（OpenAI 兼容接口）
+
+    客户端与调度器在进程内共享（get_local_client），保持连接复用；
+    请求参数与 chat.completions.create 一致
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_inflight: Optional[int] = None):
+        """
+        初始化客户端
+
+        Args:
+            base_url: 服务地址，默认使用 AI_CONFIG["local"]["base_url"]
+            max_inflight: 同时在途的请求数，默认使用配置中的值
+        """
+        local_config = AI_CONFIG.get("local", {})
+        self.base_url = base_url or local_config.get("base_url", "http://127.0.0.1:8080/v1")
+        self.default_model = local_config.get("default_model", "")
+        # SDK 导入较慢，创建客户端时才加载
+        from openai import OpenAI
+        self.client = OpenAI(
+            base_url=self.base_url,
+            # 本地服务通常不校验 Key，但 SDK 要求非空
+            api_key=API_KEYS.get("local") or "local",
+            timeout=local_config.get("timeout", 600),
+            max_retries=1
+        )
+        self.scheduler = RequestScheduler(max_inflight or local_config.get("max_inflight", 4))
+
+    def create(self, messages: List[Dict[str, str]], max_tokens: int, **kwargs: Any) -> Any:
+        """
+        经调度器发送一次补全请求
+
+        Args:
+            messages: 对话消息
+            max_tokens: 最大输出 token 数
+            **kwargs: 其余 chat.completions.create 参数（model 默认使用配置中的值）
+
+        Returns:
+            OpenAI 格式的补全结果
+        """
+        kwargs.setdefault("model", self.default_model)
+        # 输入按字符数粗估 token（与输出预算同量级即可，只用于排序）
+        cost = sum(len(message.get("content", "")) for message in messages) // 2 + max_tokens
+        with self.scheduler.slot(cost, current_priority()):
+            return self.client.chat.completions.create(messages=messages, max_tokens=max_tokens, **kwargs)
+
+    def is_available(self) -> bool:
+        """检查本地服务是否可用（GET /models）"""
+        try:
+            self.client.with_options(timeout=3, max_retries=0).models.list()
+            return True
+        except Exception as e:
+            logger.warning("⚠️ 本地推理服务不可用（%s）: %s", self.base_url, e)
+            return False
+
+
+_client: Optional[LocalClient] = None
+_client_lock = threading.Lock()
+
+
+def get_local_client() -> LocalClient:
+    """获取进程级共享的本地推理客户端（首次调用时按当前配置创建）"""
+    global _client
+    with _client_lock:
+        if _client is None or _client.base_url != AI_CONFIG.get("local", {}).get("base_url", _client.base_url):
+            _client = LocalClient()
+        return _client
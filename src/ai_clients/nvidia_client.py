@@ -7,12 +7,13 @@ import sys
 import time
 from typing import Optional, Generator, Dict, Any
 
-from openai import OpenAI
 
 # 确保项目根目录在 Python 路径中
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config import API_KEYS, AI_CONFIG
+from src.utils.tracing import traced
+from src.ai_clients.usage import get_usage_tracker
 
 
 class NvidiaClient:
@@ -36,6 +37,8 @@ class NvidiaClient:
         self.base_url = nvidia_config.get("base_url", "https://integrate.api.nvidia.com/v1")
         self.default_model = nvidia_config.get("default_model", "deepseek-ai/deepseek-r1")
         
+        # SDK 导入较慢，创建客户端时才加载
+        from openai import OpenAI
         self.client = OpenAI(
             base_url=self.base_url,
             api_key=self.api_key
@@ -60,7 +63,7 @@ class NvidiaClient:
             show_reasoning: 是否返回思考过程
             
         Yields:
-            包含内容和类型的字典
+            包含内容和类型的字典（usage 块同时计入用量统计）
         """
         if model is None:
             model = self.default_model
@@ -77,6 +80,14 @@ class NvidiaClient:
         
         for chunk in stream:
             if chunk.usage is not None:
+                details = getattr(chunk.usage, "prompt_tokens_details", None)
+                get_usage_tracker().record(
+                    "nvidia",
+                    model,
+                    chunk.usage.prompt_tokens or 0,
+                    chunk.usage.completion_tokens or 0,
+                    cached=getattr(details, "cached_tokens", 0) or 0
+                )
                 yield {"type": "usage", "data": chunk.usage}
             
             if chunk.choices and chunk.choices[0].delta:
@@ -91,6 +102,7 @@ class NvidiaClient:
                 if delta.content:
                     yield {"type": "content", "content": delta.content}
     
+    @traced("nvidia.chat")
     def chat(
         self,
         prompt: str,
@@ -0,0 +1,291 @@
+"""
+Token 用量与费用统计
+按价格表（AI_CONFIG[provider]["prices"]，元 / 百万 token）记录每次调用、每篇文章与整个运行的用量；
+命中服务端前缀缓存的输入 token 按 cached_input 单价计费；
+预算控制器在接近 token 或费用上限时切换到更便宜的模型或限速，达到上限后拒绝新的调用
+"""
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# 确保项目根目录在 Python 路径中
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import AI_CONFIG
+from src.utils.metrics import get_metrics
+from src.utils.logger import get_logger
+
+
+logger = get_logger("usage")
+
+
+def _empty_usage() -> Dict[str, float]:
+    return {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "reserved_tokens": 0, "cost": 0.0}
+
+
+def _add_usage(total: Dict[str, float], call: Dict[str, float]) -> None:
+    for key in ("prompt_tokens", "cached_tokens", "completion_tokens", "reserved_tokens", "cost"):
+        total[key] += call[key]
+    total["calls"] += 1
+
+
+class UsageTracker:
+    """
+    进程内用量统计与预算控制（线程安全）
+
+    - article(article_id): 为当前线程设置文章编号，期间的调用计入该文章
+    - record(provider, model, prompt_tokens, completion_tokens, reserved, cached): 记录一次调用
+    - admit(provider, model): 调用前询问预算，返回实际使用的模型，预算用尽返回 None
+    - would_exceed(provider, model, prompt_tokens, max_tokens): 每次调用前检查该次调用是否可能超出上限
+    """
+
+    def __init__(self):
+        self._totals = _empty_usage()
+        self._models: Dict[str, Dict[str, float]] = {}
+        self._articles: Dict[str, Dict[str, float]] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        budget_config = AI_CONFIG.get("budget", {})
+        self.max_tokens: Optional[int] = budget_config.get("max_tokens")
+        self.max_cost: Optional[float] = budget_config.get("max_cost")
+        self._switched = False
+
+    def set_budget(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None) -> None:
+        """
+        设置本次运行的预算（None 表示不限制）
+
+        Args:
+            max_tokens: token 上限（输入 + 输出）
+            max_cost: 费用上限（元）
+        """
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+
+    def reset(self) -> None:
+        """清空统计（新运行开始时调用，预算设置保留）"""
+        with self._lock:
+            self._totals = _empty_usage()
+            self._models = {}
+            self._articles = {}
+            self._switched = False
+
+    @contextmanager
+    def article(self, article_id: str) -> Iterator[None]:
+        """当前线程内的调用计入指定文章"""
+        previous = getattr(self._local, "article_id", None)
+        self._local.article_id = article_id
+        try:
+            yield
+        finally:
+            self._local.article_id = previous
+
+    @staticmethod
+    def price_of(provider: str, model: str) -> Dict[str, float]:
+        """获取模型单价（元 / 百万 token），价格表中没有的模型按 0 计"""
+        prices = AI_CONFIG.get(provider, {}).get("prices", {})
+        return prices.get(model, {"input": 0.0, "output": 0.0})
+
+    def cost_of(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0
+    ) -> float:
+        """按价格表计算一次调用的费用（元），缓存命中的输入 token 按 cached_input 计价（未配置时按 input）"""
+        price = self.price_of(provider, model)
+        input_price = price.get("input", 0.0)
+        cached_price = price.get("cached_input", input_price)
+        return (
+            (prompt_tokens - cached_tokens) * input_price
+            + cached_tokens * cached_price
+            + completion_tokens * price.get("output", 0.0)
+        ) / 1_000_000
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        reserved: int = 0,
+        cached: int = 0
+    ) -> Dict[str, float]:
+        """
+        记录一次调用的用量
+
+        Args:
+            provider: 服务商（AI_CONFIG 中的键，如 zhipu、nvidia）
+            model: 模型名称
+            prompt_tokens: 输入 token 数
+            completion_tokens: 输出 token 数
+            reserved: 本次调用申请的 max_tokens（用于对比预留与实际输出）
+            cached: 输入中命中服务端前缀缓存的 token 数（包含在 prompt_tokens 内）
+
+        Returns:
+            本次调用的用量 {"calls", "prompt_tokens", "cached_tokens", "completion_tokens", "reserved_tokens", "cost"}
+        """
+        cached = min(cached, prompt_tokens)
+        call = {
+            "calls": 1,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached,
+            "completion_tokens": completion_tokens,
+            "reserved_tokens": reserved,
+            "cost": self.cost_of(provider, model, prompt_tokens, completion_tokens, cached),
+        }
+        article_id = getattr(self._local, "article_id", None)
+        with self._lock:
+            _add_usage(self._totals, call)
+            _add_usage(self._models.setdefault(f"{provider}/{model}", _empty_usage()), call)
+            if article_id is not None:
+                _add_usage(self._articles.setdefault(article_id, _empty_usage()), call)
+
+        metrics = get_metrics()
+        metrics.incr("llm_tokens_in", prompt_tokens)
+        metrics.incr("llm_tokens_cached", cached)
+        metrics.incr("llm_tokens_out", completion_tokens)
+        metrics.incr("llm_tokens_reserved", reserved)
+        metrics.incr("llm_cost", call["cost"])
+        return call
+
+    def article_usage(self, article_id: str) -> Dict[str, float]:
+        """获取某篇文章的累计用量"""
+        with self._lock:
+            return dict(self._articles.get(article_id, _empty_usage()))
+
+    def _budget_ratio(self) -> float:
+        """已用预算比例（token 与费用中较高者）"""
+        ratios = [0.0]
+        with self._lock:
+            if self.max_tokens:
+                ratios.append((self._totals["prompt_tokens"] + self._totals["completion_tokens"]) / self.max_tokens)
+            if self.max_cost:
+                ratios.append(self._totals["cost"] / self.max_cost)
+        return max(ratios)
+
+    def admit(self, provider: str, model: str, priority: str = "normal") -> Optional[str]:
+        """
+        预算控制：调用前决定使用的模型
+
+        - 未达到 soft_limit：使用原模型
+        - 达到 soft_limit：低优先级调用（如叙述字段补充）直接放弃；
+          其余配置了 fallback_model 时切换，否则每次调用前等待 throttle_seconds
+        - 达到上限：返回 None，调用方应跳过本次调用
+
+        Args:
+            provider: 服务商
+            model: 默认模型
+            priority: normal 或 low
+
+        Returns:
+            实际使用的模型，预算用尽返回 None
+        """
+        if not self.max_tokens and not self.max_cost:
+            return model
+
+        budget_config = AI_CONFIG.get("budget", {})
+        ratio = self._budget_ratio()
+        if ratio >= 1.0:
+            get_metrics().incr("llm_budget_rejections")
+            return None
+        if ratio < budget_config.get("soft_limit", 0.8):
+            return model
+        if priority == "low":
+            get_metrics().incr("llm_budget_deferrals")
+            return None
+
+        fallback = AI_CONFIG.get(provider, {}).get("fallback_model")
+        if fallback and fallback != model:
+            with self._lock:
+                first_switch = not self._switched
+                self._switched = True
+            if first_switch:
+                logger.warning("⚠️ 已使用 %.0f%% 预算，切换到 %s", ratio * 100, fallback)
+            get_metrics().incr("llm_budget_downgrades")
+            return fallback
+
+        get_metrics().incr("llm_budget_throttles")
+        time.sleep(budget_config.get("throttle_seconds", 5.0))
+        return model
+
+    def would_exceed(self, provider: str, model: str, prompt_tokens: int, max_tokens: int) -> bool:
+        """
+        按最坏情况（输出用满 max_tokens）判断一次调用是否会超出预算
+
+        admit 只在每篇文章开始时决定模型，截断重试与补充提取的每次调用前都需再检查一次
+
+        Args:
+            provider: 服务商
+            model: 本次调用的模型
+            prompt_tokens: 预估的输入 token 数
+            max_tokens: 本次调用申请的 max_tokens
+
+        Returns:
+            可能超出 token 或费用上限时返回 True（未设置预算时始终为 False）
+        """
+        if not self.max_tokens and not self.max_cost:
+            return False
+        with self._lock:
+            used_tokens = self._totals["prompt_tokens"] + self._totals["completion_tokens"]
+            used_cost = self._totals["cost"]
+        if self.max_tokens and used_tokens + prompt_tokens + max_tokens > self.max_tokens:
+            return True
+        if self.max_cost and used_cost + self.cost_of(provider, model, prompt_tokens, max_tokens) > self.max_cost:
+            return True
+        return False
+
+    def report(self) -> Dict[str, Any]:
+        """生成用量报告：总计、按模型、按文章"""
+        with self._lock:
+            return {
+                "totals": {**self._totals, "cost": round(self._totals["cost"], 6)},
+                "budget": {"max_tokens": self.max_tokens, "max_cost": self.max_cost},
+                "models": {name: {**usage, "cost": round(usage["cost"], 6)} for name, usage in sorted(self._models.items())},
+                "articles": {name: {**usage, "cost": round(usage["cost"], 6)} for name, usage in sorted(self._articles.items())},
+            }
+
+    def summary_lines(self) -> List[str]:
+        """按模型输出用量摘要（用于控制台）"""
+        report = self.report()
+        lines = []
+        for name, usage in report["models"].items():
+            lines.append(
+                f"{name:<28} {usage['calls']:>5} 次  输入 {usage['prompt_tokens']:>9}  "
+                f"输出 {usage['completion_tokens']:>8}  ¥{usage['cost']:.4f}"
+            )
+        totals = report["totals"]
+        budget = []
+        if self.max_tokens:
+            budget.append(f"token 上限 {self.max_tokens}")
+        if self.max_cost:
+            budget.append(f"费用上限 ¥{self.max_cost}")
+        lines.append(
+            f"{'合计':<26} {totals['calls']:>5} 次  输入 {totals['prompt_tokens']:>9}  "
+            f"输出 {totals['completion_tokens']:>8}  ¥{totals['cost']:.4f}"
+            + (f"（{'，'.join(budget)}）" if budget else "")
+        )
+        if totals["prompt_tokens"]:
+            lines.append(
+                f"输入命中前缀缓存 {totals['cached_tokens']} / {totals['prompt_tokens']} tokens"
+                f"（命中率 {totals['cached_tokens'] / totals['prompt_tokens']:.0%}）"
+            )
+        if totals["reserved_tokens"] and totals["calls"]:
+            lines.append(
+                f"平均每次调用预留 {totals['reserved_tokens'] / totals['calls']:.0f} / "
+                f"实际输出 {totals['completion_tokens'] / totals['calls']:.0f} tokens"
+                f"（利用率 {totals['completion_tokens'] / totals['reserved_tokens']:.0%}）"
+            )
+        return lines
+
+
+_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """获取进程级共享的用量统计"""
+    return _tracker
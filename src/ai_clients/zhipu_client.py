@@ -1,18 +1,29 @@
 """
 智谱 AI 大模型 API 客户端
-用于调用智谱 AI 进行结构化数据提取
+用于调用智谱 AI 进行结构化数据提取；
+provider="local" 时同一套提示词与校验改走本地推理服务（local_client）
 """
+import hashlib
 import json
 import os
+import re
 import sys
-from typing import Optional
-
-from zai import ZhipuAiClient
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 # 确保项目根目录在 Python 路径中
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config import API_KEYS, AI_CONFIG
+from src.utils.metrics import get_metrics
+from src.utils.tracing import traced
+from src.utils.logger import get_logger
+from src.ai_clients.usage import get_usage_tracker
+from src.ai_clients.local_client import get_local_client
+from src.ai_clients.json_repair import parse_llm_json, validate_article
+
+
+logger = get_logger("zhipu")
 
 
 # 单个 VPS 产品的 Schema 定义
@@ -114,39 +125,153 @@ VPS_ARTICLE_SCHEMA = {
 }
 
 
-def extract_vps_info(text_content: str, model: Optional[str] = None) -> Optional[dict]:
+# 叙述字段：生成 token 最多的文本字段，分层提取时由第二遍（enrich_vps_info）补充
+NARRATIVE_PRODUCT_FIELDS = ("features", "suitable_for", "summary")
+NARRATIVE_ARTICLE_FIELDS = ("article_summary",)
+
+
+def _drop_properties(schema: Dict, fields: Tuple[str, ...]) -> Dict:
+    """复制 Schema 并去掉指定字段"""
+    return {**schema, "properties": {key: prop for key, prop in schema["properties"].items() if key not in fields}}
+
+
+# 快速提取的 Schema：只含套餐、价格等结构化字段（看板筛选所需），不含叙述字段
+VPS_FAST_SCHEMA = _drop_properties(VPS_ARTICLE_SCHEMA, NARRATIVE_ARTICLE_FIELDS)
+VPS_FAST_SCHEMA["properties"]["products"] = {
+    **VPS_ARTICLE_SCHEMA["properties"]["products"],
+    "items": _drop_properties(VPS_PRODUCT_SCHEMA, NARRATIVE_PRODUCT_FIELDS)
+}
+
+# 叙述字段补充的 Schema：按商家 + 产品名对应快速提取的产品
+VPS_NARRATIVE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "products": {
+            "type": "array",
+            "description": "已提取产品的叙述字段（按给出的产品列表逐个填写）",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "vendor": VPS_PRODUCT_SCHEMA["properties"]["vendor"],
+                    "product_name": VPS_PRODUCT_SCHEMA["properties"]["product_name"],
+                    **{field: VPS_PRODUCT_SCHEMA["properties"][field] for field in NARRATIVE_PRODUCT_FIELDS}
+                },
+                "required": ["vendor", "product_name"]
+            }
+        },
+        **{field: VPS_ARTICLE_SCHEMA["properties"][field] for field in NARRATIVE_ARTICLE_FIELDS}
+    },
+    "required": ["products"]
+}
+
+# 提取层级：full 一次提取全部字段；fast / narrative 为分层提取的两遍
+TIER_SCHEMAS = {
+    "full": VPS_ARTICLE_SCHEMA,
+    "fast": VPS_FAST_SCHEMA,
+    "narrative": VPS_NARRATIVE_SCHEMA,
+}
+
+
+# 单次提取送入模型的最大文本长度
+MAX_INPUT_CHARS = 50000
+
+# 补充提取的最多轮数（补充输出也可能被截断）
+MAX_COMPLETION_ROUNDS = 3
+
+# 预估输入 token 时每个 token 对应的字符数（中文约 1.5~2 字符，取偏小值使预估偏大）
+CHARS_PER_TOKEN = 1.5
+
+# 价格行：含货币符号 / 货币单位或计费周期的行
+# （纯文本中表格每个单元格各占一行，每个套餐的价格列恰好一行，可据此估计套餐数）
+_PRICE_LINE_PATTERN = re.compile(
+    r"(\$|¥|￥|€|USD|CNY|RMB|EUR)\s*\d|\d\s*(USD|CNY|RMB|EUR|元|美元|欧元)|/\s*(月|年|季|month|mo|year|yr)\b",
+    re.IGNORECASE
+)
+
+
+def _schema_skeleton(schema: Dict) -> Any:
+    """将 JSON Schema 转换为与输出同形的骨架，叶子字段为“类型|说明”"""
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {key: _schema_skeleton(prop) for key, prop in schema.get("properties", {}).items()}
+    if schema_type == "array":
+        items = dict(schema.get("items", {}))
+        if "description" not in items and schema.get("description") and items.get("type") not in ("object", "array"):
+            items["description"] = schema["description"]
+        return [_schema_skeleton(items)]
+    description = schema.get("description")
+    return f"{schema_type}|{description}" if description else schema_type
+
+
+def _required_fields(schema: Dict) -> List[str]:
+    """按出现顺序收集 Schema 中的必填字段名"""
+    fields = list(schema.get("required", []))
+    for prop in schema.get("properties", {}).values():
+        fields.extend(field for field in _required_fields(prop) if field not in fields)
+    if schema.get("type") == "array":
+        fields.extend(field for field in _required_fields(schema.get("items", {})) if field not in fields)
+    return fields
+
+
+def render_schema(schema: Dict, schema_format: str = "compact") -> str:
     """
-    使用智谱 AI 从文本内容中提取 VPS 结构化信息
-    
+    渲染提示词中的 Schema
+
     Args:
-        text_content: 已处理的纯文本内容（不是 HTML）
-        model: 使用的模型名称，默认使用配置中的值
-        
-    Returns:
-        提取的结构化数据字典，失败返回 None
+        schema: JSON Schema
+        schema_format: compact（与输出同形的骨架，无空白，token 最少）或 pretty（完整 JSON Schema，缩进）
     """
-    # 获取 API Key
-    api_key = API_KEYS.get("zhipu", "")
-    if not api_key:
-        print("❌ 未配置智谱 AI API Key，请设置环境变量 ZHIPU_API_KEY")
-        return None
+    if schema_format == "pretty":
+        return json.dumps(schema, indent=2, ensure_ascii=False)
+    return json.dumps(_schema_skeleton(schema), ensure_ascii=False, separators=(",", ":"))
+
+
+def build_system_prompt(schema_format: Optional[str] = None, tier: str = "full") -> str:
+    """
+    构建结构化提取的系统提示词（包含 Schema）
+
+    Args:
+        schema_format: Schema 渲染方式，默认使用 AI_CONFIG["zhipu"]["schema_format"]
+        tier: 提取层级（full / fast / narrative，见 TIER_SCHEMAS）
+    """
+    if schema_format is None:
+        schema_format = AI_CONFIG.get("zhipu", {}).get("schema_format", "compact")
+    schema = TIER_SCHEMAS[tier]
     
-    # 获取模型配置
-    zhipu_config = AI_CONFIG.get("zhipu", {})
-    if model is None:
-        model = zhipu_config.get("default_model", "glm-4.7")
+    if schema_format == "pretty":
+        schema_intro = "请严格按照以下 JSON Schema 格式返回结果："
+    else:
+        schema_intro = (
+            "请严格按照以下 JSON 结构返回结果（值为“类型|说明”，数组给出单个元素的结构），"
+            f"必填字段：{'、'.join(_required_fields(schema))}："
+        )
     
-    client = ZhipuAiClient(api_key=api_key)
+    if tier == "narrative":
+        return f"""你是一名专业的 VPS 测评数据分析师。用户会提供一篇 VPS 测评文章和其中已提取的产品列表。
+
+**重要说明**：
+- 请为列表中的每个产品补充叙述字段（产品特点、适用场景、产品总结），并给出文章总结
+- vendor 与 product_name 必须与列表中的写法完全一致，不要新增或遗漏产品
+
+{schema_intro}
+{render_schema(schema, schema_format)}
+
+注意事项：
+1. 只返回 JSON 对象，不要包含任何其他文字
+2. 如果某个字段在文章中找不到，设为 null 或空数组"""
     
-    system_prompt = f"""你是一名专业的 VPS 测评数据分析师。请从用户提供的文章内容中提取 VPS 产品信息。
+    scope = ""
+    if tier == "fast":
+        scope = "\n- 本次只提取套餐与价格等结构化字段，产品特点、适用场景与总结由后续请求补充"
+    return f"""你是一名专业的 VPS 测评数据分析师。请从用户提供的文章内容中提取 VPS 产品信息。
 
 **重要说明**：
 - 一篇测评文章可能包含【多个】VPS 供应商或产品，请**完整提取所有 VPS 产品信息**，不要遗漏任何一个
 - 每个不同的供应商或不同的产品线应作为 products 数组中的独立元素
-- 请确保提取的信息完整准确，包括所有套餐配置和价格
+- 请确保提取的信息完整准确，包括所有套餐配置和价格{scope}
 
-请严格按照以下 JSON Schema 格式返回结果：
-{json.dumps(VPS_ARTICLE_SCHEMA, indent=2, ensure_ascii=False)}
+{schema_intro}
+{render_schema(schema, schema_format)}
 
 注意事项：
 1. 只返回 JSON 对象，不要包含任何其他文字
@@ -155,34 +280,478 @@ def extract_vps_info(text_content: str, model: Optional[str] = None) -> Optional
 4. 套餐信息要完整提取（CPU、内存、硬盘、带宽、流量、价格等）
 5. 如果文章涉及多个供应商，每个供应商单独作为一个 product 对象"""
 
+
+# 系统提示词在导入时按层级各构建一次，每次调用发送完全相同的字节，
+# 服务端的前缀缓存（context caching）才能命中；缓存键也使用同一份提示词
+SYSTEM_PROMPTS = {tier: build_system_prompt(tier=tier) for tier in TIER_SCHEMAS}
+SYSTEM_PROMPT = SYSTEM_PROMPTS["full"]
+
+
+def estimate_output_tokens(text_content: str) -> int:
+    """
+    按文章中的套餐行数估计输出 token 数，作为本次调用的 max_tokens
+
+    输出 JSON 约为固定部分 + 每个套餐一段（按 data/raw 中的结果校准），
+    乘以余量后限制在 [min, AI_CONFIG["zhipu"]["max_tokens"]] 之间
+
+    Args:
+        text_content: 文章纯文本
+
+    Returns:
+        预估的 max_tokens
+    """
+    zhipu_config = AI_CONFIG.get("zhipu", {})
+    budget = zhipu_config.get("output_budget", {})
+    rows = sum(1 for line in text_content[:MAX_INPUT_CHARS].splitlines() if _PRICE_LINE_PATTERN.search(line))
+    estimate = (budget.get("base", 400) + budget.get("per_row", 220) * max(rows, 1)) * budget.get("margin", 1.3)
+    return int(min(max(estimate, budget.get("min", 1024)), zhipu_config.get("max_tokens", 65536)))
+
+
+def estimate_narrative_tokens(products: List[Dict]) -> int:
+    """按产品数估计叙述字段补充的 max_tokens（base + per_product × 产品数，同样乘以余量并限制范围）"""
+    zhipu_config = AI_CONFIG.get("zhipu", {})
+    budget = zhipu_config.get("output_budget", {})
+    estimate = (budget.get("base", 400) + budget.get("per_product", 300) * max(len(products), 1)) * budget.get("margin", 1.3)
+    return int(min(max(estimate, budget.get("min", 1024)), zhipu_config.get("max_tokens", 65536)))
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, str]]) -> int:
+    """按字符数粗略估计输入 token 数（用于调用前的预算检查）"""
+    return int(sum(len(message.get("content", "")) for message in messages) / CHARS_PER_TOKEN)
+
+
+def _within_budget(provider: str, model: str, messages: List[Dict[str, str]], max_tokens: int) -> bool:
+    """每次调用模型前检查预算：按预估输入与 max_tokens 计可能超出上限时拒绝本次调用"""
+    if get_usage_tracker().would_exceed(provider, model, estimate_prompt_tokens(messages), max_tokens):
+        get_metrics().incr("llm_budget_rejections")
+        return False
+    return True
+
+
+def _describe_product(product: Any, index: int) -> str:
+    """产品的简短描述（用于补充提取的提示词）"""
+    if isinstance(product, dict) and (product.get("vendor") or product.get("product_name")):
+        return f"{product.get('vendor') or '未知商家'} / {product.get('product_name') or '未知产品'}"
+    return f"第 {index + 1} 个产品"
+
+
+def _product_list(products: List[Any]) -> str:
+    """产品列表（每行 "- 商家 / 产品名"）"""
+    return "\n".join(f"- {_describe_product(product, i)}" for i, product in enumerate(products)) or "（无）"
+
+
+def extraction_provider(provider: Optional[str] = None) -> str:
+    """结构化提取使用的服务（zhipu / local），默认使用 AI_CONFIG["extraction"]["provider"]"""
+    return provider or AI_CONFIG.get("extraction", {}).get("provider", "zhipu")
+
+
+def default_model_of(provider: Optional[str] = None) -> str:
+    """结构化提取服务的默认模型"""
+    provider = extraction_provider(provider)
+    return AI_CONFIG.get(provider, {}).get("default_model", "glm-4.7")
+
+
+def extraction_cache_key(
+    text_content: str,
+    model: Optional[str] = None,
+    tier: str = "full",
+    products: Optional[List[Dict]] = None
+) -> str:
+    """
+    计算提取结果缓存键
+
+    由模型、系统提示词（含 Schema，随层级不同）和输入文本共同决定，
+    修改提示词或 Schema 后旧缓存自然失效
+
+    Args:
+        text_content: 待提取的纯文本
+        model: 模型名称，默认使用提取服务的默认模型
+        tier: 提取层级（full / fast / narrative）
+        products: narrative 层级补充的产品列表（也是输入的一部分）
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    if model is None:
+        model = default_model_of()
+    parts = [model, SYSTEM_PROMPTS[tier], text_content[:MAX_INPUT_CHARS]]
+    if products is not None:
+        parts.append(_product_list(products))
+    raw = "\0".join(parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# 智谱客户端按 (API Key, 服务地址) 在进程内复用，常驻运行（--watch）时保持连接
+_zhipu_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_zhipu_clients_lock = threading.Lock()
+
+
+def _create_client(provider: str) -> Optional[Any]:
+    """
+    获取提取所用的客户端（进程内共享）
+
+    Returns:
+        zhipu 返回 ZhipuAiClient，local 返回共享的 LocalClient；未配置 Key 时返回 None
+    """
+    if provider == "local":
+        return get_local_client()
+    api_key = API_KEYS.get("zhipu", "")
+    if not api_key:
+        logger.error("❌ 未配置智谱 AI API Key，请设置环境变量 ZHIPU_API_KEY")
+        return None
+    key = (api_key, AI_CONFIG.get("zhipu", {}).get("base_url"))
+    with _zhipu_clients_lock:
+        if key not in _zhipu_clients:
+            # SDK 导入较慢，首次创建客户端时才加载（不调用 AI 的命令无需付出该开销）
+            from zai import ZhipuAiClient
+            _zhipu_clients[key] = ZhipuAiClient(api_key=key[0], base_url=key[1])
+        return _zhipu_clients[key]
+
+
+def _chat(
+    client: Any,
+    model: str,
+    messages: List[Dict[str, str]],
+    max_tokens: int,
+    provider: str = "zhipu"
+) -> Tuple[str, bool]:
+    """
+    发送一次补全请求并记录耗时与用量
+
+    Returns:
+        (输出文本, 是否因 max_tokens 被截断)
+    """
+    provider_config = AI_CONFIG.get(provider, {})
+    metrics = get_metrics()
+    params = dict(
+        model=model,
+        messages=messages,
+        response_format={"type": "json_object"},
+        max_tokens=max_tokens,
+        temperature=provider_config.get("temperature", 0.1),
+        top_p=0.95
+    )
+    with metrics.timer("llm_call"):
+        if provider == "local":
+            # 经调度器排队，在途请求数不超过服务端并行槽位
+            response = client.create(**params)
+        else:
+            response = client.chat.completions.create(**params, thinking={"type": "disabled"})
+    
+    metrics.incr("llm_calls")
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        details = getattr(usage, "prompt_tokens_details", None)
+        get_usage_tracker().record(
+            provider,
+            model,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+            reserved=max_tokens,
+            cached=getattr(details, "cached_tokens", 0) or 0
+        )
+    choice = response.choices[0]
+    return choice.message.content or "", choice.finish_reason == "length"
+
+
+def _complete_products(
+    client: Any,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    result: Dict,
+    invalid: List[int],
+    truncated: bool,
+    max_tokens: int,
+    schema: Dict = VPS_ARTICLE_SCHEMA,
+    provider: str = "zhipu"
+) -> Tuple[Dict, bool]:
+    """
+    只为无效或因截断缺失的产品补充提取，合并到结果中
+
+    补充请求仍需发送原文，但输出只包含需要补充的产品，
+    补充失败或预算不足时保留已有的有效产品
+
+    Args:
+        result: 已校验的提取结果
+        invalid: 无效产品下标
+        truncated: 上次输出是否被截断（截断时还需提取列表之外的其余产品）
+        max_tokens: 补充请求的 max_tokens
+        schema: 校验补充结果的 Schema（与首次提取的层级一致）
+        provider: 提取服务（zhipu / local）
+
+    Returns:
+        (合并后的结果, 补充输出是否仍被截断，需要扩大预算继续补充)
+    """
+    products = result.get("products", [])
+    kept = [product for i, product in enumerate(products) if i not in invalid]
+    
+    requests_text = []
+    if invalid:
+        names = "；".join(_describe_product(products[i], i) for i in invalid)
+        requests_text.append(f"以下产品的输出不完整或无效，请重新完整提取：{names}")
+    if truncated:
+        requests_text.append("上次输出被截断，请提取下列已提取产品之外的其余全部产品")
+    extracted = _product_list(kept)
+    follow_up = f"""{user_prompt}
+
+已提取的产品（不要重复返回）：
+{extracted}
+
+{"；".join(requests_text)}。
+只返回需要补充的产品，格式为 {{"products": [...]}}，每个产品符合上述 Schema；没有需要补充的产品时返回 {{"products": []}}"""
+    
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": follow_up}]
+    if not _within_budget(provider, model, messages, max_tokens):
+        logger.warning("⚠️ 预算不足，停止补充提取，保留已有的 %s 个产品", len(kept))
+        result["products"] = kept
+        return result, False
+    
+    metrics = get_metrics()
+    metrics.incr("llm_partial_reasks")
+    still_truncated = False
+    try:
+        content, still_truncated = _chat(client, model, messages, max_tokens, provider)
+        extra, _ = parse_llm_json(content)
+        extra, extra_invalid = validate_article(extra, schema)
+        # 模型可能重复返回已提取的产品，按商家 + 产品名去重
+        seen = {(product.get("vendor"), product.get("product_name")) for product in kept}
+        added = [
+            product for i, product in enumerate(extra.get("products", []))
+            if i not in extra_invalid and (product.get("vendor"), product.get("product_name")) not in seen
+        ]
+        # 补充输出被截断时最后一个产品可能不完整，留到下一轮
+        if still_truncated and added:
+            added.pop()
+    except Exception as e:
+        logger.warning("⚠️ 补充提取失败，保留已有的 %s 个产品: %s", len(kept), e)
+        added, still_truncated = [], False
+    
+    logger.info("🔧 补充提取 %s 个产品（保留 %s 个）", len(added), len(kept))
+    result["products"] = kept + added
+    return result, still_truncated
+
+
+@traced("zhipu.extract")
+def extract_vps_info(
+    text_content: str,
+    model: Optional[str] = None,
+    tier: str = "full",
+    provider: Optional[str] = None
+) -> Optional[dict]:
+    """
+    使用智谱 AI 从文本内容中提取 VPS 结构化信息
+    
+    max_tokens 按套餐行数预估（estimate_output_tokens）；输出先在本地修复并按
+    层级对应的 Schema 转换类型（json_repair），只有无效的产品或截断后缺失的产品
+    才再次请求模型补充，无法修复的截断输出加倍 max_tokens 后整篇重试；
+    每次调用前都检查预算（_within_budget），补充提取时预算用尽则返回已有的有效产品
+    
+    Args:
+        text_content: 已处理的纯文本内容（不是 HTML）
+        model: 使用的模型名称，默认使用配置中的值（经预算控制决定，可能切换为低价模型）；
+               显式指定时跳过模型选择，每次调用前的预算检查仍然生效
+        tier: full 提取全部字段；fast 只提取套餐与价格等结构化字段，叙述字段之后用 enrich_vps_info 补充
+        provider: 提取服务（zhipu / local），默认使用 AI_CONFIG["extraction"]["provider"]
+        
+    Returns:
+        提取的结构化数据字典，失败或预算用尽返回 None
+    """
+    provider = extraction_provider(provider)
+    client = _create_client(provider)
+    if client is None:
+        return None
+    
+    # 获取模型配置
+    provider_config = AI_CONFIG.get(provider, {})
+    if model is None:
+        model = get_usage_tracker().admit(provider, default_model_of(provider))
+        if model is None:
+            logger.error("❌ 已达到本次运行的预算上限，跳过 AI 提取")
+            return None
+    
+    system_prompt = SYSTEM_PROMPTS[tier]
+    schema = TIER_SCHEMAS[tier]
+
+    # 用户消息以固定前缀开头，文章正文放在最后，补充提取请求与首次请求共享同一前缀
     user_prompt = f"""请从以下 VPS 测评文章中提取结构化信息：
 
-{text_content[:50000]}"""
+{text_content[:MAX_INPUT_CHARS]}"""
 
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    metrics = get_metrics()
+    ceiling = provider_config.get("max_tokens", 65536)
+    max_tokens = min(estimate_output_tokens(text_content), ceiling)
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=zhipu_config.get("max_tokens", 4096),
-            temperature=zhipu_config.get("temperature", 0.1),
-            top_p=0.95,
-            thinking={"type": "disabled"}
-        )
+        while True:
+            if not _within_budget(provider, model, messages, max_tokens):
+                logger.error("❌ 已达到本次运行的预算上限，停止 AI 提取")
+                return None
+            content, truncated = _chat(client, model, messages, max_tokens, provider)
+            try:
+                result, fixes = parse_llm_json(content)
+                result, invalid = validate_article(result, schema)
+            except ValueError:
+                # 截断且无法修复：扩大预算整篇重试
+                if truncated and max_tokens < ceiling:
+                    metrics.incr("llm_truncation_retries")
+                    logger.warning("⚠️ 输出被截断（max_tokens=%s），扩大预算重试", max_tokens)
+                    max_tokens = min(max_tokens * 2, ceiling)
+                    continue
+                raise
+            break
+        
+        if fixes:
+            metrics.incr("llm_json_repairs")
+            logger.info("🔧 已在本地修复 JSON: %s", ", ".join(fixes))
         
-        content = response.choices[0].message.content
-        result = json.loads(content)
+        # 截断时最后一个产品可能不完整，与无效产品一起补充提取
+        if truncated and result.get("products"):
+            invalid = sorted(set(invalid) | {len(result["products"]) - 1})
+        # 每轮补充的预算加倍
+        rounds = 0
+        while (truncated or invalid) and rounds < MAX_COMPLETION_ROUNDS:
+            max_tokens = min(max_tokens * 2, ceiling)
+            result, truncated = _complete_products(
+                client, model, system_prompt, user_prompt,
+                result, invalid, truncated, max_tokens, schema, provider
+            )
+            invalid = []
+            rounds += 1
         return result
         
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON 解析失败: {e}")
+    except ValueError as e:
+        metrics.incr("llm_json_errors")
+        logger.error("❌ JSON 解析失败: %s", e)
         return None
     except Exception as e:
-        print(f"❌ API 调用失败: {e}")
+        metrics.incr("llm_errors")
+        logger.error("❌ API 调用失败: %s", e)
+        return None
+
+
+@traced("zhipu.enrich")
+def enrich_vps_info(
+    text_content: str,
+    result: Dict,
+    model: Optional[str] = None,
+    provider: Optional[str] = None
+) -> Optional[dict]:
+    """
+    分层提取的第二遍：为快速提取（tier="fast"）的结果补充叙述字段
+    
+    叙述字段见 NARRATIVE_PRODUCT_FIELDS / NARRATIVE_ARTICLE_FIELDS，
+    返回值用 merge_narrative 合并；截断且无法修复时加倍 max_tokens 重试，
+    可修复的截断输出丢弃最后一个（可能不完整的）产品，该产品保持未补充
+    
+    Args:
+        text_content: 文章纯文本
+        result: 快速提取的结果
+        model: 模型名称；为 None 时按低优先级经预算控制决定（达到 soft_limit 即放弃），
+               每次调用前的预算检查不论是否指定都生效
+        provider: 提取服务（zhipu / local），默认使用 AI_CONFIG["extraction"]["provider"]
+        
+    Returns:
+        叙述字段 {"products": [...], "article_summary": ...}，失败或预算不足返回 None
+    """
+    products = result.get("products") or []
+    if not products:
+        return {"products": []}
+    
+    provider = extraction_provider(provider)
+    client = _create_client(provider)
+    if client is None:
         return None
+    
+    provider_config = AI_CONFIG.get(provider, {})
+    if model is None:
+        model = get_usage_tracker().admit(provider, default_model_of(provider), priority="low")
+        if model is None:
+            logger.warning("⚠️ 预算不足，跳过叙述字段补充")
+            return None
+    
+    user_prompt = f"""请从以下 VPS 测评文章中提取结构化信息：
+
+{text_content[:MAX_INPUT_CHARS]}
+
+已提取的产品：
+{_product_list(products)}"""
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPTS["narrative"]},
+        {"role": "user", "content": user_prompt}
+    ]
+    metrics = get_metrics()
+    ceiling = provider_config.get("max_tokens", 65536)
+    max_tokens = min(estimate_narrative_tokens(products), ceiling)
+    try:
+        while True:
+            if not _within_budget(provider, model, messages, max_tokens):
+                logger.warning("⚠️ 预算不足，停止叙述字段补充")
+                return None
+            content, truncated = _chat(client, model, messages, max_tokens, provider)
+            try:
+                narrative, _ = parse_llm_json(content)
+                narrative, invalid = validate_article(narrative, VPS_NARRATIVE_SCHEMA)
+            except ValueError:
+                if truncated and max_tokens < ceiling:
+                    metrics.incr("llm_truncation_retries")
+                    logger.warning("⚠️ 输出被截断（max_tokens=%s），扩大预算重试", max_tokens)
+                    max_tokens = min(max_tokens * 2, ceiling)
+                    continue
+                raise
+            break
+        
+        items = narrative.get("products", [])
+        if truncated and items:
+            invalid = sorted(set(invalid) | {len(items) - 1})
+        narrative["products"] = [item for i, item in enumerate(items) if i not in invalid]
+        return narrative
+        
+    except ValueError as e:
+        metrics.incr("llm_json_errors")
+        logger.error("❌ JSON 解析失败: %s", e)
+        return None
+    except Exception as e:
+        metrics.incr("llm_errors")
+        logger.error("❌ API 调用失败: %s", e)
+        return None
+
+
+def merge_narrative(result: Dict, narrative: Dict) -> int:
+    """
+    将叙述字段合并到快速提取的结果中
+    
+    按商家 + 产品名匹配；模型改写了名称但产品数一致时按顺序对应
+    
+    Args:
+        result: 快速提取的结果（原地修改）
+        narrative: enrich_vps_info 的返回值
+        
+    Returns:
+        补充了叙述字段的产品数
+    """
+    products = result.get("products") or []
+    items = narrative.get("products") or []
+    by_name = {(item.get("vendor"), item.get("product_name")): item for item in items}
+    merged = 0
+    for index, product in enumerate(products):
+        item = by_name.get((product.get("vendor"), product.get("product_name")))
+        if item is None and len(items) == len(products):
+            item = items[index]
+        if item is None:
+            continue
+        for field in NARRATIVE_PRODUCT_FIELDS:
+            if item.get(field) not in (None, "", []):
+                product[field] = item[field]
+        merged += 1
+    for field in NARRATIVE_ARTICLE_FIELDS:
+        if narrative.get(field):
+            result[field] = narrative[field]
+    return merged
 
 
 if __name__ == "__main__":
@@ -1,12 +1,25 @@
 """
 爬虫模块入口
-导出所有爬虫类
+导出所有爬虫类（首次访问时才导入：爬虫依赖 requests 等较重的库，
+只用 parsers、page_store 等子模块或只查看命令行帮助时不必加载）
 """
+import importlib
 
-from .base import BaseScraper
-from .gwvps_scraper import GWVPSScraper
+_EXPORTS = {
+    "BaseScraper": ".base",
+    "GWVPSScraper": ".gwvps_scraper",
+}
 
 __all__ = [
     "BaseScraper",
     "GWVPSScraper",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
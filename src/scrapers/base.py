@@ -3,8 +3,9 @@
 定义所有爬虫必须实现的接口
 """
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Tuple
 import time
+import xml.etree.ElementTree as ET
 import requests
 
 import sys
@@ -12,6 +13,12 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config import REQUEST_CONFIG
+from src.utils.metrics import get_metrics
+from src.utils.tracing import get_tracer
+from src.utils.logger import get_logger
+
+
+logger = get_logger("scraper")
 
 
 class BaseScraper(ABC):
@@ -39,6 +46,8 @@ class BaseScraper(ABC):
         self.session.headers.update({
             "User-Agent": REQUEST_CONFIG["user_agent"]
         })
+        # 条件请求的校验值：URL → {"If-None-Match": ETag, "If-Modified-Since": Last-Modified}
+        self._validators: Dict[str, Dict[str, str]] = {}
     
     def _request(self, url: str) -> Optional[str]:
         """
@@ -51,13 +60,122 @@ class BaseScraper(ABC):
             响应的 HTML 文本，失败返回 None
         """
         try:
-            response = self.session.get(url, timeout=REQUEST_CONFIG["timeout"])
+            with get_tracer().span("http.get", url=url):
+                response = self.session.get(url, timeout=REQUEST_CONFIG["timeout"])
             response.encoding = response.apparent_encoding or self.encoding
             return response.text
         except requests.RequestException as e:
-            print(f"❌ 请求失败: {url} - {e}")
+            logger.error("❌ 请求失败: %s - %s", url, e)
+            return None
+    
+    def _request_bytes(self, url: str, stage: str = "http_fetch") -> Optional[bytes]:
+        """
+        发送 HTTP GET 请求并返回原始响应字节
+        
+        不在当前线程做编码探测与解码，字节可直接交给解析进程；
+        请求耗时记入指定阶段，并累计请求数与下载字节数
+        
+        Args:
+            url: 目标 URL
+            stage: 指标阶段名（如 list_fetch、article_fetch）
+            
+        Returns:
+            响应的原始字节，失败返回 None
+        """
+        try:
+            return self._get_response(url, stage).content
+        except requests.RequestException as e:
+            logger.error("❌ 请求失败: %s - %s", url, e)
             return None
     
+    def _get_response(self, url: str, stage: str = "http_fetch") -> requests.Response:
+        """
+        发送 HTTP GET 请求并返回响应对象，不检查状态码
+        
+        与 _request_bytes 共用指标与追踪，供需要状态码或重定向后 URL 的调用方使用
+        
+        Args:
+            url: 目标 URL
+            stage: 指标阶段名
+            
+        Returns:
+            响应对象（正文已读取）
+            
+        Raises:
+            requests.RequestException: 网络错误
+        """
+        metrics = get_metrics()
+        try:
+            with metrics.timer(stage), get_tracer().span("http.get", url=url, stage=stage):
+                response = self.session.get(url, timeout=REQUEST_CONFIG["timeout"])
+                content = response.content
+        except requests.RequestException:
+            metrics.incr("http_errors")
+            raise
+        metrics.incr("http_requests")
+        metrics.incr("bytes_fetched", len(content))
+        return response
+    
+    def _request_if_changed(self, url: str, stage: str = "http_fetch") -> Optional[bytes]:
+        """
+        条件 GET：带上次响应的 ETag / Last-Modified，页面未变化时服务器返回 304，不传输正文
+        
+        Args:
+            url: 目标 URL
+            stage: 指标阶段名
+            
+        Returns:
+            页面变化时返回原始响应字节，未变化（304）返回 None
+            
+        Raises:
+            requests.RequestException: 请求失败或状态码异常
+        """
+        metrics = get_metrics()
+        with metrics.timer(stage), get_tracer().span("http.get", url=url, stage=stage):
+            response = self.session.get(
+                url, timeout=REQUEST_CONFIG["timeout"], headers=self._validators.get(url, {})
+            )
+        metrics.incr("http_requests")
+        if response.status_code == 304:
+            metrics.incr("http_not_modified")
+            return None
+        response.raise_for_status()
+        
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self._validators[url] = validators
+        metrics.incr("bytes_fetched", len(response.content))
+        return response.content
+    
+    def _iter_xml(self, url: str, tags: Tuple[str, ...]) -> Iterator[Dict[str, str]]:
+        """
+        流式解析 XML（RSS / sitemap），边下载边产出指定元素
+        
+        每个匹配元素产出为 {子元素本地名: 文本}，处理后立即释放，
+        调用方提前结束迭代时自动关闭连接
+        
+        Args:
+            url: XML 地址
+            tags: 需要产出的元素本地名（忽略命名空间），如 ("item",)
+            
+        Raises:
+            requests.RequestException: 请求失败或状态码异常
+            ET.ParseError: XML 格式错误
+        """
+        with self.session.get(url, timeout=REQUEST_CONFIG["timeout"], stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            for _, elem in ET.iterparse(response.raw, events=("end",)):
+                if elem.tag.rsplit("}", 1)[-1] in tags:
+                    yield {
+                        child.tag.rsplit("}", 1)[-1]: (child.text or "").strip()
+                        for child in elem
+                    }
+                    elem.clear()
+    
     def _delay(self) -> None:
         """请求间隔延迟，避免被封禁"""
         time.sleep(REQUEST_CONFIG["request_delay"])
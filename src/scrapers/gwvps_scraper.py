@@ -2,11 +2,20 @@
 狗汪 VPS 测评网爬虫
 爬取 https://www.gwvpsceping.com/ 的 VPS 测评文章
 """
-from typing import List, Dict, Optional, Tuple
-from bs4 import BeautifulSoup
+from typing import List, Dict, Iterator, Optional, Set, Tuple, Callable, Any
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+import xml.etree.ElementTree as ET
+import functools
+import multiprocessing
 import threading
+import json
+import re
+import sqlite3
+import time
+
+import requests
 
 import sys
 import os
@@ -14,9 +23,59 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspa
 
 from src.scrapers.base import BaseScraper
 from src.scrapers.page_extract import extract_page_with_tavily
-from src.ai_clients.zhipu_client import extract_vps_info
-from src.utils import sanitize_filename, save_to_json, save_to_markdown, save_to_html, html_to_text
-from config import TARGET_SITES, OUTPUT_CONFIG
+from src.scrapers.parsers import (
+    parse_stored_page,
+    init_parse_worker,
+    parse_article_list,
+    parse_articles_with_date,
+    parse_article,
+    page_to_text,
+    decode_html,
+    extract_title,
+)
+from src.ai_clients.zhipu_client import (
+    extract_vps_info,
+    enrich_vps_info,
+    merge_narrative,
+    extraction_cache_key,
+    extraction_provider,
+    default_model_of,
+)
+from src.ai_clients.usage import get_usage_tracker
+from src.utils import (
+    sanitize_filename,
+    save_to_json,
+    save_to_markdown,
+    flush_writes,
+    RateLimiter,
+    ProgressMeter,
+    PriorityThreadPool,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+    get_metrics,
+    get_tracer,
+    get_logger,
+    flush_logs,
+)
+from src.storage import (
+    PriceHistory,
+    PageStore,
+    ContentArchive,
+    ExtractionCache,
+    BackfillCheckpoint,
+    RunJournal,
+    SearchIndex,
+    ResultSink,
+)
+from src.storage.archive import PAGE_DICT_ENTRY
+from config import TARGET_SITES, OUTPUT_CONFIG, SCRAPE_CONFIG, AI_CONFIG
+
+
+logger = get_logger("gwvps")
+
+# 文章链接格式：https://www.gwvpsceping.com/<文章编号>.html
+_ARTICLE_ID_PATTERN = re.compile(r"/(\d+)\.html$")
 
 
 class GWVPSScraper(BaseScraper):
@@ -30,17 +89,87 @@ class GWVPSScraper(BaseScraper):
     支持两种页面提取方式：
     - 标准爬虫方式（use_tavily=False，默认）
     - Tavily API 提取方式（use_tavily=True）
+    
+    网络请求在线程池中执行，HTML 解析与转文本交给进程池，避免与 I/O 线程争抢 GIL
     """
     
-    def __init__(self, use_tavily: bool = False):
+    def __init__(
+        self,
+        use_tavily: bool = False,
+        parse_workers: Optional[int] = None,
+        provider: Optional[str] = None
+    ):
         """
         初始化爬虫
         
         Args:
             use_tavily: 是否使用 Tavily API 提取页面内容（默认 False）
+            parse_workers: 解析进程数，默认使用 SCRAPE_CONFIG["parse_workers"]；
+                           0 表示在当前线程内解析
+            provider: 结构化提取服务（zhipu / local），默认使用 AI_CONFIG["extraction"]["provider"]
         """
         super().__init__(TARGET_SITES["gwvps"])
         self.use_tavily = use_tavily
+        self.provider = extraction_provider(provider)
+        if parse_workers is None:
+            parse_workers = SCRAPE_CONFIG.get("parse_workers")
+        self.parse_workers = parse_workers if parse_workers is not None else (os.cpu_count() or 1)
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_lock = threading.Lock()
+        self.page_store = PageStore()
+        self._extract_cache: Optional[ExtractionCache] = None
+        self._extract_cache_lock = threading.Lock()
+        self._search_index: Optional[SearchIndex] = None
+        self._search_index_lock = threading.Lock()
+    
+    def _parse(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        执行 CPU 密集的解析函数
+        
+        parse_workers > 0 时提交到进程池并等待结果（等待期间释放 GIL），
+        否则在当前线程直接执行
+        """
+        # 解析耗时按函数名记入指标（含进程间传输开销）
+        with get_metrics().timer(func.__name__), get_tracer().span(f"parse.{func.__name__}"):
+            if self.parse_workers <= 0:
+                return func(*args)
+            return self._get_parse_pool().submit(func, *args).result()
+    
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """获取解析进程池（首次使用时创建）"""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = self._create_parse_pool()
+            return self._parse_pool
+    
+    def _create_parse_pool(self, dict_data: Optional[bytes] = None) -> ProcessPoolExecutor:
+        """
+        创建解析进程池
+        
+        子进程使用 forkserver 启动（不支持时用 spawn）：此时已有日志、写入器、指标等后台线程，
+        fork 会把其他线程持有的锁原样复制进子进程，可能导致子进程死锁
+        
+        Args:
+            dict_data: 页面共享字典，每个子进程启动时传入一次
+        """
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(
+            max_workers=max(self.parse_workers, 1),
+            mp_context=multiprocessing.get_context(method),
+            initializer=init_parse_worker,
+            initargs=(dict_data,)
+        )
+    
+    def close(self) -> None:
+        """关闭解析进程池与全文检索索引"""
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+        with self._search_index_lock:
+            if self._search_index is not None:
+                self._search_index.close()
+                self._search_index = None
     
     def get_article_list(self, page: int = 1) -> List[Dict[str, str]]:
         """获取指定页的文章列表"""
@@ -49,51 +178,31 @@ class GWVPSScraper(BaseScraper):
         else:
             url = f"{self.base_url}/page/{page}"
         
-        print(f"📄 正在获取第 {page} 页文章列表: {url}")
-        html = self._request(url)
-        if not html:
+        logger.info("📄 正在获取第 %s 页文章列表: %s", page, url)
+        raw = self._request_bytes(url, stage="list_fetch")
+        if not raw:
             return []
         
-        soup = BeautifulSoup(html, "html.parser")
-        articles = []
-        
         # 使用配置的选择器查找文章链接
         selector = self.selectors.get("article_list", "h2 > a")
-        for link in soup.select(selector):
-            title = link.get_text(strip=True)
-            href = link.get("href", "")
-            if title and href:
-                # 处理相对链接
-                if not href.startswith("http"):
-                    href = f"{self.base_url}/{href.lstrip('/')}"
-                articles.append({"title": title, "link": href})
-        
-        print(f"   找到 {len(articles)} 篇文章")
+        articles = self._parse(parse_article_list, raw, self.base_url, selector)
+        
+        logger.info("找到 %s 篇文章", len(articles))
         return articles
     
     def scrape_article(self, url: str) -> Optional[Dict[str, str]]:
         """爬取单篇文章内容"""
-        print(f"📡 正在爬取: {url}")
-        html = self._request(url)
-        if not html:
+        logger.info("📡 正在爬取: %s", url)
+        raw = self._request_bytes(url, stage="article_fetch")
+        if not raw:
             return None
         
-        soup = BeautifulSoup(html, "html.parser")
-        
-        # 提取标题
-        title_selector = self.selectors.get("article_title", "h1")
-        title_elem = soup.select_one(title_selector)
-        title = title_elem.get_text(strip=True) if title_elem else "无标题"
-        
-        # 提取正文
-        content_selector = self.selectors.get("article_content", "article")
-        content_elem = soup.select_one(content_selector)
-        content = str(content_elem) if content_elem else ""
+        parsed = self._parse(parse_article, raw, self.selectors)
         
         return {
-            "title": title,
-            "content": content,
-            "html": html,
+            "title": parsed["title"],
+            "content": parsed["content"],
+            "html": decode_html(raw, self.encoding),
             "url": url,
         }
     
@@ -111,38 +220,38 @@ class GWVPSScraper(BaseScraper):
         Returns:
             AI 提取的结构化数据字典
         """
-        print(f"📡 正在爬取: {url}")
+        logger.info("📡 正在爬取: %s", url)
         
         # 根据配置选择页面提取方式
         if self.use_tavily:
             # 使用 Tavily API 提取
             text_content = extract_page_with_tavily(url)
             if not text_content:
-                print("⚠️  Tavily 提取失败，尝试使用标准爬虫方式...")
+                logger.warning("⚠️  Tavily 提取失败，尝试使用标准爬虫方式...")
                 # Fallback 到标准爬虫
-                html = self._request(url)
-                if not html:
+                raw = self._request_bytes(url, stage="article_fetch")
+                if not raw:
                     return None
-                print(f"✅ HTML 获取成功，长度: {len(html)} 字符")
-                print("📝 正在将 HTML 转换为纯文本...")
-                text_content = html_to_text(html)
-                print(f"   提取文本长度: {len(text_content)} 字符")
+                logger.info("✅ HTML 获取成功，长度: %s 字节", len(raw))
+                logger.info("📝 正在将 HTML 转换为纯文本...")
+                text_content = self._parse(page_to_text, raw)
+                logger.info("提取文本长度: %s 字符", len(text_content))
         else:
             # 使用标准爬虫方式
-            html = self._request(url)
-            if not html:
+            raw = self._request_bytes(url, stage="article_fetch")
+            if not raw:
                 return None
             
-            print(f"✅ HTML 获取成功，长度: {len(html)} 字符")
+            logger.info("✅ HTML 获取成功，长度: %s 字节", len(raw))
             
             # 将 HTML 转换为纯文本
-            print("📝 正在将 HTML 转换为纯文本...")
-            text_content = html_to_text(html)
-            print(f"   提取文本长度: {len(text_content)} 字符")
+            logger.info("📝 正在将 HTML 转换为纯文本...")
+            text_content = self._parse(page_to_text, raw)
+            logger.info("提取文本长度: %s 字符", len(text_content))
         
         # 调用 AI 提取结构化数据
-        print("🤖 正在调用大模型提取结构化数据...")
-        vps_info = extract_vps_info(text_content)
+        logger.info("🤖 正在调用大模型提取结构化数据...")
+        vps_info = extract_vps_info(text_content, provider=self.provider)
         
         if vps_info:
             vps_info["source_url"] = url
@@ -167,38 +276,61 @@ class GWVPSScraper(BaseScraper):
         Returns:
             爬取结果列表
         """
-        results = []
+        results = list(self.iter_run(max_pages, output_format, single_url))
+        logger.info("✅ 爬取完成，共 %s 篇文章", len(results))
+        return results
+    
+    def iter_run(
+        self, 
+        max_pages: int = 1, 
+        output_format: str = "json",
+        single_url: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        流式运行爬虫：逐篇爬取并保存，每篇完成后产出结果
         
-        # 单篇文章模式
-        if single_url:
-            if output_format == "json":
-                result = self.scrape_with_ai(single_url)
-            else:
-                result = self.scrape_article(single_url)
-            
-            if result:
-                self._save_result(result, output_format)
-                results.append(result)
-            return results
+        不保留之前的结果，Markdown 模式下结果中的整页 HTML 在调用方处理完后即释放；
+        生成器结束（或被关闭）时等待写入落盘并释放资源
         
-        # 列表爬取模式
-        for page in range(1, max_pages + 1):
-            articles = self.get_article_list(page)
+        Args:
+            max_pages: 最大爬取页数
+            output_format: 输出格式，"json" 或 "markdown"
+            single_url: 单篇文章 URL（指定时忽略 max_pages）
             
-            for article in articles:
-                self._delay()
-                
-                if output_format == "json":
-                    result = self.scrape_with_ai(article["link"])
-                else:
-                    result = self.scrape_article(article["link"])
-                
+        Yields:
+            已保存的爬取结果
+        """
+        try:
+            # 单篇文章模式
+            if single_url:
+                result = self._scrape_and_save(single_url, output_format)
                 if result:
-                    self._save_result(result, output_format)
-                    results.append(result)
+                    yield result
+                return
+            
+            # 列表爬取模式
+            for page in range(1, max_pages + 1):
+                articles = self.get_article_list(page)
+                
+                for article in articles:
+                    self._delay()
+                    result = self._scrape_and_save(article["link"], output_format)
+                    if result:
+                        yield result
+        finally:
+            self._flush_writes()
+            self.close()
+    
+    def _scrape_and_save(self, url: str, output_format: str) -> Optional[Dict]:
+        """爬取单篇文章（JSON 格式经 AI 提取）并保存"""
+        if output_format == "json":
+            result = self.scrape_with_ai(url)
+        else:
+            result = self.scrape_article(url)
         
-        print(f"\n✅ 爬取完成，共 {len(results)} 篇文章")
-        return results
+        if result:
+            self._save_result(result, output_format)
+        return result
     
     def _save_result(self, result: Dict, output_format: str) -> None:
         """保存爬取结果到文件"""
@@ -211,7 +343,7 @@ class GWVPSScraper(BaseScraper):
             save_to_json(result, filename, output_dir)
             vendor = result.get("vendor", "未知")
             product = result.get("product_name", "未知")
-            print(f"   商家: {vendor} | 产品: {product}")
+            logger.info("商家: %s | 产品: %s", vendor, product)
         else:
             # Markdown 格式
             title = result.get("title", "无标题")
@@ -240,40 +372,11 @@ class GWVPSScraper(BaseScraper):
         else:
             url = f"{self.base_url}/page/{page}"
         
-        html = self._request(url)
-        if not html:
+        raw = self._request_bytes(url, stage="list_fetch")
+        if not raw:
             return []
         
-        soup = BeautifulSoup(html, "html.parser")
-        articles = []
-        
-        # 查找所有文章元素
-        for article_elem in soup.select("article"):
-            # 提取标题和链接
-            link_elem = article_elem.select_one("h2 > a")
-            if not link_elem:
-                continue
-            
-            title = link_elem.get_text(strip=True)
-            href = link_elem.get("href", "")
-            if not title or not href:
-                continue
-            
-            # 处理相对链接
-            if not href.startswith("http"):
-                href = f"{self.base_url}/{href.lstrip('/')}"
-            
-            # 提取日期
-            time_elem = article_elem.select_one("time")
-            date_str = time_elem.get_text(strip=True) if time_elem else ""
-            
-            articles.append({
-                "title": title,
-                "link": href,
-                "date": date_str
-            })
-        
-        return articles
+        return self._parse(parse_articles_with_date, raw, self.base_url)
 
     def _fetch_page_worker(self, page: int, cutoff_date: datetime, results: List, lock: threading.Lock, stop_event: threading.Event) -> bool:
         """
@@ -323,7 +426,8 @@ class GWVPSScraper(BaseScraper):
         self, 
         days: int = 5, 
         max_pages: int = 50,
-        num_threads: int = 4
+        num_threads: int = 4,
+        need_titles: bool = False
     ) -> List[Dict[str, str]]:
         """
         多线程获取最近 N 天内发布的文章
@@ -332,15 +436,55 @@ class GWVPSScraper(BaseScraper):
             days: 最近天数（默认 5 天）
             max_pages: 最大爬取页数（默认 50 页，避免无限爬取）
             num_threads: 线程数（默认 4）
+            need_titles: 是否必须带标题；为 True 时不使用 sitemap 发现（sitemap 不含标题）
             
         Returns:
-            包含 title, link, date 的文章列表，按日期降序排列
+            包含 title, link, date 的文章列表，按日期降序排列；
+            经 sitemap 发现的文章 title 为空，抓取页面时再补全
         """
         cutoff_date = datetime.now() - timedelta(days=days)
         cutoff_str = cutoff_date.strftime("%Y-%m-%d")
         
-        print(f"🔍 开始获取最近 {days} 天的文章（{cutoff_str} 之后）")
-        print(f"   使用 {num_threads} 个线程，最大爬取 {max_pages} 页")
+        logger.info("🔍 开始获取最近 %s 天的文章（%s 之后）", days, cutoff_str)
+        
+        # 优先使用 RSS / sitemap 一两次请求确定时间窗口，失败再逐页爬取列表
+        results = self._discover_recent(cutoff_date, need_titles)
+        if results is None:
+            results = self._discover_from_listing(cutoff_date, max_pages, num_threads)
+        
+        # 按日期降序排序
+        results.sort(key=lambda x: x.get("date", ""), reverse=True)
+        
+        # 去重（基于链接）
+        seen_links = set()
+        unique_results = []
+        for article in results:
+            if article["link"] not in seen_links:
+                seen_links.add(article["link"])
+                unique_results.append(article)
+        
+        logger.info("✅ 完成！找到 %s 篇最近 %s 天的文章", len(unique_results), days)
+        
+        return unique_results
+
+    def _discover_from_listing(
+        self,
+        cutoff_date: datetime,
+        max_pages: int,
+        num_threads: int
+    ) -> List[Dict[str, str]]:
+        """
+        列表页发现：多线程逐页爬取列表，直到整页都早于截止日期
+        
+        Args:
+            cutoff_date: 截止日期
+            max_pages: 最大爬取页数
+            num_threads: 线程数
+            
+        Returns:
+            包含 title, link, date 的文章列表（未排序）
+        """
+        logger.info("使用 %s 个线程，最大爬取 %s 页", num_threads, max_pages)
         
         results: List[Dict] = []
         lock = threading.Lock()
@@ -372,31 +516,121 @@ class GWVPSScraper(BaseScraper):
                     page_num = futures[future]
                     try:
                         future.result()
-                        print(f"   ✓ 第 {page_num} 页完成，当前共 {len(results)} 篇文章")
+                        logger.info("✓ 第 %s 页完成，当前共 %s 篇文章", page_num, len(results))
                     except Exception as e:
-                        print(f"   ✗ 第 {page_num} 页出错: {e}")
+                        logger.warning("✗ 第 %s 页出错: %s", page_num, e)
                 
                 page += num_threads
                 
                 # 如果收到停止信号，退出循环
                 if stop_event.is_set():
-                    print("   📌 检测到旧文章，停止继续爬取")
+                    logger.info("📌 检测到旧文章，停止继续爬取")
                     break
         
-        # 按日期降序排序
-        results.sort(key=lambda x: x.get("date", ""), reverse=True)
+        return results
+
+    def _discover_recent(self, cutoff_date: datetime, need_titles: bool = False) -> Optional[List[Dict[str, str]]]:
+        """
+        按 SCRAPE_CONFIG["discovery"] 选择发现方式：RSS → sitemap（need_titles 时跳过 sitemap）
         
-        # 去重（基于链接）
-        seen_links = set()
-        unique_results = []
-        for article in results:
-            if article["link"] not in seen_links:
-                seen_links.add(article["link"])
-                unique_results.append(article)
+        Returns:
+            文章列表；无法覆盖时间窗口或配置为 listing 时返回 None（回退到列表页爬取）
+        """
+        if SCRAPE_CONFIG.get("discovery", "auto") == "listing":
+            return None
         
-        print(f"\n✅ 完成！找到 {len(unique_results)} 篇最近 {days} 天的文章\n")
+        discoverers = [("RSS", self._discover_from_feed)]
+        if not need_titles:
+            discoverers.append(("sitemap", self._discover_from_sitemap))
         
-        return unique_results
+        for name, discover in discoverers:
+            try:
+                articles = discover(cutoff_date)
+            except (requests.RequestException, ET.ParseError, ValueError, TypeError) as e:
+                logger.warning("⚠️ %s 发现失败: %s", name, e)
+                continue
+            if articles is not None:
+                logger.info("📡 通过 %s 发现 %s 篇文章", name, len(articles))
+                return articles
+        
+        logger.info("↩️ RSS / sitemap 无法覆盖时间窗口，回退到列表页爬取")
+        return None
+
+    def _discover_from_feed(self, cutoff_date: datetime, max_feed_pages: int = 5) -> Optional[List[Dict[str, str]]]:
+        """
+        RSS 发现：读取 WordPress /feed/（按发布时间倒序），遇到早于截止日期的文章即停止
+        
+        Args:
+            cutoff_date: 截止日期
+            max_feed_pages: 最多读取的 feed 分页数
+            
+        Returns:
+            文章列表；feed 分页读完仍未到达截止日期时返回 None
+        """
+        articles = []
+        for page in range(1, max_feed_pages + 1):
+            url = f"{self.base_url}/feed/" + (f"?paged={page}" if page > 1 else "")
+            item_count = 0
+            try:
+                for item in self._iter_xml(url, ("item",)):
+                    item_count += 1
+                    date_str = parsedate_to_datetime(item.get("pubDate", "")).strftime("%Y-%m-%d")
+                    if datetime.strptime(date_str, "%Y-%m-%d") < cutoff_date:
+                        return articles
+                    link = item.get("link", "")
+                    if link:
+                        articles.append({
+                            "title": item.get("title") or link,
+                            "link": link,
+                            "date": date_str,
+                        })
+            except requests.HTTPError as e:
+                # WordPress 对超出末页的 ?paged=N 返回 404，即 feed 已读完
+                if page > 1 and e.response is not None and e.response.status_code == 404:
+                    return articles
+                raise
+            if item_count == 0:
+                # feed 已到末尾，全部文章都在时间窗口内
+                return articles
+        return None
+
+    def _discover_from_sitemap(self, cutoff_date: datetime) -> Optional[List[Dict[str, str]]]:
+        """
+        sitemap 发现：读取 sitemap 索引，只展开 lastmod 不早于截止日期的文章 sitemap
+        
+        sitemap 不含标题，title 留空，抓取文章页面时从页面补全；
+        lastmod 为最后修改日期，因此近期更新过的旧文章也会被选中
+        
+        Args:
+            cutoff_date: 截止日期
+            
+        Returns:
+            文章列表；sitemap 不提供 lastmod 时返回 None
+        """
+        cutoff_str = cutoff_date.strftime("%Y-%m-%d")
+        entries = list(self._iter_xml(f"{self.base_url}/sitemap.xml", ("sitemap", "url")))
+        
+        # sitemap 索引：只展开文章类 sitemap，并按 lastmod 跳过整体过旧的分片
+        child_urls = [
+            entry.get("loc", "") for entry in entries
+            if "post" in entry.get("loc", "") and entry.get("lastmod", cutoff_str)[:10] >= cutoff_str
+        ]
+        url_entries = [entry for entry in entries if "sitemap" not in entry.get("loc", "")]
+        for child_url in child_urls:
+            url_entries.extend(self._iter_xml(child_url, ("url",)))
+        
+        if not url_entries or not any(entry.get("lastmod") for entry in url_entries):
+            return None
+        
+        articles = []
+        for entry in url_entries:
+            link = entry.get("loc", "")
+            date_str = entry.get("lastmod", "")[:10]
+            if not _ARTICLE_ID_PATTERN.search(link) or not date_str:
+                continue
+            if datetime.strptime(date_str, "%Y-%m-%d") >= cutoff_date:
+                articles.append({"title": "", "link": link, "date": date_str})
+        return articles
 
     def print_recent_articles(
         self,
@@ -415,8 +649,11 @@ class GWVPSScraper(BaseScraper):
         Returns:
             文章列表
         """
-        articles = self.get_recent_articles(days, max_pages, num_threads)
+        # 列表需要显示标题，不使用 sitemap 发现
+        articles = self.get_recent_articles(days, max_pages, num_threads, need_titles=True)
         
+        # 文章列表是本命令的输出结果，直接打印（先输出已排队的日志保证顺序）
+        flush_logs()
         if not articles:
             print("😕 没有找到符合条件的文章")
             return []
@@ -433,179 +670,1178 @@ class GWVPSScraper(BaseScraper):
         
         return articles
 
+    def _fetch_article_text(
+        self,
+        article: Dict[str, str],
+        index: int,
+        total: int,
+        journal: Optional[RunJournal] = None
+    ) -> Optional[str]:
+        """
+        获取单篇文章的纯文本（续跑时优先读取页面存储）
+        
+        Args:
+            article: 文章信息（包含 title, link, date）
+            index: 当前索引
+            total: 总数
+            journal: 运行日志（记录 fetched 阶段）
+            
+        Returns:
+            文章纯文本，获取失败返回 None
+        """
+        url = article["link"]
+        title = article["title"] or url
+        filename = self._article_filename(url)
+        
+        with get_tracer().trace(filename), get_tracer().span("fetch", url=url):
+            try:
+                # 续跑时已抓取过的页面直接从页面存储读取，不再请求
+                stored_html = None
+                raw = None
+                if journal and journal.stage_of(url) in ("fetched", "extracted", "saved"):
+                    stored_html = self.page_store.get(filename)
+                
+                # 根据配置选择页面提取方式
+                if stored_html is not None:
+                    text_content = self._parse(page_to_text, stored_html)
+                elif self.use_tavily:
+                    # 使用 Tavily API 提取
+                    text_content = extract_page_with_tavily(url)
+                    if not text_content:
+                        logger.warning("[%s/%s] ⚠️ Tavily 提取失败，尝试标准方式...", index, total)
+                        # Fallback 到标准爬虫
+                        raw = self._request_bytes(url, stage="article_fetch")
+                        if not raw:
+                            logger.error("[%s/%s] ❌ 获取失败: %s...", index, total, title[:30])
+                            return None
+                    
+                        # 压缩保存原始 HTML 页面
+                        self.page_store.put_bytes(filename, raw)
+                    
+                        # 在解析进程中将 HTML 转换为纯文本
+                        text_content = self._parse(page_to_text, raw)
+                else:
+                    # 使用标准爬虫方式
+                    raw = self._request_bytes(url, stage="article_fetch")
+                    if not raw:
+                        logger.error("[%s/%s] ❌ 获取失败: %s...", index, total, title[:30])
+                        return None
+                
+                    # 压缩保存原始 HTML 页面
+                    self.page_store.put_bytes(filename, raw)
+                
+                    # 在解析进程中将 HTML 转换为纯文本
+                    text_content = self._parse(page_to_text, raw)
+                
+                # sitemap 发现的文章没有标题，从页面补全（Tavily 提取成功时没有页面，使用链接）
+                if not article["title"]:
+                    page = stored_html if stored_html is not None else raw
+                    article["title"] = (extract_title(decode_html(page, self.encoding)) if page else "") or url
+                
+                if journal:
+                    journal.record(url, "fetched")
+                return text_content
+                
+            except Exception as e:
+                if journal:
+                    journal.record(url, "failed", error=str(e))
+                logger.error("[%s/%s] ❌ 获取出错: %s", index, total, e)
+                return None
+
+    @staticmethod
+    def _article_filename(url: str) -> str:
+        """文章链接对应的文件名（文章编号），同时作为页面存储 ID 与 trace id"""
+        filename = url.split("/")[-1].replace(".html", "")
+        return sanitize_filename(filename) or "article"
+
     def _ai_process_worker(
         self, 
         article: Dict[str, str], 
-        results: List[Dict], 
-        lock: threading.Lock,
+        sink: ResultSink,
         index: int,
-        total: int
+        total: int,
+        journal: Optional[RunJournal] = None,
+        enrich_pool: Optional[PriorityThreadPool] = None,
+        text_content: Optional[str] = None
     ) -> Optional[Dict]:
         """
-        AI 处理工作线程：爬取单篇文章并用 AI 提取结构化数据
+        AI 处理工作线程：用 AI 提取单篇文章的结构化数据并保存
         
         Args:
             article: 文章信息（包含 title, link, date）
-            results: 共享结果列表
-            lock: 线程锁
+            sink: 结果汇集（收集或流式交出）
             index: 当前索引
             total: 总数
+            journal: 运行日志（记录各阶段，续跑时复用已保存的页面）
+            enrich_pool: 分层提取时补充叙述字段的线程池；指定时只做快速提取，
+                保存后把叙述字段补充以低优先级提交到该线程池
+            text_content: 已获取的文章纯文本（为 None 时先在本线程获取）
         """
         url = article["link"]
-        title = article["title"]
+        filename = self._article_filename(url)
         
-        # 预先生成文件名
-        filename = url.split("/")[-1].replace(".html", "")
-        filename = sanitize_filename(filename) or "article"
+        if text_content is None:
+            text_content = self._fetch_article_text(article, index, total, journal)
+            if text_content is None:
+                get_metrics().incr("articles_failed")
+                return None
+        title = article["title"] or url
         
-        print(f"   [{index}/{total}] 🤖 正在处理: {title[:40]}...")
+        logger.info("[%s/%s] 🤖 正在处理: %s...", index, total, title[:40])
         
-        try:
-            # 根据配置选择页面提取方式
-            if self.use_tavily:
-                # 使用 Tavily API 提取
-                text_content = extract_page_with_tavily(url)
-                if not text_content:
-                    print(f"   [{index}/{total}] ⚠️ Tavily 提取失败，尝试标准方式...")
-                    # Fallback 到标准爬虫
-                    html = self._request(url)
-                    if not html:
-                        print(f"   [{index}/{total}] ❌ 获取失败: {title[:30]}...")
-                        return None
+        # 每篇文章一个 trace id（文章编号），其中的解析、AI 调用都归入该 trace 与该文章的用量
+        tracker = get_usage_tracker()
+        with get_tracer().trace(filename), get_tracer().span("article", url=url), tracker.article(filename):
+            try:
+                # 调用 AI 提取结构化数据（优先命中提取缓存）
+                vps_info = self._extract_structured(text_content, tier="fast" if enrich_pool else "full")
+                
+                if vps_info:
+                    if journal:
+                        usage = tracker.article_usage(filename)
+                        journal.record(
+                            url,
+                            "extracted",
+                            tokens=usage["prompt_tokens"] + usage["completion_tokens"],
+                            cost=round(usage["cost"], 6)
+                        )
+                    if enrich_pool:
+                        vps_info["narrative_pending"] = True
+                    # 结果文件落盘后才记为 saved，写入失败记为 failed（续跑时重新处理）
+                    def on_written(error: Optional[BaseException]) -> None:
+                        if not journal:
+                            return
+                        if error is None:
+                            journal.record(url, "saved", file=os.path.join(OUTPUT_CONFIG["raw_dir"], f"{filename}.json"))
+                        else:
+                            journal.record(url, "failed", error=f"结果写入失败: {error}")
                     
-                    # 保存原始 HTML 页面
-                    filename = url.split("/")[-1].replace(".html", "")
-                    filename = sanitize_filename(filename) or "article"
-                    save_to_html(html, filename, OUTPUT_CONFIG["html_dir"])
+                    self._save_extracted(vps_info, url, article.get("date", ""), filename, text_content, on_written)
+                
+                    sink.add(vps_info)
                     
-                    # 将 HTML 转换为纯文本
-                    text_content = html_to_text(html)
-            else:
-                # 使用标准爬虫方式
-                html = self._request(url)
-                if not html:
-                    print(f"   [{index}/{total}] ❌ 获取失败: {title[:30]}...")
-                    return None
+                    # 套餐与价格已保存，叙述字段在后台补充；
+                    # 流式模式下排队的补充任务不持有正文，执行时从页面存储重新读取
+                    if enrich_pool:
+                        keep_text = not sink.stream or self.use_tavily
+                        enrich_pool.submit(
+                            self._enrich_worker, vps_info, text_content if keep_text else None, filename, journal,
+                            priority=(PRIORITY_LOW, index)
+                        )
                 
-                # 保存原始 HTML 页面
-                filename = url.split("/")[-1].replace(".html", "")
-                filename = sanitize_filename(filename) or "article"
-                save_to_html(html, filename, OUTPUT_CONFIG["html_dir"])
+                    get_metrics().incr("articles_ok")
+                    vendor = vps_info.get("vendor", "未知")
+                    logger.info("[%s/%s] ✅ 完成: %s - %s...", index, total, vendor, title[:30])
+                    return vps_info
+                else:
+                    get_metrics().incr("articles_failed")
+                    if journal:
+                        journal.record(url, "failed", error="AI 提取失败")
+                    logger.warning("[%s/%s] ⚠️ AI 提取失败: %s...", index, total, title[:30])
+                    return None
                 
-                # 将 HTML 转换为纯文本
-                text_content = html_to_text(html)
+            except Exception as e:
+                get_metrics().incr("articles_failed")
+                if journal:
+                    journal.record(url, "failed", error=str(e))
+                logger.error("[%s/%s] ❌ 出错: %s", index, total, e)
+                return None
+
+    def _is_new_content(self, text_content: str, tier: str = "full") -> bool:
+        """文章是否为新内容（从未提取过，或内容变化后提取缓存未命中）"""
+        cache_key = extraction_cache_key(text_content, default_model_of(self.provider), tier=tier)
+        return cache_key not in self._get_extract_cache()
+
+    @staticmethod
+    def _recency_ranks(articles: List[Dict[str, str]]) -> List[int]:
+        """按发布日期从新到旧的名次（同一天按列表顺序），作为同一优先级类别内的排序键"""
+        order = sorted(range(len(articles)), key=lambda i: articles[i].get("date", ""), reverse=True)
+        ranks = [0] * len(articles)
+        for rank, i in enumerate(order):
+            ranks[i] = rank
+        return ranks
+
+    def _get_extract_cache(self) -> ExtractionCache:
+        """延迟打开提取缓存（多线程共享）"""
+        with self._extract_cache_lock:
+            if self._extract_cache is None:
+                self._extract_cache = ExtractionCache()
+            return self._extract_cache
+
+    def _extract_structured(self, text_content: str, tier: str = "full") -> Optional[Dict]:
+        """
+        调用 AI 提取结构化数据，优先读取提取缓存
+        
+        缓存键包含模型、提示词与提取层级，修改 Schema 或提示词后会自动重新提取；
+        未命中时经预算控制决定模型，切换为低价模型的结果按实际模型缓存，
+        不会在之后的运行中冒充默认模型的结果
+        
+        Args:
+            text_content: 文章纯文本
+            tier: full 提取全部字段；fast 只提取套餐与价格（叙述字段由 _enrich_structured 补充）
             
-            # 调用 AI 提取结构化数据
-            vps_info = extract_vps_info(text_content)
+        Returns:
+            提取结果字典，失败返回 None
+        """
+        extract_cache = self._get_extract_cache()
+        metrics = get_metrics()
+        default_model = default_model_of(self.provider)
+        cache_key = extraction_cache_key(text_content, default_model, tier=tier)
+        cached = extract_cache.get(cache_key)
+        if cached is not None:
+            metrics.incr("extract_cache_hits")
+            return cached
+        
+        metrics.incr("extract_cache_misses")
+        model = get_usage_tracker().admit(self.provider, default_model)
+        if model is None:
+            logger.error("❌ 已达到本次运行的预算上限，跳过 AI 提取")
+            return None
+        
+        vps_info = extract_vps_info(text_content, model=model, tier=tier, provider=self.provider)
+        if vps_info:
+            if model != default_model:
+                cache_key = extraction_cache_key(text_content, model, tier=tier)
+            extract_cache.put(cache_key, vps_info)
+        return vps_info
+
+    def _enrich_structured(self, text_content: str, vps_info: Dict) -> Optional[Dict]:
+        """
+        补充叙述字段（分层提取的第二遍），优先读取提取缓存
+        
+        按低优先级经预算控制决定模型：预算达到 soft_limit 后不再补充，
+        结果保持 narrative_pending，之后可用 enrich_saved_results 补齐
+        
+        Args:
+            text_content: 文章纯文本
+            vps_info: 快速提取的结果
             
-            if vps_info:
-                vps_info["source_url"] = url
-                vps_info["publish_date"] = article.get("date", "")
+        Returns:
+            叙述字段（merge_narrative 的输入），失败或预算不足返回 None
+        """
+        extract_cache = self._get_extract_cache()
+        metrics = get_metrics()
+        products = vps_info.get("products") or []
+        default_model = default_model_of(self.provider)
+        cache_key = extraction_cache_key(text_content, default_model, tier="narrative", products=products)
+        cached = extract_cache.get(cache_key)
+        if cached is not None:
+            metrics.incr("extract_cache_hits")
+            return cached
+        
+        metrics.incr("extract_cache_misses")
+        model = get_usage_tracker().admit(self.provider, default_model, priority="low")
+        if model is None:
+            return None
+        
+        narrative = enrich_vps_info(text_content, vps_info, model=model, provider=self.provider)
+        if narrative is not None:
+            if model != default_model:
+                cache_key = extraction_cache_key(text_content, model, tier="narrative", products=products)
+            extract_cache.put(cache_key, narrative)
+        return narrative
+
+    def _enrich_worker(
+        self,
+        vps_info: Dict,
+        text_content: Optional[str],
+        filename: str,
+        journal: Optional[RunJournal] = None
+    ) -> bool:
+        """
+        叙述字段补充工作线程：合并到已保存的结果并重新保存
+        
+        Args:
+            vps_info: 已保存的快速提取结果（原地合并）
+            text_content: 文章纯文本（为 None 时从页面存储读取）
+            filename: 结果文件名（不含扩展名，同时作为文章编号）
+            journal: 运行日志（记录 enriched 阶段）
+            
+        Returns:
+            是否补充成功
+        """
+        with get_tracer().trace(filename), get_tracer().span("enrich"), get_usage_tracker().article(filename):
+            try:
+                if text_content is None:
+                    text_content = self._stored_text(filename)
+                if text_content is None:
+                    get_metrics().incr("articles_enrich_deferred")
+                    logger.warning("⚠️ 页面未存储，叙述字段暂未补充: %s", filename)
+                    return False
                 
-                # 保存 JSON
-                save_to_json(vps_info, filename, OUTPUT_CONFIG["raw_dir"])
+                narrative = self._enrich_structured(text_content, vps_info)
+                if narrative is None:
+                    get_metrics().incr("articles_enrich_deferred")
+                    logger.warning("⚠️ 叙述字段暂未补充: %s", filename)
+                    return False
                 
-                with lock:
-                    results.append(vps_info)
+                merged = merge_narrative(vps_info, narrative)
+                vps_info.pop("narrative_pending", None)
                 
-                vendor = vps_info.get("vendor", "未知")
-                print(f"   [{index}/{total}] ✅ 完成: {vendor} - {title[:30]}...")
-                return vps_info
-            else:
-                print(f"   [{index}/{total}] ⚠️ AI 提取失败: {title[:30]}...")
-                return None
+                # 补充后的结果落盘后才记为 enriched
+                def on_written(error: Optional[BaseException]) -> None:
+                    if journal and vps_info.get("source_url") and error is None:
+                        journal.record(vps_info["source_url"], "enriched", products=merged)
                 
-        except Exception as e:
-            print(f"   [{index}/{total}] ❌ 出错: {e}")
-            return None
+                with get_metrics().timer("save"), get_tracer().span("save"):
+                    save_to_json(vps_info, filename, OUTPUT_CONFIG["raw_dir"], on_written)
+                self._index_article(filename, vps_info, text_content)
+                get_metrics().incr("articles_enriched")
+                logger.info("📝 已补充叙述字段: %s（%s 个产品）", filename, merged)
+                return True
+            except Exception as e:
+                get_metrics().incr("articles_enrich_deferred")
+                logger.error("❌ 叙述字段补充出错 [%s]: %s", filename, e)
+                return False
+
+    def _stored_text(self, filename: str) -> Optional[str]:
+        """从页面存储读取文章纯文本（页面可能仍在后台写入队列中，未找到时等待落盘后再读一次）"""
+        html = self.page_store.get(filename)
+        if html is None:
+            flush_writes()
+            html = self.page_store.get(filename)
+        return self._parse(page_to_text, html) if html is not None else None
+
+    def _save_extracted(
+        self,
+        vps_info: Dict,
+        url: str,
+        publish_date: str,
+        filename: str,
+        text_content: Optional[str] = None,
+        on_written: Optional[Callable[[Optional[BaseException]], None]] = None
+    ) -> Dict:
+        """
+        补全来源信息并保存提取结果 JSON，同时写入全文检索索引
+        
+        on_written 在结果文件落盘（或写入失败）后于写入线程中调用，参数为写入异常
+        """
+        vps_info["source_url"] = url
+        vps_info["publish_date"] = publish_date
+        with get_metrics().timer("save"), get_tracer().span("save"):
+            save_to_json(vps_info, filename, OUTPUT_CONFIG["raw_dir"], on_written)
+        self._index_article(filename, vps_info, text_content)
+        return vps_info
+
+    def _get_search_index(self) -> SearchIndex:
+        """延迟打开全文检索索引（多线程共享）"""
+        with self._search_index_lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex()
+            return self._search_index
+
+    def _index_article(self, filename: str, vps_info: Dict, text_content: Optional[str] = None) -> None:
+        """增量写入全文检索索引（内容未变化时跳过），失败只记录警告，不影响结果保存"""
+        try:
+            with get_metrics().timer("search_index"), get_tracer().span("search_index"):
+                if self._get_search_index().add(filename, vps_info, text_content):
+                    get_metrics().incr("search_indexed")
+        except sqlite3.Error as e:
+            logger.warning("⚠️ 全文索引写入失败 [%s]: %s", filename, e)
+
+    def _finish_run(self, results: List[Dict], run_id: Optional[str] = None) -> List[str]:
+        """
+        运行收尾：释放解析进程、等待写入落盘、训练页面字典、追加价格历史、输出用量并保存指标报告
+        
+        Args:
+            results: 本次运行的提取结果
+            run_id: 运行 ID（指标报告文件名），默认使用当前时间
+            
+        Returns:
+            写入失败的文件路径（为空表示全部落盘）
+        """
+        self.close()
+        
+        # 等待后台写入器落盘，首次积累足够页面后训练压缩字典
+        failed = self._flush_writes()
+        self.page_store.train_dictionary()
+        
+        # 追加价格历史
+        if results:
+            with PriceHistory() as history:
+                added = history.record_results(results)
+            logger.info("📈 价格历史新增 %s 个数据点", added)
+        
+        # 分阶段耗时摘要与 JSON 运行报告
+        metrics = get_metrics()
+        logger.info("⏱️  阶段耗时（按累计耗时排序）:")
+        for line in metrics.summary_lines():
+            logger.info("%s", line)
+        
+        # Token 用量与费用（按模型），明细按文章写入指标报告
+        tracker = get_usage_tracker()
+        logger.info("💰 Token 用量与费用:")
+        for line in tracker.summary_lines():
+            logger.info("%s", line)
+        
+        run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_path = metrics.save_report(
+            os.path.join(OUTPUT_CONFIG["metrics_dir"], f"{run_id}.json"),
+            extra={"usage": tracker.report()}
+        )
+        if report_path in flush_writes():
+            logger.error("❌ 指标报告写入失败: %s", report_path)
+        else:
+            logger.info("📊 指标报告: %s", report_path)
+        return failed
+
+    @staticmethod
+    def _flush_writes() -> List[str]:
+        """等待后台写入器落盘，有写入失败的文件时汇总告警"""
+        failed = flush_writes()
+        if failed:
+            logger.error("❌ %s 个文件写入失败: %s", len(failed), ", ".join(failed[:5]))
+        return failed
 
     def pipeline_recent_to_json(
         self,
         days: int = 5,
         scrape_threads: int = 4,
         ai_threads: int = 2,
-        max_pages: int = 50
+        max_pages: int = 50,
+        resume: Optional[str] = None,
+        two_tier: Optional[bool] = None,
+        enrich_threads: int = 1,
+        stream: bool = False,
+        on_result: Optional[Callable[[Dict], None]] = None
     ) -> List[Dict]:
         """
         Pipeline: 爬取最近文章并用 AI 总结为 JSON
         
         流程:
         1. 多线程爬取最近 N 天的文章列表（scrape_threads 个线程）
-        2. 多线程调用 AI 处理每篇文章（ai_threads 个线程）
+        2. 按优先级抓取文章（scrape_threads 个线程）并调用 AI 处理（ai_threads 个线程）：
+           抓取阶段从未抓取过的文章优先，AI 阶段内容有变化（提取缓存未命中）的文章优先，
+           同一类别内按发布日期从新到旧；积压较多时最新的优惠也最先进入数据
         3. 保存结构化数据到 JSON 文件
         
+        每篇文章的阶段（discovered / fetched / extracted / saved）写入运行日志
+        data/runs/<运行 ID>.jsonl；指定 resume 时跳过文章发现与已保存的文章，
+        已抓取的页面从页面存储读取，已提取的结果命中提取缓存
+        
+        分层提取（two_tier）时第二步只提取套餐与价格并立即保存，叙述字段由
+        enrich_threads 个低优先级线程在后台补充后重新保存；运行结束前未补充的
+        结果带有 narrative_pending 标记，可用 enrich_saved_results 补齐
+        
+        流式模式（stream）用于数千篇规模的运行：不保留结果列表，每篇保存后交给 on_result，
+        价格历史按批追加；同时在途文章（抓取中、等待或正在 AI 提取）不超过
+        scrape_threads + 2 × ai_threads 篇，排队的叙述字段补充不持有正文，
+        峰值内存取决于并发数而不是文章数
+        
         Args:
             days: 最近天数（默认 5 天）
-            scrape_threads: 爬取线程数（默认 4）
+            scrape_threads: 爬取线程数（文章列表与文章页面，默认 4）
             ai_threads: AI 处理线程数（默认 2）
             max_pages: 最大爬取页数（默认 50）
+            resume: 要继续的运行 ID（默认开始新运行）
+            two_tier: 是否分层提取，默认按 AI_CONFIG["zhipu"]["extraction_mode"]（续跑时沿用原运行的设置）
+            enrich_threads: 叙述字段补充线程数（默认 1）
+            stream: 是否流式处理（默认 False）
+            on_result: 每篇结果保存后的回调（在 AI 线程中调用；分层提取时为快速提取的结果）
             
         Returns:
-            AI 提取的结构化数据列表
+            AI 提取的结构化数据列表（续跑时包含之前已保存的结果；流式模式下为空列表）
         """
-        print("=" * 80)
-        print("🚀 Pipeline: 爬取最近文章 → AI 提取 → 保存 JSON")
-        print("=" * 80)
-        print(f"   日期范围: 最近 {days} 天")
-        print(f"   爬取线程: {scrape_threads}")
-        print(f"   AI 线程: {ai_threads}")
-        print("=" * 80)
-        print()
-        
-        # 第一步：多线程获取最近文章列表
-        print("📋 第一步：获取最近文章列表")
-        print("-" * 40)
-        articles = self.get_recent_articles(
-            days=days, 
-            max_pages=max_pages, 
-            num_threads=scrape_threads
-        )
-        
-        if not articles:
-            print("😕 没有找到符合条件的文章")
+        if resume and not RunJournal.exists(resume):
+            logger.error("❌ 找不到运行日志: %s", resume)
             return []
         
-        print(f"\n📰 共找到 {len(articles)} 篇文章待处理")
-        print()
+        if two_tier is None:
+            two_tier = AI_CONFIG.get("zhipu", {}).get("extraction_mode", "full") == "two_tier"
         
-        # 第二步：多线程 AI 处理
-        print("🤖 第二步：AI 提取结构化数据")
-        print("-" * 40)
+        journal = RunJournal(resume)
+        if resume:
+            days = journal.params.get("days", days)
+            two_tier = journal.params.get("two_tier", two_tier)
         
-        results: List[Dict] = []
-        lock = threading.Lock()
-        total = len(articles)
+        logger.info("=" * 80)
+        logger.info("🚀 Pipeline: 爬取最近文章 → AI 提取 → 保存 JSON")
+        logger.info("=" * 80)
+        logger.info("运行 ID: %s%s", journal.run_id, '（续跑）' if resume else '')
+        logger.info("日期范围: 最近 %s 天", days)
+        logger.info("爬取线程: %s", scrape_threads)
+        logger.info("AI 线程: %s", ai_threads)
+        if two_tier:
+            logger.info("分层提取: 是（叙述字段补充线程: %s）", enrich_threads)
+        logger.info("=" * 80)
         
-        with ThreadPoolExecutor(max_workers=ai_threads) as executor:
-            futures = {}
-            for i, article in enumerate(articles, 1):
-                future = executor.submit(
-                    self._ai_process_worker,
-                    article,
-                    results,
-                    lock,
-                    i,
-                    total
+        with journal:
+            if resume:
+                # 续跑：文章列表来自日志，已保存的结果直接读取
+                logger.info("📋 第一步：从运行日志恢复文章列表")
+                logger.info("-" * 40)
+                previous = [] if stream else journal.saved_results()
+                articles = journal.pending_articles()
+                logger.info("已完成 %s 篇，剩余 %s 篇", len(journal.articles) - len(articles), len(articles))
+            else:
+                journal.start({"days": days, "max_pages": max_pages, "two_tier": two_tier})
+                previous = []
+                
+                # 第一步：多线程获取最近文章列表
+                logger.info("📋 第一步：获取最近文章列表")
+                logger.info("-" * 40)
+                articles = self.get_recent_articles(
+                    days=days, 
+                    max_pages=max_pages, 
+                    num_threads=scrape_threads
                 )
-                futures[future] = article
+                journal.discovered(articles)
+            
+            if not articles:
+                if resume and journal.articles:
+                    journal.finish()
+                    logger.info("✅ 该运行的所有文章均已完成")
+                    return previous
+                logger.info("😕 没有找到符合条件的文章")
+                return []
+            
+            logger.info("📰 共找到 %s 篇文章待处理", len(articles))
+            logger.info("中断后可使用 --resume %s 继续", journal.run_id)
             
-            # 等待所有任务完成
-            for future in as_completed(futures):
+            # 第二步：按优先级抓取文章并 AI 提取
+            logger.info("🤖 第二步：AI 提取结构化数据")
+            logger.info("-" * 40)
+            
+            sink = ResultSink(stream=stream, on_result=on_result)
+            total = len(articles)
+            tier = "fast" if two_tier else "full"
+            enrich_pool = PriorityThreadPool(enrich_threads, "enrich") if two_tier else None
+            fetch_pool = PriorityThreadPool(scrape_threads, "fetch")
+            ai_pool = PriorityThreadPool(ai_threads, "ai")
+            # 流式模式限制在途文章数：抓取线程在取得名额后才抓取，AI 提取完成后归还，
+            # 已抓取未提取的正文不会随文章数堆积
+            inflight = threading.BoundedSemaphore(scrape_threads + 2 * ai_threads) if stream else None
+            
+            def log_error(article: Dict[str, str]) -> Callable:
+                def callback(future) -> None:
+                    if not future.cancelled() and future.exception() is not None:
+                        logger.error("❌ 处理出错 [%s]: %s", (article["title"] or article["link"])[:30], future.exception())
+                return callback
+            
+            def extract(article: Dict[str, str], index: int, text_content: str) -> None:
                 try:
-                    future.result()
-                except Exception as e:
-                    article = futures[future]
-                    print(f"   ❌ 处理出错 [{article['title'][:30]}]: {e}")
+                    self._ai_process_worker(article, sink, index, total, journal, enrich_pool, text_content)
+                finally:
+                    if inflight:
+                        inflight.release()
+            
+            def fetch_then_extract(article: Dict[str, str], index: int, rank: int) -> None:
+                # 抓取完成后按内容是否变化决定 AI 阶段的优先级：
+                # 新内容（提取缓存未命中）先于内容未变化的文章
+                if inflight:
+                    inflight.acquire()
+                submitted = False
+                try:
+                    text_content = self._fetch_article_text(article, index, total, journal)
+                    if text_content is None:
+                        get_metrics().incr("articles_failed")
+                        return
+                    is_new = self._is_new_content(text_content, tier)
+                    future = ai_pool.submit(
+                        extract, article, index, text_content,
+                        priority=(PRIORITY_HIGH if is_new else PRIORITY_NORMAL, rank)
+                    )
+                    submitted = True
+                    future.add_done_callback(log_error(article))
+                finally:
+                    if inflight and not submitted:
+                        inflight.release()
+            
+            # 抓取阶段：从未抓取过的文章优先，同一类别内按发布日期从新到旧
+            ranks = self._recency_ranks(articles)
+            for i, article in enumerate(articles, 1):
+                is_new = self._article_filename(article["link"]) not in self.page_store
+                fetch_pool.submit(
+                    fetch_then_extract, article, i, ranks[i - 1],
+                    priority=(PRIORITY_HIGH if is_new else PRIORITY_NORMAL, ranks[i - 1])
+                ).add_done_callback(log_error(article))
+            
+            # 等待所有任务完成（抓取全部完成后，AI 任务均已提交）；
+            # 不保留各任务的 Future，流式模式下已完成的结果随即释放
+            try:
+                fetch_pool.shutdown(wait=True)
+                ai_pool.shutdown(wait=True)
+            except KeyboardInterrupt:
+                # 取消尚未开始的任务，已完成的阶段都在运行日志中
+                for pool in (fetch_pool, ai_pool, enrich_pool):
+                    if pool:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                logger.info("⏸️  已中断，使用 --resume %s 继续", journal.run_id)
+                raise
+            
+            # 套餐与价格均已保存，等待后台补充叙述字段
+            if enrich_pool:
+                logger.info("📝 等待叙述字段补充完成...")
+                enrich_pool.shutdown(wait=True)
+                pending = sum(1 for result in sink.results if result.get("narrative_pending"))
+                if pending:
+                    logger.info("📝 %s 篇文章的叙述字段未补充，可使用 --enrich 补齐", pending)
+            
+            if stream:
+                # 价格历史已按批追加；续跑时之前保存的结果逐个读取补录（按主键去重）
+                if resume:
+                    sink.record_history(journal.iter_saved_results())
+                logger.info("📈 价格历史新增 %s 个数据点", sink.close())
+                failed_writes = self._finish_run([], journal.run_id)
+            else:
+                # 续跑时一并补录之前的结果（价格历史按主键去重）
+                failed_writes = self._finish_run(previous + sink.results, journal.run_id)
+            # 有结果写入失败时运行不标记完成，续跑会重新处理对应文章
+            if sink.count == total and not failed_writes:
+                journal.finish()
         
         # 统计结果
-        print()
-        print("=" * 80)
-        print(f"✅ Pipeline 完成！")
-        print(f"   文章总数: {total}")
-        print(f"   成功处理: {len(results)}")
-        print(f"   失败数量: {total - len(results)}")
-        print(f"   输出目录: {OUTPUT_CONFIG['raw_dir']}")
-        print("=" * 80)
+        logger.info("=" * 80)
+        logger.info("✅ Pipeline 完成！")
+        logger.info("文章总数: %s", total)
+        logger.info("成功处理: %s", sink.count)
+        logger.info("失败数量: %s", total - sink.count)
+        if sink.count < total:
+            logger.info("重试失败文章: --resume %s", journal.run_id)
+        logger.info("输出目录: %s", OUTPUT_CONFIG['raw_dir'])
+        logger.info("=" * 80)
+        
+        return previous + sink.results
+
+    def _list_stored_pages(self, run_id: Optional[str] = None) -> List[Tuple[str, Callable[[], bytes]]]:
+        """
+        列出已存储页面的 (页面 ID, 读取压缩字节的函数)，页面内容在调用时才从磁盘读取
+        
+        Args:
+            run_id: 归档运行 ID；为 None 时读取当前 data/html
+        """
+        if run_id is None:
+            return [(page.page_id, page.raw) for page in self.page_store.iter_pages()]
+        
+        archive = ContentArchive()
+        pages = []
+        for rel_path, entry in archive.load_manifest(run_id)["files"].items():
+            dir_name, _, name = rel_path.partition("/")
+            if dir_name != "html":
+                continue
+            page_id = name.split(".", 1)[0]
+            pages.append((page_id, functools.partial(archive.read_object, entry["hash"])))
+        return pages
+
+    def _stored_pages_dictionary(self, run_id: Optional[str] = None) -> Optional[bytes]:
+        """
+        获取解压已存储页面所用的共享字典
+        
+        归档运行优先使用快照中的字典（页面按归档时的字典压缩），
+        旧清单中没有字典时使用当前字典
+        """
+        if run_id is not None:
+            archive = ContentArchive()
+            entry = archive.load_manifest(run_id)["files"].get(PAGE_DICT_ENTRY)
+            if entry:
+                return archive.read_object(entry["hash"])
+        return self.page_store.dictionary_bytes()
+
+    def _reprocess_worker(
+        self,
+        page: Dict[str, str],
+        sink: ResultSink,
+        index: int,
+        total: int
+    ) -> Optional[Dict]:
+        """
+        离线重处理工作线程：对已解析的页面文本调用 AI 提取并保存
+        
+        Args:
+            page: 解析结果（包含 page_id, text, date）
+            sink: 结果汇集（收集或流式交出）
+            index: 当前索引
+            total: 总数
+        """
+        page_id = page["page_id"]
+        if not page["text"]:
+            logger.warning("[%s/%s] ⚠️ 页面无正文: %s", index, total, page_id)
+            return None
+        
+        with get_tracer().trace(page_id), get_tracer().span("reprocess", page_id=page_id), get_usage_tracker().article(page_id):
+            try:
+                vps_info = self._extract_structured(page["text"])
+                if not vps_info:
+                    logger.warning("[%s/%s] ⚠️ AI 提取失败: %s", index, total, page_id)
+                    return None
+                
+                url = f"{self.base_url}/{page_id}.html"
+                self._save_extracted(vps_info, url, page["date"], sanitize_filename(page_id) or "article", page["text"])
+                sink.add(vps_info)
+                logger.info("[%s/%s] ✅ 完成: %s", index, total, page_id)
+                return vps_info
+            except Exception as e:
+                logger.error("[%s/%s] ❌ 出错 [%s]: %s", index, total, page_id, e)
+                return None
+
+    def reprocess_stored_pages(
+        self,
+        run_id: Optional[str] = None,
+        ai_threads: int = 2,
+        stream: bool = False,
+        on_result: Optional[Callable[[Dict], None]] = None
+    ) -> List[Dict]:
+        """
+        离线重处理：从已存储的 HTML 重新提取结构化数据，不发起任何页面请求
+        
+        流程:
+        1. 从 data/html（或指定归档运行）读取压缩页面
+        2. 进程池并行解压、解析、转纯文本（parse_workers 个进程，至少 1 个）
+        3. 线程池调用 AI 提取（ai_threads 个线程，共享提取缓存）
+        4. 补全来源信息并保存 JSON
+        
+        流式模式（stream）下页面按需读取，解析中与等待 / 正在 AI 提取的页面合计不超过
+        解析进程数 + 2 × ai_threads 个，结果不保留（见 pipeline_recent_to_json）
+        
+        Args:
+            run_id: 归档运行 ID，为 None 时使用当前 data/html
+            ai_threads: AI 处理线程数（默认 2）
+            stream: 是否流式处理（默认 False）
+            on_result: 每篇结果保存后的回调（在 AI 线程中调用）
+            
+        Returns:
+            AI 提取的结构化数据列表（流式模式下为空列表）
+        """
+        logger.info("=" * 80)
+        logger.info("♻️  离线重处理: 已存储 HTML → 解析 → AI 提取 → 保存 JSON")
+        logger.info("=" * 80)
+        logger.info("数据来源: %s", '归档运行 ' + run_id if run_id else OUTPUT_CONFIG['html_dir'])
+        logger.info("解析进程: %s", max(self.parse_workers, 1))
+        logger.info("AI 线程: %s", ai_threads)
+        logger.info("=" * 80)
         
+        sink = ResultSink(stream=stream, on_result=on_result)
+        pages = self._list_stored_pages(run_id)
+        total = len(pages)
+        if not total:
+            logger.info("😕 没有找到已存储的页面")
+            return []
+        
+        # 专用解析进程池：页面字典在子进程启动时读取一次，不随每个页面传递
+        parse_pool = self._create_parse_pool(self._stored_pages_dictionary(run_id))
+        window = max(self.parse_workers, 1) + 2 * ai_threads if stream else None
+        parse_futures: Dict[Any, str] = {}
+        in_ai = 0
+        index = 0
+        cond = threading.Condition()
+        
+        # 离线重处理是后台任务：与实时流水线共享本地推理服务时排在最后，页面 ID 大（较新）的先处理
+        with parse_pool, PriorityThreadPool(ai_threads, "reprocess") as ai_pool:
+            def extract(page: Dict[str, str], page_index: int) -> None:
+                nonlocal in_ai
+                try:
+                    self._reprocess_worker(page, sink, page_index, total)
+                finally:
+                    with cond:
+                        in_ai -= 1
+                        cond.notify()
+            
+            def submit_parsed(futures) -> None:
+                # 解析完成一个就提交一个 AI 任务，两级流水线并行
+                nonlocal in_ai, index
+                for future in futures:
+                    page_id = parse_futures.pop(future)
+                    index += 1
+                    try:
+                        page = future.result()
+                    except Exception as e:
+                        logger.error("[%s/%s] ❌ 解析出错 [%s]: %s", index, total, page_id, e)
+                        continue
+                    with cond:
+                        in_ai += 1
+                    ai_pool.submit(
+                        extract, page, index,
+                        priority=(PRIORITY_LOW, -int(page_id) if page_id.isdigit() else 0)
+                    )
+            
+            for page_id, read_raw in pages:
+                # 流式模式：在途页面达到上限时先等待解析完成或 AI 提取腾出名额
+                while window and len(parse_futures) + in_ai >= window:
+                    if parse_futures:
+                        done, _ = wait(parse_futures, return_when=FIRST_COMPLETED)
+                        submit_parsed(done)
+                    else:
+                        with cond:
+                            cond.wait_for(lambda: in_ai < window)
+                parse_futures[parse_pool.submit(parse_stored_page, page_id, read_raw())] = page_id
+            
+            submit_parsed(as_completed(list(parse_futures)))
+        
+        if stream:
+            logger.info("📈 价格历史新增 %s 个数据点", sink.close())
+            self._finish_run([])
+        else:
+            self._finish_run(sink.results)
+        
+        logger.info("=" * 80)
+        logger.info("✅ 重处理完成！")
+        logger.info("页面总数: %s", total)
+        logger.info("成功处理: %s", sink.count)
+        logger.info("失败数量: %s", total - sink.count)
+        logger.info("输出目录: %s", OUTPUT_CONFIG['raw_dir'])
+        logger.info("=" * 80)
+        
+        return sink.results
+
+    def enrich_saved_results(self, ai_threads: int = 1) -> List[Dict]:
+        """
+        按需补充叙述字段：处理 data/raw 中带有 narrative_pending 标记的结果
+        
+        文章正文从页面存储读取，不发起页面请求；页面未存储（如 Tavily 提取）的结果跳过
+        
+        Args:
+            ai_threads: 补充线程数（默认 1）
+            
+        Returns:
+            补充成功的结果列表
+        """
+        raw_dir = OUTPUT_CONFIG["raw_dir"]
+        pending = []
+        if os.path.isdir(raw_dir):
+            for name in sorted(os.listdir(raw_dir)):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    with open(os.path.join(raw_dir, name), "r", encoding="utf-8") as f:
+                        vps_info = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
+                if isinstance(vps_info, dict) and vps_info.get("narrative_pending"):
+                    pending.append((name[:-len(".json")], vps_info))
+        
+        logger.info("=" * 80)
+        logger.info("📝 补充叙述字段: %s 篇待补充", len(pending))
+        logger.info("=" * 80)
+        if not pending:
+            return []
+        
+        results: List[Dict] = []
+        lock = threading.Lock()
+        
+        def worker(filename: str, vps_info: Dict) -> None:
+            html = self.page_store.get(filename)
+            if html is None:
+                logger.warning("⚠️ 页面未存储，跳过: %s", filename)
+                return
+            if self._enrich_worker(vps_info, self._parse(page_to_text, html), filename):
+                with lock:
+                    results.append(vps_info)
+        
+        with PriorityThreadPool(ai_threads, "enrich") as executor:
+            for future in [
+                executor.submit(worker, filename, vps_info, priority=PRIORITY_LOW)
+                for filename, vps_info in pending
+            ]:
+                future.result()
+        
+        self._finish_run(results)
+        logger.info("✅ 已补充 %s / %s 篇", len(results), len(pending))
         return results
 
+    @staticmethod
+    def _saved_article_ids() -> Set[str]:
+        """data/raw 中已保存结果的文章编号（常驻监听时不再重复处理）"""
+        raw_dir = OUTPUT_CONFIG["raw_dir"]
+        if not os.path.isdir(raw_dir):
+            return set()
+        return {name[:-len(".json")] for name in os.listdir(raw_dir) if name.endswith(".json")}
+
+    def watch(
+        self,
+        interval: Optional[float] = None,
+        ai_threads: int = 2,
+        two_tier: Optional[bool] = None,
+        on_update: Optional[Callable[[List[Dict]], None]] = None,
+        max_cycles: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        常驻监听：轮询首页，只处理新文章，每轮结束后增量更新输出
+        
+        - 首页用条件 GET（ETag / Last-Modified），未变化时服务器返回 304，不解析不下载
+        - 轮询间隔自适应：发现新文章后回到最短间隔，无变化时逐步放大到 watch_max_interval，
+          请求失败时按两倍退避
+        - 新文章走与 Pipeline 相同的提取路径（提取缓存、预算、分层提取），新文章优先
+        - HTTP 会话、AI 客户端、解析进程池与提取缓存在各轮之间复用，没有逐次启动的开销
+        - 每轮的结果追加到价格历史，并调用 on_update（如更新 js/config.js 的文件列表）
+        
+        Args:
+            interval: 最短轮询间隔（秒），默认使用 SCRAPE_CONFIG["watch_interval"]
+            ai_threads: AI 处理线程数（默认 2）
+            two_tier: 是否分层提取，默认按 AI_CONFIG["zhipu"]["extraction_mode"]
+            on_update: 每轮有新结果时的回调，参数为本轮结果
+            max_cycles: 最多轮询次数（默认一直运行，Ctrl-C 停止）
+            
+        Returns:
+            监听期间的全部提取结果
+        """
+        min_interval = interval or SCRAPE_CONFIG.get("watch_interval", 120)
+        max_interval = max(SCRAPE_CONFIG.get("watch_max_interval", 1800), min_interval)
+        backoff = SCRAPE_CONFIG.get("watch_backoff", 1.5)
+        max_attempts = SCRAPE_CONFIG.get("watch_max_attempts", 3)
+        if two_tier is None:
+            two_tier = AI_CONFIG.get("zhipu", {}).get("extraction_mode", "full") == "two_tier"
+        
+        logger.info("=" * 80)
+        logger.info("👀 常驻监听: 轮询首页 → 新文章 → AI 提取 → 增量更新")
+        logger.info("=" * 80)
+        logger.info("轮询间隔: %s ~ %s 秒", min_interval, max_interval)
+        logger.info("AI 线程: %s", ai_threads)
+        logger.info("提取方式: %s", "分层（套餐与价格优先）" if two_tier else "完整")
+        logger.info("=" * 80)
+        
+        known = self._saved_article_ids()
+        attempts: Dict[str, int] = {}
+        all_results: List[Dict] = []
+        ai_pool = PriorityThreadPool(ai_threads, "ai")
+        enrich_pool = PriorityThreadPool(1, "enrich") if two_tier else None
+        metrics = get_metrics()
+        wait_seconds = min_interval
+        cycle = 0
+        
+        try:
+            while max_cycles is None or cycle < max_cycles:
+                cycle += 1
+                metrics.incr("watch_polls")
+                try:
+                    raw = self._request_if_changed(self.base_url, stage="watch_poll")
+                except requests.RequestException as e:
+                    wait_seconds = min(wait_seconds * 2, max_interval)
+                    logger.warning("⚠️ 首页请求失败，%.0f 秒后重试: %s", wait_seconds, e)
+                    time.sleep(wait_seconds)
+                    continue
+                
+                new_articles = []
+                if raw is not None:
+                    new_articles = [
+                        article for article in self._parse(parse_articles_with_date, raw, self.base_url)
+                        if self._article_filename(article["link"]) not in known
+                    ]
+                
+                if not new_articles:
+                    wait_seconds = min(wait_seconds * backoff, max_interval)
+                    logger.info("💤 第 %s 轮：%s，%.0f 秒后再次检查",
+                                cycle, "首页未变化" if raw is None else "没有新文章", wait_seconds)
+                else:
+                    logger.info("📰 第 %s 轮：发现 %s 篇新文章", cycle, len(new_articles))
+                    sink = ResultSink()
+                    total = len(new_articles)
+                    ranks = self._recency_ranks(new_articles)
+                    futures = [
+                        ai_pool.submit(
+                            self._ai_process_worker, article, sink, i, total, None, enrich_pool,
+                            priority=(PRIORITY_HIGH, ranks[i - 1])
+                        )
+                        for i, article in enumerate(new_articles, 1)
+                    ]
+                    for future in futures:
+                        future.result()
+                    # 等待结果落盘，写入失败的文章与提取失败同样处理
+                    failed_files = {
+                        os.path.splitext(os.path.basename(path))[0] for path in self._flush_writes()
+                    }
+                    results = [
+                        result for result in sink.results
+                        if self._article_filename(result.get("source_url", "")) not in failed_files
+                    ]
+                    
+                    # 成功的文章不再处理；失败的在首页下次变化时重试，超过次数后放弃
+                    saved = {self._article_filename(result.get("source_url", "")) for result in results}
+                    for article in new_articles:
+                        filename = self._article_filename(article["link"])
+                        attempts[filename] = attempts.get(filename, 0) + 1
+                        if filename in saved or attempts[filename] >= max_attempts:
+                            known.add(filename)
+                    
+                    if results:
+                        with PriceHistory() as history:
+                            added = history.record_results(results)
+                        all_results.extend(results)
+                        if on_update:
+                            on_update(results)
+                        logger.info("✅ 第 %s 轮：新增 %s 篇结果，价格历史新增 %s 个数据点",
+                                    cycle, len(results), added)
+                    wait_seconds = min_interval
+                
+                if max_cycles is None or cycle < max_cycles:
+                    time.sleep(wait_seconds)
+        except KeyboardInterrupt:
+            logger.info("⏹️  已停止监听")
+        finally:
+            ai_pool.shutdown(wait=True)
+            if enrich_pool:
+                enrich_pool.shutdown(wait=True)
+        
+        # 价格历史已逐轮追加，这里只做收尾（落盘、字典训练、指标报告）
+        self._finish_run([])
+        logger.info("👀 监听结束：共 %s 轮，处理 %s 篇新文章", cycle, len(all_results))
+        return all_results
+
+    def _latest_article_id(self) -> Optional[int]:
+        """获取站点最新文章 ID（优先读 RSS 第一条，失败时读列表首页）"""
+        try:
+            for item in self._iter_xml(f"{self.base_url}/feed/", ("item",)):
+                match = _ARTICLE_ID_PATTERN.search(item.get("link", ""))
+                if match:
+                    return int(match.group(1))
+        except (requests.RequestException, ET.ParseError) as e:
+            logger.warning("⚠️ RSS 读取失败: %s", e)
+        
+        ids = []
+        for article in self.get_article_list(1):
+            match = _ARTICLE_ID_PATTERN.search(article["link"])
+            if match:
+                ids.append(int(match.group(1)))
+        return max(ids) if ids else None
+
+    def _backfill_worker(self, article_id: int, limiter: RateLimiter) -> bool:
+        """
+        回填工作线程：限速后请求单个文章 ID 并压缩保存原始页面，页面落盘后才返回（请求计入 backfill_fetch 阶段）
+        
+        Args:
+            article_id: 文章 ID
+            limiter: 共享限速器
+            
+        Returns:
+            True 表示页面已落盘，False 表示该 ID 不是文章（404 或被重定向）
+            
+        Raises:
+            requests.RequestException: 网络错误或非 404 的异常状态码（下次运行重试）
+            OSError: 页面写入失败（下次运行重试）
+        """
+        limiter.acquire()
+        url = f"{self.base_url}/{article_id}.html"
+        response = self._get_response(url, stage="backfill_fetch")
+        if response.status_code in (404, 410):
+            return False
+        response.raise_for_status()
+        # 不存在的 ID 可能被重定向到首页或其他页面
+        if not response.url.rstrip("/").endswith(f"/{article_id}.html"):
+            return False
+        # 等待页面落盘：只有确认写入成功的 ID 才记入断点
+        self.page_store.put_bytes(str(article_id), response.content, wait=True)
+        return True
+
+    def backfill(
+        self,
+        start_id: int = 1,
+        end_id: Optional[int] = None,
+        threads: int = 4,
+        rate: Optional[float] = None,
+        checkpoint_every: int = 100
+    ) -> Dict[str, int]:
+        """
+        全站回填：按文章 ID 区间抓取全部历史页面并压缩保存，支持断点续跑
+        
+        流程:
+        1. 确定 ID 区间（默认 1 ~ 最新文章 ID），跳过断点中已完成的 ID
+        2. 有界并发提交请求，所有线程共享令牌桶限速
+        3. 页面直接写入压缩页面存储；404 / 重定向的 ID 记为不存在
+        4. 每完成 checkpoint_every 个 ID 落盘页面并保存断点，Ctrl-C 中断时同样保存
+        
+        网络错误的 ID 不标记完成，下次运行自动重试。
+        回填只抓取页面，结构化提取使用 --reprocess 离线完成。
+        
+        Args:
+            start_id: 起始文章 ID
+            end_id: 结束文章 ID（默认自动获取最新文章 ID）
+            threads: 并发请求数（默认 4）
+            rate: 每秒请求数（默认 SCRAPE_CONFIG["backfill_rate"]，<= 0 不限速）
+            checkpoint_every: 断点保存间隔（完成的 ID 数）
+            
+        Returns:
+            统计信息 {"stored", "missing", "failed", "remaining"}
+        """
+        rate = SCRAPE_CONFIG.get("backfill_rate", 4.0) if rate is None else rate
+        
+        if end_id is None:
+            end_id = self._latest_article_id()
+            if end_id is None:
+                logger.error("❌ 无法确定最新文章 ID，请使用 --id-range 指定区间")
+                return {"stored": 0, "missing": 0, "failed": 0, "remaining": 0}
+        
+        checkpoint = BackfillCheckpoint()
+        checkpoint.set_range(start_id, end_id)
+        pending = []
+        for article_id in checkpoint.iter_pending(start_id, end_id):
+            if str(article_id) in self.page_store:
+                # 页面已由日常抓取存入页面存储，直接记为已保存
+                checkpoint.mark_done(article_id, stored=True)
+            else:
+                pending.append(article_id)
+        total = end_id - start_id + 1
+        progress = ProgressMeter(total, done=total - len(pending))
+        
+        logger.info("=" * 80)
+        logger.info("🗄️  全站回填: 文章 ID 区间 → 限速并发抓取 → 压缩保存")
+        logger.info("=" * 80)
+        logger.info("ID 区间: %s ~ %s（共 %s 个）", start_id, end_id, total)
+        logger.info("待处理: %s（已完成 %s）", len(pending), total - len(pending))
+        logger.info("并发数: %s，限速: %s 次/秒", threads, rate if rate > 0 else '不限')
+        logger.info("断点文件: %s", checkpoint.path)
+        logger.info("=" * 80)
+        
+        limiter = RateLimiter(rate, burst=threads)
+        failed = 0
+        since_checkpoint = 0
+        
+        def save_checkpoint() -> None:
+            # 工作线程在页面落盘后才返回 True，断点中已保存的 ID 一定有对应页面
+            checkpoint.save()
+        
+        ids = iter(pending)
+        in_flight: Dict[Any, int] = {}
+        executor = ThreadPoolExecutor(max_workers=threads)
+        try:
+            while True:
+                # 有界提交：在途任务最多为并发数的 2 倍，避免一次性创建全部任务
+                while len(in_flight) < threads * 2:
+                    article_id = next(ids, None)
+                    if article_id is None:
+                        break
+                    in_flight[executor.submit(self._backfill_worker, article_id, limiter)] = article_id
+                if not in_flight:
+                    break
+                
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    article_id = in_flight.pop(future)
+                    try:
+                        checkpoint.mark_done(article_id, stored=future.result())
+                    except Exception as e:
+                        # 网络错误或写入页面存储失败都只计为失败，不标记完成，下次运行重试
+                        failed += 1
+                        logger.warning("✗ %s: %s", article_id, e)
+                    progress.advance()
+                    since_checkpoint += 1
+                
+                if since_checkpoint >= checkpoint_every:
+                    save_checkpoint()
+                    since_checkpoint = 0
+                    logger.info("📊 %s，已保存 %s，不存在 %s，失败 %s", progress.format(), checkpoint.stored, checkpoint.missing, failed)
+        except KeyboardInterrupt:
+            logger.info("⏸️  已中断，正在保存断点...")
+            for future in in_flight:
+                future.cancel()
+        finally:
+            executor.shutdown(wait=True)
+            save_checkpoint()
+            self.page_store.train_dictionary()
+        
+        remaining = sum(1 for _ in checkpoint.iter_pending(start_id, end_id))
+        
+        logger.info("=" * 80)
+        logger.info("✅ 回填%s！", '完成' if not remaining else '已暂停')
+        logger.info("已保存页面: %s", checkpoint.stored)
+        logger.info("不存在的 ID: %s", checkpoint.missing)
+        logger.info("本次失败: %s", failed)
+        if remaining:
+            logger.info("剩余 ID: %s（重新运行 --backfill 继续）", remaining)
+        logger.info("页面目录: %s", self.page_store.store_dir)
+        logger.info("=" * 80)
+        
+        return {
+            "stored": checkpoint.stored,
+            "missing": checkpoint.missing,
+            "failed": failed,
+            "remaining": remaining,
+        }
@@ -7,14 +7,19 @@
 from typing import Optional
 import os
 
-from tavily import TavilyClient
-
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from config import API_KEYS
+from config import API_KEYS, AI_CONFIG
+from src.utils.metrics import get_metrics
+from src.utils.tracing import traced
+from src.utils.logger import get_logger
+
+
+logger = get_logger("tavily")
 
 
+@traced("tavily.extract")
 def extract_page_with_tavily(url: str) -> Optional[str]:
     """
     使用 Tavily API 提取页面内容
@@ -28,14 +33,18 @@ def extract_page_with_tavily(url: str) -> Optional[str]:
     # 获取 Tavily API Key
     api_key = API_KEYS.get("tavily", "")
     if not api_key:
-        print("❌ 未配置 Tavily API Key，请设置环境变量 TAVILY_API_KEY")
+        logger.error("❌ 未配置 Tavily API Key，请设置环境变量 TAVILY_API_KEY")
         return None
     
+    metrics = get_metrics()
     try:
-        client = TavilyClient(api_key=api_key)
-        print(f"📡 使用 Tavily API 提取页面: {url}")
+        # SDK 导入较慢，首次调用时才加载（默认的标准爬虫方式不需要）
+        from tavily import TavilyClient
+        client = TavilyClient(api_key=api_key, api_base_url=AI_CONFIG.get("tavily", {}).get("base_url"))
+        logger.info("📡 使用 Tavily API 提取页面: %s", url)
         
-        response = client.extract(urls=[url])
+        with metrics.timer("tavily_extract"):
+            response = client.extract(urls=[url])
         
         # Tavily 返回的结构: {"results": [{"url": "...", "raw_content": "..."}]}
         if response and "results" in response and len(response["results"]) > 0:
@@ -43,17 +52,19 @@ def extract_page_with_tavily(url: str) -> Optional[str]:
             content = result.get("raw_content", "")
             
             if content:
-                print(f"✅ Tavily 提取成功，内容长度: {len(content)} 字符")
+                metrics.incr("tavily_chars", len(content))
+                logger.info("✅ Tavily 提取成功，内容长度: %s 字符", len(content))
                 return content
             else:
-                print("⚠️  Tavily 未返回内容")
+                logger.warning("⚠️  Tavily 未返回内容")
                 return None
         else:
-            print("⚠️  Tavily API 返回结果为空")
+            logger.warning("⚠️  Tavily API 返回结果为空")
             return None
             
     except Exception as e:
-        print(f"❌ Tavily API 调用失败: {e}")
+        metrics.incr("tavily_errors")
+        logger.error("❌ Tavily API 调用失败: %s", e)
         return None
 
 
@@ -0,0 +1,213 @@
+"""
+页面解析函数
+纯函数实现，不依赖爬虫实例，可在子进程中执行
+"""
+import html
+import re
+from typing import Dict, List, Optional, Union
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.storage.page_store import decompress_page
+from src.utils.file_utils import html_to_text
+
+
+# 发布日期匹配规则（按优先级）：OpenGraph 元数据 → <time datetime> → <time> 文本
+_DATE_PATTERNS = [
+    re.compile(r'article:published_time"\s+content="(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'<time[^>]*datetime="(\d{4}-\d{2}-\d{2})'),
+    re.compile(r'<time[^>]*>\s*(\d{4}-\d{2}-\d{2})'),
+]
+
+# 标题匹配规则（按优先级）：OpenGraph 元数据 → 第一个 <h1> → <title>
+_TITLE_PATTERNS = [
+    re.compile(r'<meta[^>]+property="og:title"[^>]+content="([^"]*)"', re.I),
+    re.compile(r'<h1[^>]*>(.*?)</h1>', re.I | re.S),
+    re.compile(r'<title[^>]*>(.*?)</title>', re.I | re.S),
+]
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+# 解析进程内的页面共享字典（进程池初始化时传入一次，不随每个任务跨进程传递）
+_worker_dict_data: Optional[bytes] = None
+
+
+def init_parse_worker(dict_data: Optional[bytes] = None) -> None:
+    """
+    解析进程初始化函数：保存页面共享字典（进程启动时传入一次）
+
+    Args:
+        dict_data: 字典字节（未训练字典时为 None）
+    """
+    global _worker_dict_data
+    _worker_dict_data = dict_data
+
+
+def decode_html(raw: Union[bytes, str], encoding: str = "utf-8") -> str:
+    """将响应字节解码为 HTML 文本（已是文本时原样返回）"""
+    if isinstance(raw, str):
+        return raw
+    return raw.decode(encoding, errors="replace")
+
+
+def _absolute_url(href: str, base_url: str) -> str:
+    """处理相对链接"""
+    if not href.startswith("http"):
+        return f"{base_url}/{href.lstrip('/')}"
+    return href
+
+
+def parse_article_list(raw: Union[bytes, str], base_url: str, selector: str = "h2 > a") -> List[Dict[str, str]]:
+    """
+    解析列表页中的文章链接
+
+    Args:
+        raw: 列表页 HTML（字节或文本）
+        base_url: 站点根 URL
+        selector: 文章链接选择器
+
+    Returns:
+        文章列表，每个元素为 {"title": ..., "link": ...}
+    """
+    from bs4 import BeautifulSoup
+
+    # 传入字节时由 BeautifulSoup 按 <meta charset> 自动识别编码
+    soup = BeautifulSoup(raw, "html.parser")
+    articles = []
+    for link in soup.select(selector):
+        title = link.get_text(strip=True)
+        href = link.get("href", "")
+        if title and href:
+            articles.append({"title": title, "link": _absolute_url(href, base_url)})
+    return articles
+
+
+def parse_articles_with_date(raw: Union[bytes, str], base_url: str) -> List[Dict[str, str]]:
+    """
+    解析列表页中的文章链接及发布日期
+
+    Args:
+        raw: 列表页 HTML（字节或文本）
+        base_url: 站点根 URL
+
+    Returns:
+        包含 title, link, date 的文章列表
+    """
+    from bs4 import BeautifulSoup
+
+    # 传入字节时由 BeautifulSoup 按 <meta charset> 自动识别编码
+    soup = BeautifulSoup(raw, "html.parser")
+    articles = []
+
+    # 查找所有文章元素
+    for article_elem in soup.select("article"):
+        # 提取标题和链接
+        link_elem = article_elem.select_one("h2 > a")
+        if not link_elem:
+            continue
+
+        title = link_elem.get_text(strip=True)
+        href = link_elem.get("href", "")
+        if not title or not href:
+            continue
+
+        # 提取日期
+        time_elem = article_elem.select_one("time")
+        date_str = time_elem.get_text(strip=True) if time_elem else ""
+
+        articles.append({
+            "title": title,
+            "link": _absolute_url(href, base_url),
+            "date": date_str
+        })
+
+    return articles
+
+
+def parse_article(raw: Union[bytes, str], selectors: Dict[str, str]) -> Dict[str, str]:
+    """
+    解析文章页的标题与正文 HTML
+
+    Args:
+        raw: 文章页 HTML（字节或文本）
+        selectors: 站点选择器配置（article_title、article_content）
+
+    Returns:
+        {"title": ..., "content": ...}
+    """
+    from bs4 import BeautifulSoup
+
+    # 传入字节时由 BeautifulSoup 按 <meta charset> 自动识别编码
+    soup = BeautifulSoup(raw, "html.parser")
+
+    # 提取标题
+    title_elem = soup.select_one(selectors.get("article_title", "h1"))
+    title = title_elem.get_text(strip=True) if title_elem else "无标题"
+
+    # 提取正文
+    content_elem = soup.select_one(selectors.get("article_content", "article"))
+    content = str(content_elem) if content_elem else ""
+
+    return {"title": title, "content": content}
+
+
+def page_to_text(raw: Union[bytes, str]) -> str:
+    """将文章页 HTML（字节或文本）转换为供 AI 使用的纯文本"""
+    return html_to_text(raw)
+
+
+def extract_publish_date(html: str) -> str:
+    """
+    从文章页面中提取发布日期（正则匹配，避免为取日期再解析一遍 DOM）
+
+    Args:
+        html: 文章页面 HTML
+
+    Returns:
+        YYYY-MM-DD 格式日期，找不到时返回空字符串
+    """
+    for pattern in _DATE_PATTERNS:
+        match = pattern.search(html)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def extract_title(html_text: str) -> str:
+    """
+    从文章页面中提取标题（正则匹配，避免为取标题再解析一遍 DOM）
+
+    Args:
+        html_text: 文章页面 HTML
+
+    Returns:
+        标题文本，找不到时返回空字符串
+    """
+    for pattern in _TITLE_PATTERNS:
+        match = pattern.search(html_text)
+        if match:
+            title = html.unescape(_TAG_PATTERN.sub("", match.group(1))).strip()
+            if title:
+                return " ".join(title.split())
+    return ""
+
+
+def parse_stored_page(page_id: str, raw: bytes, dict_data: Optional[bytes] = None) -> Dict[str, str]:
+    """
+    解析已存储的压缩页面：解压 → 提取正文文本与发布日期
+
+    Args:
+        page_id: 页面 ID（文章编号）
+        raw: 压缩后的页面字节
+        dict_data: 页面共享压缩字典，默认使用 init_parse_worker 读取的字典
+
+    Returns:
+        {"page_id": ..., "text": ..., "date": ...}
+    """
+    html = decompress_page(raw, dict_data if dict_data is not None else _worker_dict_data)
+    return {
+        "page_id": page_id,
+        "text": html_to_text(html),
+        "date": extract_publish_date(html),
+    }
@@ -0,0 +1,45 @@
+"""
+存储模块入口
+导出数据持久化相关组件（首次访问时才导入：页面存储依赖 zstandard，
+--search、--history 等只用到个别组件的命令不必加载全部依赖）
+"""
+import importlib
+
+_EXPORTS = {
+    "PriceHistory": ".price_history",
+    "plan_fingerprint": ".price_history",
+    "ContentArchive": ".archive",
+    "PageStore": ".page_store",
+    "StoredPage": ".page_store",
+    "decompress_page": ".page_store",
+    "ExtractionCache": ".extract_cache",
+    "BackfillCheckpoint": ".backfill_checkpoint",
+    "RunJournal": ".run_journal",
+    "PlanIndex": ".plan_index",
+    "SearchIndex": ".search_index",
+    "ResultSink": ".result_sink",
+}
+
+__all__ = [
+    "PriceHistory",
+    "plan_fingerprint",
+    "ContentArchive",
+    "PageStore",
+    "StoredPage",
+    "decompress_page",
+    "ExtractionCache",
+    "BackfillCheckpoint",
+    "RunJournal",
+    "PlanIndex",
+    "SearchIndex",
+    "ResultSink",
+]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,262 @@
+"""
+内容寻址的历史数据归档
+文件内容按 SHA-256 去重并以 zstd 压缩存储，每次运行只写一份清单（manifest）
+
+归档目录结构:
+    data/old/objects/<前两位哈希>/<哈希>.zst   压缩后的文件内容
+    data/old/manifests/<运行 ID>.json         该次运行的 相对路径 → 哈希 映射
+
+html 页面以共享字典压缩，含页面的快照同时归档当时的字典（清单路径 PAGE_DICT_ENTRY），
+字典之后被替换或删除时快照中的页面仍可解压
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import List, Dict, Optional, Iterable
+
+import zstandard
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+# 页面共享字典在清单中的相对路径（与 data 目录结构一致，恢复后即为 data/html.zdict）
+PAGE_DICT_ENTRY = "html.zdict"
+
+
+class ContentArchive:
+    """
+    内容寻址归档
+
+    相同内容只存储一次，未变化的文章在新一轮归档中不占用额外空间；
+    恢复或对比任意一次运行只需读取对应的清单
+    """
+
+    def __init__(self, archive_dir: Optional[str] = None, level: int = 10):
+        """
+        初始化归档
+
+        Args:
+            archive_dir: 归档根目录，默认使用 OUTPUT_CONFIG["archive_dir"]
+            level: zstd 压缩级别
+        """
+        self.archive_dir = archive_dir or OUTPUT_CONFIG["archive_dir"]
+        self.objects_dir = os.path.join(self.archive_dir, "objects")
+        self.manifests_dir = os.path.join(self.archive_dir, "manifests")
+        self.level = level
+
+    def _object_path(self, digest: str) -> str:
+        """获取内容哈希对应的对象文件路径"""
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.zst")
+
+    def _manifest_path(self, run_id: str) -> str:
+        """获取运行清单文件路径"""
+        return os.path.join(self.manifests_dir, f"{run_id}.json")
+
+    def archive_dirs(
+        self,
+        base_dir: str,
+        dir_names: Iterable[str],
+        run_id: Optional[str] = None,
+        remove: bool = True,
+        keep_dirs: Iterable[str] = (),
+        extra_files: Optional[Dict[str, str]] = None,
+    ) -> Optional[Dict]:
+        """
+        将若干子目录下的文件一次性归档
+
+        流程：收集并哈希全部文件 → 只压缩写入新内容 → 写入清单 → 删除源文件；
+        清单落盘后才删除源文件，中途失败不会丢数据
+
+        Args:
+            base_dir: 数据根目录（如 data）
+            dir_names: 需要归档的子目录名（如 raw、html、articles）
+            run_id: 运行 ID，默认使用当前时间戳（同一秒内已有清单时追加序号，如 20260101_120000_2）
+            remove: 归档完成后是否删除源文件
+            keep_dirs: 只做快照、不删除源文件的子目录（如持久的页面存储 html）
+            extra_files: 随快照一并归档的单个文件（清单相对路径 → 源文件路径，如页面共享字典），
+                不存在的跳过，从不删除；只有子目录中有文件需要归档时才写入
+
+        Returns:
+            归档清单，没有文件需要归档时返回 None
+
+        Raises:
+            FileExistsError: 指定的运行 ID 已有清单（不覆盖已有的归档）
+        """
+        if run_id and os.path.exists(self._manifest_path(run_id)):
+            raise FileExistsError(f"归档清单已存在: {run_id}")
+
+        # 第一步：收集文件并计算哈希
+        entries: Dict[str, Dict] = {}
+        sources: Dict[str, str] = {}
+        for dir_name in dir_names:
+            src_dir = os.path.join(base_dir, dir_name)
+            if not os.path.isdir(src_dir):
+                continue
+            for filename in sorted(os.listdir(src_dir)):
+                src_file = os.path.join(src_dir, filename)
+                if not os.path.isfile(src_file):
+                    continue
+                with open(src_file, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                entries[f"{dir_name}/{filename}"] = {"hash": digest, "size": len(data)}
+                sources.setdefault(digest, src_file)
+
+        if not entries:
+            return None
+
+        keep_files = set()
+        for rel_path, src_file in (extra_files or {}).items():
+            if not os.path.isfile(src_file):
+                continue
+            with open(src_file, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            entries[rel_path] = {"hash": digest, "size": os.path.getsize(src_file)}
+            sources.setdefault(digest, src_file)
+            keep_files.add(rel_path)
+
+        # 第二步：只写入归档中尚不存在的内容
+        compressor = zstandard.ZstdCompressor(level=self.level)
+        new_objects = 0
+        stored_bytes = 0
+        for digest, src_file in sources.items():
+            object_path = self._object_path(digest)
+            if os.path.exists(object_path):
+                continue
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            with open(src_file, "rb") as f:
+                compressed = compressor.compress(f.read())
+            tmp_path = f"{object_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, object_path)
+            new_objects += 1
+            stored_bytes += len(compressed)
+
+        # 第三步：写入运行清单（不覆盖已有清单）
+        manifest = {
+            "run_id": run_id,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "files": entries,
+            "new_objects": new_objects,
+            "stored_bytes": stored_bytes,
+        }
+        if run_id:
+            if not self._write_manifest(manifest):
+                raise FileExistsError(f"归档清单已存在: {run_id}")
+        else:
+            base_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            manifest["run_id"] = base_id
+            sequence = 1
+            while not self._write_manifest(manifest):
+                sequence += 1
+                manifest["run_id"] = f"{base_id}_{sequence}"
+
+        # 第四步：清单落盘后删除源文件
+        if remove:
+            keep_dirs = set(keep_dirs)
+            for rel_path in entries:
+                if rel_path not in keep_files and rel_path.split("/", 1)[0] not in keep_dirs:
+                    os.remove(os.path.join(base_dir, rel_path))
+
+        return manifest
+
+    def _write_manifest(self, manifest: Dict) -> bool:
+        """
+        原子写入运行清单：写临时文件后以硬链接创建清单，同名清单已存在时不覆盖
+
+        Returns:
+            是否写入（False 表示该运行 ID 已有清单）
+        """
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        manifest_path = self._manifest_path(manifest["run_id"])
+        tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
+        try:
+            os.link(tmp_path, manifest_path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.remove(tmp_path)
+
+    def list_runs(self) -> List[str]:
+        """列出所有归档运行 ID（按时间升序）"""
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        return sorted(
+            name[:-len(".json")]
+            for name in os.listdir(self.manifests_dir)
+            if name.endswith(".json")
+        )
+
+    def load_manifest(self, run_id: str) -> Dict:
+        """
+        读取运行清单
+
+        Raises:
+            FileNotFoundError: 运行 ID 不存在
+        """
+        with open(self._manifest_path(run_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def read_file(self, run_id: str, rel_path: str) -> bytes:
+        """
+        读取某次运行中的单个文件内容
+
+        Args:
+            run_id: 运行 ID
+            rel_path: 相对路径（如 raw/8810.json）
+
+        Returns:
+            解压后的文件内容
+        """
+        entry = self.load_manifest(run_id)["files"][rel_path]
+        return self.read_object(entry["hash"])
+
+    def read_object(self, digest: str) -> bytes:
+        """按内容哈希读取并解压对象"""
+        with open(self._object_path(digest), "rb") as f:
+            return zstandard.ZstdDecompressor().decompress(f.read())
+
+    def restore_run(self, run_id: str, dest_dir: str) -> int:
+        """
+        将某次运行的全部文件恢复到目标目录
+
+        Args:
+            run_id: 运行 ID
+            dest_dir: 目标目录（保留 raw/html/articles 子目录结构）
+
+        Returns:
+            恢复的文件数
+        """
+        files = self.load_manifest(run_id)["files"]
+        for rel_path, entry in files.items():
+            dest_file = os.path.join(dest_dir, rel_path)
+            os.makedirs(os.path.dirname(dest_file), exist_ok=True)
+            with open(dest_file, "wb") as f:
+                f.write(self.read_object(entry["hash"]))
+        return len(files)
+
+    def diff_runs(self, old_run: str, new_run: str) -> Dict[str, List[str]]:
+        """
+        对比两次运行的文件差异（仅比较清单，不读取内容）
+
+        Returns:
+            {"added": [...], "removed": [...], "changed": [...]}
+        """
+        old_files = self.load_manifest(old_run)["files"]
+        new_files = self.load_manifest(new_run)["files"]
+        return {
+            "added": sorted(set(new_files) - set(old_files)),
+            "removed": sorted(set(old_files) - set(new_files)),
+            "changed": sorted(
+                path for path in set(old_files) & set(new_files)
+                if old_files[path]["hash"] != new_files[path]["hash"]
+            ),
+        }
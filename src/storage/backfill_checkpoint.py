@@ -0,0 +1,138 @@
+"""
+全站回填断点
+记录文章 ID 区间内已处理完成的 ID（含不存在的 ID），
+中断后重新运行时跳过已完成部分；已完成 ID 以合并后的区间保存，文件大小与 ID 总数无关
+"""
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+def _merge_intervals(intervals: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """合并重叠或相邻的闭区间"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class BackfillCheckpoint:
+    """
+    回填断点（线程安全）
+
+    文件格式：
+    {
+        "start_id": 1, "end_id": 8812,
+        "done": [[1, 3500], [3502, 4000]],   # 已完成的 ID 闭区间
+        "stored": 2750, "missing": 750        # 已保存页面数 / 不存在的 ID 数
+    }
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        初始化断点（文件存在时自动加载）
+
+        Args:
+            path: 断点文件路径，默认使用 OUTPUT_CONFIG["backfill_checkpoint"]
+        """
+        self.path = path or OUTPUT_CONFIG["backfill_checkpoint"]
+        self.start_id: Optional[int] = None
+        self.end_id: Optional[int] = None
+        self.stored = 0
+        self.missing = 0
+        self._done: List[Tuple[int, int]] = []
+        self._pending_done: List[int] = []
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.start_id = state.get("start_id")
+            self.end_id = state.get("end_id")
+            self.stored = state.get("stored", 0)
+            self.missing = state.get("missing", 0)
+            self._done = [tuple(interval) for interval in state.get("done", [])]
+
+    def set_range(self, start_id: int, end_id: int) -> None:
+        """设置回填的 ID 区间（可扩大，已完成记录保留）"""
+        with self._lock:
+            self.start_id = start_id if self.start_id is None else min(self.start_id, start_id)
+            self.end_id = end_id if self.end_id is None else max(self.end_id, end_id)
+
+    def mark_done(self, article_id: int, stored: bool) -> None:
+        """
+        标记一个 ID 已处理完成
+
+        Args:
+            article_id: 文章 ID
+            stored: True 表示页面已保存，False 表示该 ID 不存在
+        """
+        with self._lock:
+            self._pending_done.append(article_id)
+            if stored:
+                self.stored += 1
+            else:
+                self.missing += 1
+
+    def _compact(self) -> None:
+        """将新完成的 ID 合并进区间列表（调用方持有锁）"""
+        if self._pending_done:
+            self._done = _merge_intervals(self._done + [(i, i) for i in self._pending_done])
+            self._pending_done = []
+
+    def done_count(self) -> int:
+        """已完成的 ID 数量"""
+        with self._lock:
+            self._compact()
+            return sum(end - start + 1 for start, end in self._done)
+
+    def iter_pending(self, start_id: int, end_id: int) -> Iterator[int]:
+        """从新到旧（ID 降序）产出区间内尚未完成的 ID"""
+        with self._lock:
+            self._compact()
+            done = list(self._done)
+        article_id = end_id
+        for start, end in reversed(done):
+            if end < start_id:
+                break
+            while article_id > end:
+                yield article_id
+                article_id -= 1
+            article_id = min(article_id, start - 1)
+        while article_id >= start_id:
+            yield article_id
+            article_id -= 1
+
+    def to_dict(self) -> Dict:
+        """导出断点状态"""
+        with self._lock:
+            self._compact()
+            return {
+                "start_id": self.start_id,
+                "end_id": self.end_id,
+                "done": [list(interval) for interval in self._done],
+                "stored": self.stored,
+                "missing": self.missing,
+            }
+
+    def save(self) -> None:
+        """原子写入断点文件（临时文件 → fsync → os.replace）"""
+        state = self.to_dict()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,71 @@
+"""
+AI 提取结果缓存
+按 (模型, 提示词, 输入文本) 的哈希缓存结构化提取结果，
+文本与提示词都未变化时直接复用，避免重复消耗 token
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+class ExtractionCache:
+    """基于 SQLite 的提取结果缓存（线程安全）"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 文件路径，默认使用 OUTPUT_CONFIG["extract_cache_db"]
+        """
+        self.db_path = db_path or OUTPUT_CONFIG["extract_cache_db"]
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS extractions ("
+            " cache_key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """读取缓存结果（未命中返回 None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM extractions WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __contains__(self, cache_key: str) -> bool:
+        """是否已缓存（不读取结果）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM extractions WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+        return row is not None
+
+    def put(self, cache_key: str, result: Dict) -> None:
+        """写入缓存结果"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extractions VALUES (?, ?, ?)",
+                (cache_key, json.dumps(result, ensure_ascii=False), time.time()),
+            )
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+"""
+压缩页面存储
+原始 HTML 以 zstd 压缩保存，gwvps 页面共享大部分模板，
+因此使用从已存页面训练出的共享字典进一步压缩；读取时按需解压
+"""
+import os
+import threading
+from typing import Iterator, List, Optional
+
+import zstandard
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+from src.utils.file_writer import get_file_writer
+from src.utils.logger import get_logger
+
+
+logger = get_logger("page_store")
+
+# 压缩页面文件扩展名
+PAGE_SUFFIX = ".html.zst"
+
+# 旧版未压缩页面扩展名（只读兼容）
+LEGACY_SUFFIX = ".html"
+
+
+def decompress_page(data: bytes, dict_data: Optional[bytes] = None) -> str:
+    """
+    解压页面内容
+
+    可在子进程中调用：只依赖压缩字节和字典字节，便于跨进程传递
+
+    Args:
+        data: 压缩后的页面字节（未压缩的旧版页面原样解码）
+        dict_data: 共享字典字节，未训练字典时为 None
+
+    Returns:
+        HTML 文本
+    """
+    if not data.startswith(zstandard.FRAME_HEADER):
+        return data.decode("utf-8", errors="replace")
+    if dict_data:
+        decompressor = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dict_data))
+    else:
+        decompressor = zstandard.ZstdDecompressor()
+    return decompressor.decompress(data).decode("utf-8", errors="replace")
+
+
+class StoredPage:
+    """
+    已存储页面的惰性句柄
+
+    创建时不读取文件，访问 html 时才读取并解压
+    """
+
+    def __init__(self, page_id: str, path: str, store: "PageStore"):
+        self.page_id = page_id
+        self.path = path
+        self._store = store
+
+    def raw(self) -> bytes:
+        """读取压缩后的原始字节（不解压）"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    @property
+    def html(self) -> str:
+        """读取并解压页面 HTML"""
+        return decompress_page(self.raw(), self._store.dictionary_bytes())
+
+
+class PageStore:
+    """
+    zstd 压缩的页面存储
+
+    - 页面保存为 <html_dir>/<page_id>.html.zst，通过后台写入器原子落盘
+    - 共享字典保存在 OUTPUT_CONFIG["html_dict"]，训练后不再替换，
+      保证已压缩页面始终可解；字典训练前写入的页面不依赖字典
+    """
+
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        dict_path: Optional[str] = None,
+        level: int = 10,
+    ):
+        """
+        初始化页面存储
+
+        Args:
+            store_dir: 页面目录，默认使用 OUTPUT_CONFIG["html_dir"]
+            dict_path: 共享字典路径，默认使用 OUTPUT_CONFIG["html_dict"]
+            level: zstd 压缩级别
+        """
+        self.store_dir = store_dir or OUTPUT_CONFIG["html_dir"]
+        self.dict_path = dict_path or OUTPUT_CONFIG["html_dict"]
+        self.level = level
+        self._dict_data: Optional[bytes] = None
+        # ZstdCompressor 非线程安全，每个线程持有自己的压缩器
+        self._local = threading.local()
+        self._generation = 0
+
+    def dictionary_bytes(self) -> Optional[bytes]:
+        """读取共享字典字节（不存在时返回 None）"""
+        if self._dict_data is None and os.path.exists(self.dict_path):
+            with open(self.dict_path, "rb") as f:
+                self._dict_data = f.read()
+        return self._dict_data
+
+    def _get_compressor(self) -> zstandard.ZstdCompressor:
+        """获取当前线程的压缩器（有字典时使用字典）"""
+        if getattr(self._local, "generation", None) != self._generation:
+            dict_data = self.dictionary_bytes()
+            if dict_data:
+                self._local.compressor = zstandard.ZstdCompressor(
+                    level=self.level,
+                    dict_data=zstandard.ZstdCompressionDict(dict_data),
+                )
+            else:
+                self._local.compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.generation = self._generation
+        return self._local.compressor
+
+    def _path(self, page_id: str) -> str:
+        """获取页面文件路径"""
+        return os.path.join(self.store_dir, f"{page_id}{PAGE_SUFFIX}")
+
+    def put(self, page_id: str, html: str) -> str:
+        """
+        压缩并保存页面（提交给后台写入器）
+
+        Args:
+            page_id: 页面 ID（如文章编号 8810）
+            html: 原始 HTML
+
+        Returns:
+            页面文件路径
+        """
+        return self.put_bytes(page_id, html.encode("utf-8"))
+
+    def put_bytes(self, page_id: str, raw: bytes, wait: bool = False) -> str:
+        """
+        压缩并保存原始响应字节（无需先解码为文本）
+
+        Args:
+            page_id: 页面 ID
+            raw: 原始 HTML 字节
+            wait: 是否等待页面落盘后再返回（需要确认写入成功时使用）
+
+        Returns:
+            页面文件路径
+
+        Raises:
+            OSError: wait 为 True 且写入失败
+        """
+        filepath = self._path(page_id)
+        data = self._get_compressor().compress(raw)
+        future = get_file_writer().submit(filepath, data)
+        if wait:
+            future.result()
+        return filepath
+
+    def page_ids(self) -> List[str]:
+        """列出已存储的页面 ID（按 ID 排序）"""
+        if not os.path.isdir(self.store_dir):
+            return []
+        ids = set()
+        for name in os.listdir(self.store_dir):
+            if name.endswith(PAGE_SUFFIX):
+                ids.add(name[:-len(PAGE_SUFFIX)])
+            elif name.endswith(LEGACY_SUFFIX):
+                ids.add(name[:-len(LEGACY_SUFFIX)])
+        return sorted(ids)
+
+    def open(self, page_id: str) -> Optional[StoredPage]:
+        """获取页面的惰性句柄（不存在时返回 None）"""
+        for path in (self._path(page_id), os.path.join(self.store_dir, f"{page_id}{LEGACY_SUFFIX}")):
+            if os.path.exists(path):
+                return StoredPage(page_id, path, self)
+        return None
+
+    def get(self, page_id: str) -> Optional[str]:
+        """读取并解压页面 HTML（不存在时返回 None）"""
+        page = self.open(page_id)
+        return page.html if page else None
+
+    def __contains__(self, page_id: str) -> bool:
+        return self.open(page_id) is not None
+
+    def iter_pages(self) -> Iterator[StoredPage]:
+        """逐个产出已存储页面的惰性句柄"""
+        for page_id in self.page_ids():
+            page = self.open(page_id)
+            if page:
+                yield page
+
+    def train_dictionary(self, min_samples: int = 16, dict_size: int = 112640) -> bool:
+        """
+        使用已存储页面训练共享字典（已有字典时不做任何事）
+
+        Args:
+            min_samples: 训练所需的最少页面数
+            dict_size: 字典大小（字节）
+
+        Returns:
+            是否训练并保存了新字典
+        """
+        if self.dictionary_bytes():
+            return False
+
+        samples = [page.html.encode("utf-8") for page in self.iter_pages()]
+        if len(samples) < min_samples:
+            return False
+
+        try:
+            dictionary = zstandard.train_dictionary(dict_size, samples)
+        except zstandard.ZstdError as e:
+            logger.warning("⚠️ 页面字典训练失败: %s", e)
+            return False
+
+        dict_dir = os.path.dirname(self.dict_path)
+        if dict_dir:
+            os.makedirs(dict_dir, exist_ok=True)
+        tmp_path = f"{self.dict_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dictionary.as_bytes())
+        os.replace(tmp_path, self.dict_path)
+
+        self._dict_data = dictionary.as_bytes()
+        self._generation += 1
+        logger.info("✅ 已训练页面压缩字典（%s 个样本，%s 字节）", len(samples), len(self._dict_data))
+        return True
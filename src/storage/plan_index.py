@@ -0,0 +1,470 @@
+"""
+套餐查询索引与只读 HTTP 接口
+从 data/raw 一次性加载全部提取结果，按套餐展开并建立内存索引（商家 / 地区的倒排表，
+价格 / 内存 / CPU / 带宽的有序数组），筛选规则与看板 DataManager.filter 一致；
+客户端只取回匹配的套餐，按 ETag 条件请求，数据未变化时返回 304
+"""
+import bisect
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG, API_CONFIG
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+logger = get_logger("plan_index")
+
+# 看板配置（地区关键词表 COUNTRY_DICT 的唯一来源）
+_JS_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "js", "config.js"
+)
+
+# 按年折算价格的周期倍数（与看板一致，其他周期不参与价格筛选）
+_YEARLY_FACTORS = {"年": 1, "月": 12, "季": 4, "半年": 2}
+
+# 数值筛选字段：查询参数 → (行字段, 比较方向)
+_NUMERIC_FILTERS = {
+    "max_price": ("yearly_price", "max"),
+    "min_ram": ("memory_gb", "min"),
+    "min_cpu": ("cpu_cores", "min"),
+    "min_bandwidth": ("bandwidth_mbps", "min"),
+}
+
+# 排序方式：参数 → (行字段, 是否降序)
+_SORTS = {
+    "price": ("yearly_price", False),
+    "ram": ("memory_gb", True),
+    "cpu": ("cpu_cores", True),
+    "bandwidth": ("bandwidth_mbps", True),
+    "date": ("publish_date", True),
+}
+
+
+def load_country_dict(path: str = _JS_CONFIG_PATH) -> Dict[str, List[str]]:
+    """
+    从看板的 js/config.js 读取地区关键词表（COUNTRY_DICT），保证与前端的地区归类一致
+
+    Returns:
+        {地区: [关键词, ...]}，读取失败返回空字典（所有有位置信息的套餐归为 Other）
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        match = re.search(r"COUNTRY_DICT\s*=\s*(\{.*?\n\});", content, re.DOTALL)
+        if not match:
+            raise ValueError("未找到 COUNTRY_DICT")
+        body = re.sub(r"//[^\n]*", "", match.group(1))
+        body = re.sub(r"'((?:[^'\\\n]|\\.)*)'", lambda m: json.dumps(m.group(1)), body)
+        body = re.sub(r",\s*([}\]])", r"\1", body)
+        return json.loads(body)
+    except (OSError, ValueError) as e:
+        logger.warning("⚠️ 地区关键词表读取失败，地区筛选不可用: %s", e)
+        return {}
+
+
+def match_region(location: Optional[str], country_dict: Dict[str, List[str]]) -> Optional[str]:
+    """按关键词子串匹配地区（不区分大小写），无位置信息返回 None，未匹配返回 Other"""
+    if not location:
+        return None
+    lower = location.lower()
+    for country, keywords in country_dict.items():
+        if any(keyword.lower() in lower for keyword in keywords):
+            return country
+    return "Other"
+
+
+def _number(value: Any) -> Optional[float]:
+    """数值字段转 float，非数值返回 None"""
+    if isinstance(value, bool) or value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _memory_gb(memory: Any) -> Optional[float]:
+    """内存折算为 GB"""
+    if not isinstance(memory, dict):
+        return None
+    value = _number(memory.get("value"))
+    if value is None:
+        return None
+    unit = str(memory.get("unit") or "").strip().lower()
+    if unit in ("mb", "m", "mib"):
+        return value / 1024
+    if unit in ("tb", "t", "tib"):
+        return value * 1024
+    return value
+
+
+def _bandwidth_mbps(bandwidth: Any) -> Optional[float]:
+    """带宽折算为 Mbps"""
+    if not isinstance(bandwidth, dict):
+        return None
+    value = _number(bandwidth.get("value"))
+    if value is None:
+        return None
+    unit = re.sub(r"\s+", "", str(bandwidth.get("unit") or "").lower())
+    if "gbps" in unit or "gb/s" in unit or "gbit" in unit or unit == "g":
+        return value * 1000
+    if "kbps" in unit or "kb/s" in unit or "kbit" in unit:
+        return value / 1000
+    return value
+
+
+def _yearly_price(price: Any) -> Optional[float]:
+    """多周期价格中按年折算后的最低价，没有可折算的周期返回 None"""
+    prices = price if isinstance(price, list) else [price]
+    yearly = [
+        _number(item.get("value")) * _YEARLY_FACTORS[item.get("period")]
+        for item in prices
+        if isinstance(item, dict) and item.get("period") in _YEARLY_FACTORS and _number(item.get("value")) is not None
+    ]
+    return min(yearly) if yearly else None
+
+
+class PlanIndex:
+    """
+    套餐内存索引
+
+    - 每个套餐一行，带所属产品与文章信息，以及折算后的年价、内存（GB）、CPU 核数、带宽（Mbps）
+    - 重新加载时构建新快照后整体替换，查询无需加锁
+    - 版本号由结果文件的名称、大小与修改时间计算，用作 ETag
+    """
+
+    def __init__(self, raw_dir: Optional[str] = None, country_dict: Optional[Dict[str, List[str]]] = None):
+        """
+        初始化索引（不加载数据，首次查询前调用 load）
+
+        Args:
+            raw_dir: 提取结果目录，默认使用 OUTPUT_CONFIG["raw_dir"]
+            country_dict: 地区关键词表，默认读取 js/config.js
+        """
+        self.raw_dir = raw_dir or OUTPUT_CONFIG["raw_dir"]
+        self.country_dict = country_dict if country_dict is not None else load_country_dict()
+        self._snapshot: Dict[str, Any] = self._build([], "")
+        self._reload_lock = threading.Lock()
+        self._dir_mtime: Optional[int] = None
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> str:
+        """当前数据版本"""
+        return self._snapshot["version"]
+
+    def _rows_from_result(self, result: Dict) -> List[Dict]:
+        """把一篇文章的提取结果展开为套餐行"""
+        rows = []
+        for product in result.get("products") or []:
+            if not isinstance(product, dict):
+                continue
+            for plan in product.get("plans") or []:
+                if not isinstance(plan, dict):
+                    continue
+                cpu = plan.get("cpu") if isinstance(plan.get("cpu"), dict) else {}
+                rows.append({
+                    "vendor": product.get("vendor"),
+                    "product_name": product.get("product_name"),
+                    "location": product.get("location"),
+                    "region": match_region(product.get("location"), self.country_dict),
+                    "purchase_url": product.get("purchase_url"),
+                    "coupon_code": product.get("coupon_code"),
+                    "source_url": result.get("source_url"),
+                    "source_title": result.get("article_title"),
+                    "publish_date": result.get("publish_date") or "",
+                    "yearly_price": _yearly_price(plan.get("price")),
+                    "memory_gb": _memory_gb(plan.get("memory")),
+                    "cpu_cores": _number(cpu.get("cores")),
+                    "bandwidth_mbps": _bandwidth_mbps(plan.get("bandwidth")),
+                    "plan": plan,
+                })
+        return rows
+
+    @staticmethod
+    def _build(rows: List[Dict], version: str) -> Dict[str, Any]:
+        """构建索引快照：商家 / 地区倒排表与数值字段的有序数组"""
+        by_vendor: Dict[str, List[int]] = {}
+        by_region: Dict[str, List[int]] = {}
+        for row_id, row in enumerate(rows):
+            by_vendor.setdefault(row["vendor"] or "", []).append(row_id)
+            by_region.setdefault(row["region"] or "", []).append(row_id)
+
+        # 缺失值与看板一致：内存 / CPU / 带宽按 0 计，年价按无穷大计
+        sorted_fields: Dict[str, Tuple[List[float], List[int]]] = {}
+        for field, direction in _NUMERIC_FILTERS.values():
+            default = float("inf") if direction == "max" else 0.0
+            pairs = sorted(
+                (row[field] if row[field] is not None else default, row_id)
+                for row_id, row in enumerate(rows)
+            )
+            sorted_fields[field] = ([value for value, _ in pairs], [row_id for _, row_id in pairs])
+
+        return {
+            "rows": rows,
+            "by_vendor": by_vendor,
+            "by_region": by_region,
+            "sorted": sorted_fields,
+            "version": version,
+        }
+
+    def load(self) -> int:
+        """
+        从结果目录加载全部结果并替换索引
+
+        Returns:
+            套餐行数
+        """
+        start = time.perf_counter()
+        rows: List[Dict] = []
+        signature = hashlib.sha1()
+        files = 0
+        if os.path.isdir(self.raw_dir):
+            self._dir_mtime = os.stat(self.raw_dir).st_mtime_ns
+            for entry in sorted(os.scandir(self.raw_dir), key=lambda e: e.name):
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                signature.update(f"{entry.name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+                try:
+                    with open(entry.path, "r", encoding="utf-8") as f:
+                        result = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning("⚠️ 跳过无法读取的结果: %s - %s", entry.name, e)
+                    continue
+                if isinstance(result, dict):
+                    rows.extend(self._rows_from_result(result))
+                    files += 1
+
+        self._snapshot = self._build(rows, signature.hexdigest()[:16])
+        self._checked_at = time.monotonic()
+        logger.info("📇 已加载 %s 个文件，%s 个套餐（%.1f ms）",
+                    files, len(rows), (time.perf_counter() - start) * 1000)
+        return len(rows)
+
+    def reload_if_changed(self, min_interval: Optional[float] = None) -> bool:
+        """
+        结果目录有变化（如 --watch 写入了新结果）时重新加载
+
+        原子写入以改名落盘，目录修改时间随之变化；距离上次检查不足 min_interval 秒时不检查
+
+        Returns:
+            是否重新加载
+        """
+        if min_interval is None:
+            min_interval = API_CONFIG.get("reload_interval", 5)
+        if time.monotonic() - self._checked_at < min_interval:
+            return False
+        with self._reload_lock:
+            self._checked_at = time.monotonic()
+            try:
+                mtime = os.stat(self.raw_dir).st_mtime_ns
+            except OSError:
+                return False
+            if mtime == self._dir_mtime:
+                return False
+            self.load()
+            return True
+
+    def query(
+        self,
+        vendor: Optional[str] = None,
+        region: Optional[str] = None,
+        max_price: Optional[float] = None,
+        min_ram: Optional[float] = None,
+        min_cpu: Optional[float] = None,
+        min_bandwidth: Optional[float] = None,
+        sort: str = "price",
+        page: int = 1,
+        page_size: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        按条件筛选套餐并分页
+
+        先取商家 / 地区倒排表，再用有序数组二分得到各数值条件的候选集合，
+        从最小的集合开始求交集
+
+        Args:
+            vendor: 商家（精确匹配）
+            region: 地区（COUNTRY_DICT 中的名称或 Other）
+            max_price: 按年折算的最高价格
+            min_ram: 最小内存（GB）
+            min_cpu: 最少 CPU 核数
+            min_bandwidth: 最小带宽（Mbps）
+            sort: 排序方式（price 升序；ram / cpu / bandwidth / date 降序）
+            page: 页码（从 1 开始）
+            page_size: 每页条数，默认 API_CONFIG["page_size"]，不超过 max_page_size
+
+        Returns:
+            {"total", "page", "page_size", "version", "items"}
+
+        Raises:
+            ValueError: 参数不合法
+        """
+        if sort not in _SORTS:
+            raise ValueError(f"不支持的排序方式: {sort}（可选 {', '.join(_SORTS)}）")
+        if page < 1:
+            raise ValueError("page 必须从 1 开始")
+        page_size = page_size or API_CONFIG.get("page_size", 50)
+        page_size = max(1, min(page_size, API_CONFIG.get("max_page_size", 500)))
+
+        snapshot = self._snapshot
+        rows = snapshot["rows"]
+        candidates: List[set] = []
+        if vendor:
+            candidates.append(set(snapshot["by_vendor"].get(vendor, ())))
+        if region:
+            candidates.append(set(snapshot["by_region"].get(region, ())))
+
+        limits = {"max_price": max_price, "min_ram": min_ram, "min_cpu": min_cpu, "min_bandwidth": min_bandwidth}
+        for name, limit in limits.items():
+            # 与看板一致：0 或未指定表示不限
+            if not limit:
+                continue
+            field, direction = _NUMERIC_FILTERS[name]
+            values, ids = snapshot["sorted"][field]
+            if direction == "max":
+                candidates.append(set(ids[:bisect.bisect_right(values, limit)]))
+            else:
+                candidates.append(set(ids[bisect.bisect_left(values, limit):]))
+
+        if candidates:
+            candidates.sort(key=len)
+            matched = set.intersection(*candidates)
+        else:
+            matched = set(range(len(rows)))
+
+        field, descending = _SORTS[sort]
+        present = [row_id for row_id in matched if rows[row_id][field] is not None]
+        missing = sorted(row_id for row_id in matched if rows[row_id][field] is None)
+        present.sort(key=lambda row_id: (rows[row_id][field], -row_id if descending else row_id), reverse=descending)
+        ordered = present + missing
+
+        start = (page - 1) * page_size
+        return {
+            "total": len(ordered),
+            "page": page,
+            "page_size": page_size,
+            "version": snapshot["version"],
+            "items": [rows[row_id] for row_id in ordered[start:start + page_size]],
+        }
+
+    def vendors(self) -> List[Dict[str, Any]]:
+        """商家列表（按名称排序）与套餐数"""
+        by_vendor = self._snapshot["by_vendor"]
+        return [{"vendor": name, "plans": len(ids)} for name, ids in sorted(by_vendor.items()) if name]
+
+    def regions(self) -> List[Dict[str, Any]]:
+        """地区列表（按名称排序）与套餐数"""
+        by_region = self._snapshot["by_region"]
+        return [{"region": name, "plans": len(ids)} for name, ids in sorted(by_region.items()) if name]
+
+    def stats(self) -> Dict[str, Any]:
+        """商家数、产品数、套餐数与数据版本"""
+        rows = self._snapshot["rows"]
+        return {
+            "vendors": len(self.vendors()),
+            "products": len({(row["source_url"], row["vendor"], row["product_name"]) for row in rows}),
+            "plans": len(rows),
+            "version": self.version,
+        }
+
+    def handle(self, path: str) -> Tuple[int, Any, str]:
+        """
+        处理一次 GET 请求（与 HTTP 层解耦，便于测试）
+
+        路由：/api/plans（筛选与分页）、/api/vendors、/api/regions、/api/stats
+
+        Returns:
+            (状态码, 响应对象, ETag)；ETag 由数据版本与规范化后的查询参数计算
+        """
+        parts = urlsplit(path)
+        params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        route = parts.path.rstrip("/")
+        canonical = json.dumps([route, sorted(params.items())], ensure_ascii=False)
+        etag = '"%s-%s"' % (self.version, hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:12])
+
+        if route == "/api/plans":
+            try:
+                numbers = {
+                    name: float(params[name]) for name in _NUMERIC_FILTERS if params.get(name)
+                }
+                body = self.query(
+                    vendor=params.get("vendor") or None,
+                    region=params.get("region") or None,
+                    sort=params.get("sort", "price"),
+                    page=int(params.get("page", 1)),
+                    page_size=int(params["page_size"]) if params.get("page_size") else None,
+                    **numbers
+                )
+            except ValueError as e:
+                return 400, {"error": str(e)}, ""
+            return 200, body, etag
+        if route == "/api/vendors":
+            return 200, self.vendors(), etag
+        if route == "/api/regions":
+            return 200, self.regions(), etag
+        if route == "/api/stats":
+            return 200, self.stats(), etag
+        return 404, {"error": f"未知路径: {parts.path}"}, ""
+
+    def serve(self, port: Optional[int] = None, host: Optional[str] = None) -> "ThreadingHTTPServer":
+        """
+        在后台线程启动只读查询接口
+
+        每个请求先检查结果目录是否有变化（间隔 API_CONFIG["reload_interval"]），
+        If-None-Match 与当前 ETag 相同时返回 304
+
+        Args:
+            port: 监听端口，默认 API_CONFIG["port"]
+            host: 监听地址，默认 API_CONFIG["host"]（仅本机）
+
+        Returns:
+            HTTP 服务器实例（调用 shutdown() 停止）
+        """
+        # http.server 连带导入 email、ssl 等模块，只在启动查询接口时加载
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        index = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                index.reload_if_changed()
+                status, body, etag = index.handle(self.path)
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.send_header("Access-Control-Allow-Origin", "*")
+                if etag:
+                    self.send_header("ETag", etag)
+                    self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                # 查询请求不输出到控制台
+                pass
+
+        server = ThreadingHTTPServer(
+            (host or API_CONFIG.get("host", "127.0.0.1"), port or API_CONFIG.get("port", 8787)), _Handler
+        )
+        threading.Thread(target=server.serve_forever, name="plan-api", daemon=True).start()
+        return server
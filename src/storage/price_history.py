@@ -0,0 +1,271 @@
+"""
+套餐价格历史存储
+以套餐指纹为键的追加式时间序列，基于 SQLite 索引支持按商家/套餐/日期的范围查询
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Optional, Iterable, Any
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    fingerprint  TEXT PRIMARY KEY,
+    vendor       TEXT NOT NULL,
+    vendor_key   TEXT NOT NULL,
+    product_name TEXT,
+    location     TEXT,
+    plan_name    TEXT,
+    spec         TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_plans_vendor ON plans(vendor_key);
+
+CREATE TABLE IF NOT EXISTS price_points (
+    fingerprint  TEXT NOT NULL,
+    publish_date TEXT NOT NULL,
+    price        REAL,
+    currency     TEXT,
+    period       TEXT,
+    source_url   TEXT NOT NULL,
+    PRIMARY KEY (fingerprint, publish_date, source_url)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_points_date ON price_points(publish_date);
+"""
+
+
+def _spec_value(spec: Optional[dict], *keys: str) -> str:
+    """读取嵌套规格字段（如 memory.value），缺失时返回空字符串"""
+    if not isinstance(spec, dict):
+        return ""
+    return "/".join(str(spec.get(key) if spec.get(key) is not None else "") for key in keys)
+
+
+def _plan_spec(plan: dict) -> Dict[str, str]:
+    """提取套餐中除价格以外的规格字段，作为指纹的组成部分"""
+    return {
+        "cpu": _spec_value(plan.get("cpu"), "cores"),
+        "memory": _spec_value(plan.get("memory"), "value", "unit"),
+        "storage": _spec_value(plan.get("storage"), "value", "unit", "type"),
+        "bandwidth": _spec_value(plan.get("bandwidth"), "value", "unit"),
+        "traffic": _spec_value(plan.get("traffic"), "value", "unit"),
+    }
+
+
+def _plan_prices(plan: dict) -> List[dict]:
+    """读取套餐价格，兼容单个价格对象和多周期价格列表两种结构"""
+    price = plan.get("price")
+    if isinstance(price, list):
+        return [p for p in price if isinstance(p, dict)]
+    if isinstance(price, dict):
+        return [price]
+    return [{}]
+
+
+def plan_fingerprint(product: dict, plan: dict, period: Optional[str] = None) -> str:
+    """
+    计算套餐指纹
+
+    指纹由商家、产品、机房、套餐名及硬件规格决定，不包含价格，
+    因此同一套餐在不同文章中的调价会落到同一条时间序列上；
+    月付、年付等不同计费周期各自独立成序列
+
+    Args:
+        product: 产品字典（包含 vendor、product_name、location）
+        plan: 套餐字典
+        period: 计费周期，默认取套餐首个价格的周期
+
+    Returns:
+        16 位十六进制指纹
+    """
+    if period is None:
+        period = _plan_prices(plan)[0].get("period")
+    key = {
+        "period": period or "",
+        "vendor": (product.get("vendor") or "").strip().lower(),
+        "product_name": (product.get("product_name") or "").strip().lower(),
+        "location": (product.get("location") or "").strip().lower(),
+        "plan_name": (plan.get("name") or "").strip().lower(),
+        **_plan_spec(plan),
+    }
+    raw = json.dumps(key, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class PriceHistory:
+    """
+    套餐价格历史库
+
+    - plans 表：指纹 → 商家/产品/套餐描述（每个套餐一行）
+    - price_points 表：(指纹, 发布日期, 来源) → 价格，只追加不修改
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化价格历史库
+
+        Args:
+            db_path: SQLite 文件路径，默认使用 OUTPUT_CONFIG["history_db"]
+        """
+        self.db_path = db_path or OUTPUT_CONFIG["history_db"]
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "PriceHistory":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record_results(self, results: Iterable[Dict[str, Any]]) -> int:
+        """
+        批量记录 AI 提取结果中的套餐价格
+
+        同一 (指纹, 日期, 来源) 重复记录会被忽略，因此可安全地重复导入
+
+        Args:
+            results: 提取结果列表（包含 products、publish_date、source_url）
+
+        Returns:
+            新增的价格点数量
+        """
+        plan_rows = []
+        point_rows = []
+
+        for result in results:
+            source_url = result.get("source_url") or ""
+            publish_date = result.get("publish_date") or ""
+            # 兼容旧版单产品结构（字段直接位于顶层）
+            products = result.get("products") or [result]
+
+            for product in products:
+                vendor = (product.get("vendor") or "").strip()
+                if not vendor:
+                    continue
+                for plan in product.get("plans") or []:
+                    if not isinstance(plan, dict):
+                        continue
+                    spec = json.dumps(_plan_spec(plan), ensure_ascii=False)
+                    for price in _plan_prices(plan):
+                        fingerprint = plan_fingerprint(product, plan, price.get("period"))
+                        plan_rows.append((
+                            fingerprint,
+                            vendor,
+                            vendor.lower(),
+                            product.get("product_name"),
+                            product.get("location"),
+                            plan.get("name"),
+                            spec,
+                        ))
+                        point_rows.append((
+                            fingerprint,
+                            publish_date,
+                            price.get("value"),
+                            price.get("currency"),
+                            price.get("period"),
+                            source_url,
+                        ))
+
+        if not point_rows:
+            return 0
+
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO plans VALUES (?, ?, ?, ?, ?, ?, ?)",
+                plan_rows,
+            )
+            plans_added = self._conn.total_changes - before
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO price_points VALUES (?, ?, ?, ?, ?, ?)",
+                point_rows,
+            )
+            return self._conn.total_changes - before - plans_added
+
+    def import_raw_dir(self, raw_dir: Optional[str] = None) -> int:
+        """
+        从 JSON 结果目录导入历史（用于首次建库或重建索引）
+
+        Args:
+            raw_dir: JSON 目录，默认使用 OUTPUT_CONFIG["raw_dir"]
+
+        Returns:
+            新增的价格点数量
+        """
+        raw_dir = raw_dir or OUTPUT_CONFIG["raw_dir"]
+        if not os.path.isdir(raw_dir):
+            return 0
+
+        results = []
+        for filename in sorted(os.listdir(raw_dir)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(raw_dir, filename), "r", encoding="utf-8") as f:
+                try:
+                    results.append(json.load(f))
+                except json.JSONDecodeError:
+                    continue
+        return self.record_results(results)
+
+    def query(
+        self,
+        vendor: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        按商家/指纹/日期范围查询价格点
+
+        Args:
+            vendor: 商家名称（不区分大小写）
+            fingerprint: 套餐指纹
+            since: 起始日期（含），格式 YYYY-MM-DD
+            until: 截止日期（含），格式 YYYY-MM-DD
+
+        Returns:
+            价格点列表，按指纹、发布日期升序排列
+        """
+        conditions = []
+        params: List[str] = []
+        if vendor:
+            conditions.append("p.vendor_key = ?")
+            params.append(vendor.strip().lower())
+        if fingerprint:
+            conditions.append("p.fingerprint = ?")
+            params.append(fingerprint)
+        if since:
+            conditions.append("pp.publish_date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("pp.publish_date <= ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"""
+            SELECT p.fingerprint, p.vendor, p.product_name, p.location, p.plan_name,
+                   pp.publish_date, pp.price, pp.currency, pp.period, pp.source_url
+            FROM plans p JOIN price_points pp ON pp.fingerprint = p.fingerprint
+            {where}
+            ORDER BY p.fingerprint, pp.publish_date
+        """
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
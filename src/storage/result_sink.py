@@ -0,0 +1,111 @@
+"""
+提取结果的去向
+默认收集到列表，运行结束后统一写入价格历史；流式模式下不保留结果，
+每条结果保存后立即交给回调，价格历史按批追加，内存占用与文章数量无关
+"""
+import itertools
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import SCRAPE_CONFIG
+from src.storage.price_history import PriceHistory
+
+
+class ResultSink:
+    """
+    提取结果汇集（线程安全）
+
+    - 收集模式（默认）：结果追加到 results，调用方在运行结束后自行写入价格历史
+    - 流式模式：results 始终为空，每条结果调用 on_result（在工作线程中调用，需线程安全），
+      价格历史每 stream_history_batch 条写入一次，close() 写入剩余部分
+    """
+
+    def __init__(
+        self,
+        stream: bool = False,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        batch_size: Optional[int] = None,
+        history_db: Optional[str] = None
+    ):
+        """
+        初始化结果汇集
+
+        Args:
+            stream: 是否流式（不保留结果）
+            on_result: 每条结果保存后的回调（两种模式均调用）
+            batch_size: 流式模式下价格历史的批大小，默认使用 SCRAPE_CONFIG["stream_history_batch"]
+            history_db: 价格历史库路径，默认使用 OUTPUT_CONFIG["history_db"]
+        """
+        self.stream = stream
+        self.on_result = on_result
+        self.batch_size = max(batch_size or SCRAPE_CONFIG.get("stream_history_batch", 100), 1)
+        self.history_db = history_db
+        self.results: List[Dict[str, Any]] = []
+        self.count = 0
+        self.history_added = 0
+        self._batch: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._history: Optional[PriceHistory] = None
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """登记一条已保存的结果"""
+        batch = None
+        with self._lock:
+            self.count += 1
+            if not self.stream:
+                self.results.append(result)
+            else:
+                self._batch.append(result)
+                if len(self._batch) >= self.batch_size:
+                    batch, self._batch = self._batch, []
+        if batch:
+            self._record(batch)
+        if self.on_result:
+            self.on_result(result)
+
+    def record_history(self, results: Iterable[Dict[str, Any]]) -> None:
+        """
+        只写入价格历史、不计数也不回调（如续跑时之前已保存的结果），按批读取可传入生成器
+        """
+        iterator = iter(results)
+        while True:
+            batch = list(itertools.islice(iterator, self.batch_size))
+            if not batch:
+                return
+            self._record(batch)
+
+    def _record(self, batch: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            if self._history is None:
+                self._history = PriceHistory(self.history_db)
+            history = self._history
+        added = history.record_results(batch)
+        with self._lock:
+            self.history_added += added
+
+    def close(self) -> int:
+        """
+        写入剩余的价格历史并关闭
+
+        Returns:
+            流式模式下价格历史新增的数据点总数（收集模式为 0）
+        """
+        with self._lock:
+            batch, self._batch = self._batch, []
+        if batch:
+            self._record(batch)
+        with self._lock:
+            if self._history is not None:
+                self._history.close()
+                self._history = None
+            return self.history_added
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
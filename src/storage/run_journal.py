@@ -0,0 +1,169 @@
+"""
+运行日志
+以追加写入的 JSONL 记录 Pipeline 每篇文章的阶段状态，
+进程中断（API 额度耗尽、Ctrl-C）后可按日志从断点继续
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+# 文章处理阶段（按先后顺序）
+STAGES = ("discovered", "fetched", "extracted", "saved")
+
+
+class RunJournal:
+    """
+    Pipeline 运行日志（线程安全）
+
+    - 每条记录一行 JSON：{"ts": ..., "stage": ..., "key": 文章链接, ...}
+    - 行缓冲追加写入：每条记录一次 write 调用，不做 fsync，
+      进程崩溃时已写入的行不会丢失，最后一行被截断时回放自动跳过
+    - 回放时每篇文章取最靠后的阶段
+    """
+
+    def __init__(self, run_id: Optional[str] = None, journal_dir: Optional[str] = None):
+        """
+        打开（或创建）运行日志并回放已有记录
+
+        Args:
+            run_id: 运行 ID，默认使用当前时间（YYYYmmdd_HHMMSS）
+            journal_dir: 日志目录，默认使用 OUTPUT_CONFIG["runs_dir"]
+        """
+        self.journal_dir = journal_dir or OUTPUT_CONFIG["runs_dir"]
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.path = os.path.join(self.journal_dir, f"{self.run_id}.jsonl")
+
+        self.params: Dict[str, Any] = {}
+        self.articles: Dict[str, Dict[str, str]] = {}
+        self.stages: Dict[str, str] = {}
+        self.saved_files: Dict[str, str] = {}
+        self.finished = False
+        self._lock = threading.Lock()
+
+        if os.path.exists(self.path):
+            self._replay()
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+
+    @staticmethod
+    def exists(run_id: str, journal_dir: Optional[str] = None) -> bool:
+        """判断运行日志是否存在"""
+        journal_dir = journal_dir or OUTPUT_CONFIG["runs_dir"]
+        return os.path.exists(os.path.join(journal_dir, f"{run_id}.jsonl"))
+
+    def _replay(self) -> None:
+        """回放日志，恢复运行参数与每篇文章的最新阶段"""
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 崩溃时写了一半的最后一行
+                    continue
+                self._apply(entry)
+
+    def _apply(self, entry: Dict[str, Any]) -> None:
+        """将一条记录应用到内存状态"""
+        stage = entry.get("stage")
+        key = entry.get("key")
+        if stage == "run":
+            self.params = entry.get("params", {})
+        elif stage == "finished":
+            self.finished = True
+        elif stage == "discovered":
+            self.articles[key] = entry.get("article", {"link": key})
+            self.stages.setdefault(key, stage)
+        elif stage in STAGES:
+            if STAGES.index(stage) >= STAGES.index(self.stages.get(key, "discovered")):
+                self.stages[key] = stage
+            if stage == "saved":
+                self.saved_files[key] = entry.get("file", "")
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        """追加写入多条记录（一次 write 调用）"""
+        now = round(time.time(), 3)
+        lines = []
+        for entry in entries:
+            entry = {"ts": now, **entry}
+            lines.append(json.dumps(entry, ensure_ascii=False))
+        with self._lock:
+            if self._file.closed:
+                # 中断后仍在收尾的工作线程
+                return
+            for entry in entries:
+                self._apply(entry)
+            self._file.write("\n".join(lines) + "\n")
+
+    def start(self, params: Dict[str, Any]) -> None:
+        """记录运行参数（仅新运行）"""
+        self._write([{"stage": "run", "params": params}])
+
+    def discovered(self, articles: List[Dict[str, str]]) -> None:
+        """记录发现的文章列表"""
+        self._write([
+            {"stage": "discovered", "key": article["link"], "article": article}
+            for article in articles
+        ])
+
+    def record(self, key: str, stage: str, **fields: Any) -> None:
+        """
+        记录文章进入某个阶段
+
+        Args:
+            key: 文章链接
+            stage: 阶段名（fetched / extracted / saved / failed）
+            **fields: 附加信息（如 saved 阶段的 file、failed 阶段的 error）
+        """
+        self._write([{"stage": stage, "key": key, **fields}])
+
+    def stage_of(self, key: str) -> Optional[str]:
+        """获取文章当前所处阶段"""
+        with self._lock:
+            return self.stages.get(key)
+
+    def pending_articles(self) -> List[Dict[str, str]]:
+        """获取尚未完成的文章（未到 saved 阶段，或已保存文件不存在）"""
+        with self._lock:
+            return [
+                article for key, article in self.articles.items()
+                if self.stages.get(key) != "saved" or not os.path.exists(self.saved_files.get(key, ""))
+            ]
+
+    def saved_results(self) -> List[Dict]:
+        """读取已保存的提取结果（用于续跑后汇总）"""
+        return list(self.iter_saved_results())
+
+    def iter_saved_results(self) -> Iterator[Dict]:
+        """逐个读取已保存的提取结果（流式续跑时不一次性载入）"""
+        with self._lock:
+            files = [path for key, path in self.saved_files.items() if self.stages.get(key) == "saved"]
+        for path in files:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    yield json.load(f)
+            except (OSError, json.JSONDecodeError):
+                continue
+
+    def finish(self) -> None:
+        """标记运行完成"""
+        self._write([{"stage": "finished"}])
+
+    def close(self) -> None:
+        """关闭日志文件"""
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,332 @@
+"""
+文章全文检索索引
+基于 SQLite FTS5：中文按相邻两字（bigram）切分、英文与数字按词切分后写入 unicode61 分词的全文表，
+按标题、提取字段（商家、产品、特点、适用场景、总结）与正文分列加权，用 bm25 排序；
+Pipeline 保存结果时增量写入，内容未变化的文章跳过
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config import OUTPUT_CONFIG
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id       TEXT PRIMARY KEY,
+    source_url   TEXT,
+    title        TEXT,
+    publish_date TEXT,
+    vendors      TEXT,
+    summary      TEXT,
+    content_hash TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    title, fields, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+# 列权重：标题 > 提取字段 > 正文
+_COLUMN_WEIGHTS = (5.0, 3.0, 1.0)
+
+# 中日韩统一表意文字（含扩展 A 与兼容区）
+_CJK = "\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+_TOKEN_PATTERN = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+
+# 提取结果中参与检索的产品字段
+_PRODUCT_FIELDS = ("vendor", "product_name", "location", "features", "suitable_for", "summary")
+
+
+def _cjk_bigrams(run: str) -> List[str]:
+    """连续汉字切分为相邻两字（单个汉字保留为一个词）"""
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    切分检索词：汉字按 bigram，英文与数字按词（小写）
+
+    如 "洛杉矶KVM 1Gbps" → ["洛杉", "杉矶", "kvm", "1gbps"]
+    """
+    tokens: List[str] = []
+    for cjk, word in _TOKEN_PATTERN.findall(text or ""):
+        if cjk:
+            tokens.extend(_cjk_bigrams(cjk))
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def _quote(phrase: str) -> str:
+    return '"%s"' % phrase.replace('"', '""')
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户查询转换为 FTS5 MATCH 表达式
+
+    每段连续汉字的 bigram 组成短语（相邻词，等价于子串匹配），单个汉字按前缀匹配，
+    各段之间为 AND；没有可检索的词时返回 None
+    """
+    terms = []
+    for cjk, word in _TOKEN_PATTERN.findall(query or ""):
+        if cjk and len(cjk) == 1:
+            terms.append(_quote(cjk) + "*")
+        elif cjk:
+            terms.append(_quote(" ".join(_cjk_bigrams(cjk))))
+        else:
+            terms.append(_quote(word.lower()))
+    return " AND ".join(terms) if terms else None
+
+
+def _field_text(result: Dict[str, Any]) -> str:
+    """提取结果中参与检索的字段文本"""
+    parts = [result.get("article_summary") or ""]
+    for product in result.get("products") or []:
+        if not isinstance(product, dict):
+            continue
+        for key in _PRODUCT_FIELDS:
+            value = product.get(key)
+            if isinstance(value, list):
+                parts.extend(str(item) for item in value if item)
+            elif value:
+                parts.append(str(value))
+    return "\n".join(parts)
+
+
+class SearchIndex:
+    """
+    文章全文检索库
+
+    - documents 表：文章编号 → 标题、来源、日期、商家、摘要与内容哈希
+    - documents_fts 表：与 documents 同 rowid 的全文索引（存储切分后的词）
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        """
+        初始化检索库
+
+        Args:
+            db_path: SQLite 文件路径，默认使用 OUTPUT_CONFIG["search_db"]
+        """
+        self.db_path = db_path or OUTPUT_CONFIG["search_db"]
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "SearchIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def add(self, doc_id: str, result: Dict[str, Any], text: Optional[str] = None) -> bool:
+        """
+        写入或更新一篇文章（内容哈希未变化时跳过）
+
+        Args:
+            doc_id: 文章编号（与 data/raw 文件名一致）
+            result: 提取结果（article_title、products、source_url、publish_date 等）
+            text: 文章正文（html_to_text 的输出），为 None 时保留已索引的正文（新文章只索引标题与提取字段）
+
+        Returns:
+            是否写入
+        """
+        title = result.get("article_title") or ""
+        fields = _field_text(result)
+        vendors = sorted({
+            product.get("vendor") for product in result.get("products") or []
+            if isinstance(product, dict) and product.get("vendor")
+        })
+
+        with self._lock, self._conn:
+            existing = self._conn.execute(
+                "SELECT d.rowid, d.content_hash, f.body FROM documents AS d "
+                "LEFT JOIN documents_fts AS f ON f.rowid = d.rowid WHERE d.doc_id = ?", (doc_id,)
+            ).fetchone()
+            # 正文未知（如重建索引时页面已不在存储中）时沿用已索引的正文，哈希按切分后的正文计算
+            if text is None and existing is not None:
+                body_tokens = existing["body"] or ""
+            else:
+                body_tokens = " ".join(tokenize(text or ""))
+            content_hash = hashlib.sha256("\0".join((title, fields, body_tokens)).encode("utf-8")).hexdigest()
+            row = (
+                result.get("source_url"),
+                title,
+                result.get("publish_date") or "",
+                ", ".join(vendors),
+                result.get("article_summary") or "",
+                content_hash,
+            )
+            tokens = (" ".join(tokenize(title)), " ".join(tokenize(fields)), body_tokens)
+            if existing is not None and existing["content_hash"] == content_hash:
+                return False
+            if existing is None:
+                rowid = self._conn.execute(
+                    "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)", (doc_id, *row)
+                ).lastrowid
+            else:
+                rowid = existing["rowid"]
+                self._conn.execute(
+                    "UPDATE documents SET source_url = ?, title = ?, publish_date = ?, vendors = ?, "
+                    "summary = ?, content_hash = ? WHERE rowid = ?",
+                    (*row, rowid),
+                )
+                self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+            self._conn.execute(
+                "INSERT INTO documents_fts (rowid, title, fields, body) VALUES (?, ?, ?, ?)",
+                (rowid, *tokens),
+            )
+        return True
+
+    def import_raw_dir(
+        self,
+        raw_dir: Optional[str] = None,
+        text_loader: Optional[Callable[[str], Optional[str]]] = None
+    ) -> int:
+        """
+        从 JSON 结果目录导入（用于首次建库或重建索引）
+
+        Args:
+            raw_dir: JSON 目录，默认使用 OUTPUT_CONFIG["raw_dir"]
+            text_loader: 按文章编号读取正文的函数（如从页面存储解压并转纯文本），
+                         为 None 或返回 None 时保留已索引的正文，只更新标题与提取字段
+
+        Returns:
+            写入（新增或内容变化）的文章数
+        """
+        raw_dir = raw_dir or OUTPUT_CONFIG["raw_dir"]
+        if not os.path.isdir(raw_dir):
+            return 0
+
+        added = 0
+        for filename in sorted(os.listdir(raw_dir)):
+            if not filename.endswith(".json"):
+                continue
+            with open(os.path.join(raw_dir, filename), "r", encoding="utf-8") as f:
+                try:
+                    result = json.load(f)
+                except json.JSONDecodeError:
+                    continue
+            if not isinstance(result, dict):
+                continue
+            doc_id = filename[:-len(".json")]
+            text = text_loader(doc_id) if text_loader else None
+            if self.add(doc_id, result, text):
+                added += 1
+        return added
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        全文检索，按 bm25 相关度排序（标题与提取字段的命中权重高于正文）
+
+        Args:
+            query: 查询文本（中文按子串匹配，多个词之间为 AND）
+            limit: 最多返回条数
+
+        Returns:
+            结果列表（doc_id、title、source_url、publish_date、vendors、summary、score）
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT d.doc_id, d.title, d.source_url, d.publish_date, d.vendors, d.summary,
+                       bm25(documents_fts, {', '.join(str(w) for w in _COLUMN_WEIGHTS)}) AS rank
+                FROM documents_fts JOIN documents AS d ON d.rowid = documents_fts.rowid
+                WHERE documents_fts MATCH ?
+                ORDER BY rank
+                LIMIT ?
+                """,
+                (match, limit),
+            ).fetchall()
+        return [
+            {**{key: row[key] for key in row.keys() if key != "rank"}, "score": round(-row["rank"], 4)}
+            for row in rows
+        ]
+
+    def export(self, path: Optional[str] = None, include_body: bool = False) -> int:
+        """
+        导出为看板可直接加载的 JSON 倒排索引
+
+        格式：{"tokenizer": "cjk-bigram", "weights": [...], "docs": [...], "postings": {词: [[文档下标, 加权词频], ...]}}；
+        看板用与 tokenize 相同的切分规则处理查询即可在本地检索
+
+        Args:
+            path: 输出路径，默认使用 OUTPUT_CONFIG["search_export"]
+            include_body: 是否包含正文（默认只含标题与提取字段，文件更小）
+
+        Returns:
+            导出的文章数
+        """
+        path = path or OUTPUT_CONFIG["search_export"]
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.doc_id, d.title, d.source_url, d.publish_date, d.vendors, "
+                "f.title AS t_title, f.fields AS t_fields, f.body AS t_body "
+                "FROM documents AS d JOIN documents_fts AS f ON f.rowid = d.rowid "
+                "ORDER BY d.publish_date DESC, d.doc_id"
+            ).fetchall()
+
+        columns = ("t_title", "t_fields", "t_body") if include_body else ("t_title", "t_fields")
+        docs: List[Dict[str, Any]] = []
+        postings: Dict[str, List[List[float]]] = {}
+        for index, row in enumerate(rows):
+            weighted: Counter = Counter()
+            length = 0
+            for column, weight in zip(columns, _COLUMN_WEIGHTS):
+                tokens = row[column].split()
+                length += len(tokens)
+                for token, count in Counter(tokens).items():
+                    weighted[token] += count * weight
+            docs.append({
+                "id": row["doc_id"],
+                "title": row["title"],
+                "url": row["source_url"],
+                "date": row["publish_date"],
+                "vendors": row["vendors"],
+                "length": length,
+            })
+            for token, score in weighted.items():
+                postings.setdefault(token, []).append([index, score])
+
+        export_dir = os.path.dirname(path)
+        if export_dir:
+            os.makedirs(export_dir, exist_ok=True)
+        # 先写临时文件再替换，看板不会读到写了一半的索引
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"tokenizer": "cjk-bigram", "weights": list(_COLUMN_WEIGHTS[:len(columns)]), "docs": docs, "postings": postings},
+                f, ensure_ascii=False, separators=(",", ":")
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return len(docs)
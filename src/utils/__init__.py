@@ -8,15 +8,44 @@ from .file_utils import (
     ensure_dir,
     save_to_json,
     save_to_markdown,
-    save_to_html,
     html_to_text,
 )
+from .file_writer import BatchFileWriter, get_file_writer, flush_writes
+from .rate_limiter import RateLimiter, ProgressMeter
+from .metrics import MetricsRegistry, LatencyHistogram, get_metrics
+from .tracing import Tracer, get_tracer, traced
+from .logger import get_logger, setup_logging, flush_logs
+from .priority_pool import (
+    PriorityThreadPool,
+    current_priority,
+    PRIORITY_HIGH,
+    PRIORITY_NORMAL,
+    PRIORITY_LOW,
+)
 
 __all__ = [
     "sanitize_filename",
     "ensure_dir",
     "save_to_json",
     "save_to_markdown",
-    "save_to_html",
     "html_to_text",
+    "BatchFileWriter",
+    "get_file_writer",
+    "flush_writes",
+    "RateLimiter",
+    "ProgressMeter",
+    "MetricsRegistry",
+    "LatencyHistogram",
+    "get_metrics",
+    "Tracer",
+    "get_tracer",
+    "traced",
+    "get_logger",
+    "setup_logging",
+    "flush_logs",
+    "PriorityThreadPool",
+    "current_priority",
+    "PRIORITY_HIGH",
+    "PRIORITY_NORMAL",
+    "PRIORITY_LOW",
 ]
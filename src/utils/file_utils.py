@@ -5,12 +5,13 @@
 import os
 import re
 import json
-from typing import Optional
+from typing import Callable, Optional, Union
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from config import SCRAPE_CONFIG
+from src.utils.file_writer import get_file_writer
 
 
 def sanitize_filename(filename: str, max_length: Optional[int] = None) -> str:
@@ -49,20 +50,27 @@ def ensure_dir(path: str) -> None:
     os.makedirs(path, exist_ok=True)
 
 
-def save_to_json(data: dict, filename: str, output_dir: str) -> str:
+def save_to_json(
+    data: dict,
+    filename: str,
+    output_dir: str,
+    on_written: Optional[Callable[[Optional[BaseException]], None]] = None
+) -> str:
     """
-    保存数据为 JSON 文件
+    保存数据为 JSON 文件（提交给后台写入器，原子落盘）
+    
+    返回时文件尚未写入：落盘成功后由写入器记录"已保存"日志；
+    写入失败时 flush_writes() 返回该路径，需要逐条确认时传入 on_written
     
     Args:
         data: 要保存的数据
         filename: 文件名（不含扩展名）
         output_dir: 输出目录
+        on_written: 写入完成回调（在写入线程中调用），参数为 None 表示已落盘，否则为写入异常
         
     Returns:
-        保存的文件完整路径
+        目标文件完整路径（仅为将要写入的路径）
     """
-    ensure_dir(output_dir)
-    
     # 确保文件名安全
     safe_filename = sanitize_filename(filename)
     if not safe_filename:
@@ -70,10 +78,11 @@ def save_to_json(data: dict, filename: str, output_dir: str) -> str:
     
     filepath = os.path.join(output_dir, f"{safe_filename}.json")
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    content = json.dumps(data, indent=2, ensure_ascii=False)
+    future = get_file_writer().submit(filepath, content.encode("utf-8"), log_saved=True)
+    if on_written:
+        future.add_done_callback(lambda f: on_written(f.exception()))
     
-    print(f"✅ 已保存到: {filepath}")
     return filepath
 
 
@@ -85,7 +94,10 @@ def save_to_markdown(
     output_dir: str
 ) -> str:
     """
-    保存文章为 Markdown 文件
+    保存文章为 Markdown 文件（提交给后台写入器，原子落盘）
+    
+    返回时文件尚未写入：落盘成功后由写入器记录"已保存"日志；
+    写入失败时 flush_writes() 返回该路径
     
     Args:
         title: 文章标题
@@ -95,12 +107,10 @@ def save_to_markdown(
         output_dir: 输出目录
         
     Returns:
-        保存的文件完整路径
+        目标文件完整路径（仅为将要写入的路径）
     """
     from bs4 import BeautifulSoup
     
-    ensure_dir(output_dir)
-    
     # 确保文件名安全
     safe_filename = sanitize_filename(filename)
     if not safe_filename:
@@ -116,51 +126,18 @@ def save_to_markdown(
     # 组装 Markdown 内容
     md_content = f"# {title}\n\nSource: {url}\n\n{content}"
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(md_content)
-    
-    print(f"✅ 已保存到: {filepath}")
-    return filepath
-
-
-def save_to_html(
-    html: str,
-    filename: str,
-    output_dir: str = "data/html"
-) -> str:
-    """
-    保存原始 HTML 页面到文件
-    
-    Args:
-        html: 原始 HTML 内容
-        filename: 文件名（不含扩展名）
-        output_dir: 输出目录
-        
-    Returns:
-        保存的文件完整路径
-    """
-    ensure_dir(output_dir)
-    
-    # 确保文件名安全
-    safe_filename = sanitize_filename(filename)
-    if not safe_filename:
-        safe_filename = "page"
-    
-    filepath = os.path.join(output_dir, f"{safe_filename}.html")
-    
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(html)
+    get_file_writer().submit(filepath, md_content.encode("utf-8"), log_saved=True)
     
     return filepath
 
 
-def html_to_text(html_content: str) -> str:
+def html_to_text(html_content: Union[str, bytes]) -> str:
     """
     将 HTML 转换为纯文本，解决 HTML 实体编码问题
     保留表格结构以便 AI 识别
     
     Args:
-        html_content: 原始 HTML 内容
+        html_content: 原始 HTML 内容（文本，或由 BeautifulSoup 自动识别编码的字节）
         
     Returns:
         提取的纯文本内容
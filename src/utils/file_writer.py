@@ -0,0 +1,232 @@
+"""
+批量原子文件写入器
+后台线程从队列中批量取出写入请求，先写临时文件再原子重命名，
+跳过内容未变化的文件，每批结束时对涉及的目录各同步一次；
+每次提交返回 Future，写入失败时 Future 带有异常，flush() 返回写入失败的路径
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Set, Tuple
+
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.logger import get_logger
+
+
+logger = get_logger("file_writer")
+
+
+class BatchFileWriter:
+    """
+    后台批量写入器
+
+    - 调用方线程只负责提交，不阻塞在磁盘 I/O 上
+    - 同一批次中同一路径的多次写入只保留最后一次
+    - 写入流程：临时文件 → fsync → os.replace 原子替换 → 目录 fsync，崩溃不会留下半截文件，
+      重命名本身也已落盘；单个文件失败不影响同批其他文件
+    - 写入结果通过 submit() 返回的 Future 交给调用方；最后一次写入失败的路径会保留，
+      flush() 返回这些路径，直到该路径再次写入成功
+    """
+
+    def __init__(self, batch_size: int = 64, flush_interval: float = 0.2):
+        """
+        初始化写入器并启动后台线程
+
+        Args:
+            batch_size: 单批最大文件数
+            flush_interval: 攒批的最长等待时间（秒）
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[Tuple[str, bytes, bool, Future]]]" = queue.Queue()
+        self._closed = False
+        self._failed: Set[str] = set()
+        self._failed_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="file-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, filepath: str, data: bytes, log_saved: bool = False) -> "Future[str]":
+        """
+        提交一次写入（立即返回）
+
+        Args:
+            filepath: 目标文件路径
+            data: 文件内容
+            log_saved: 落盘（原子替换完成）后是否记录"已保存"日志
+
+        Returns:
+            写入结果：落盘后结果为 filepath，失败时带有 OSError
+            （回调在写入线程中执行，flush() 返回前均已执行完毕）
+        """
+        if self._closed:
+            raise RuntimeError("写入器已关闭")
+        future: "Future[str]" = Future()
+        self._queue.put((filepath, data, log_saved, future))
+        return future
+
+    def flush(self) -> List[str]:
+        """
+        阻塞直到已提交的写入全部落盘
+
+        Returns:
+            最后一次写入失败的路径（按路径排序，为空表示全部成功）
+        """
+        self._queue.join()
+        with self._failed_lock:
+            return sorted(self._failed)
+
+    def close(self) -> None:
+        """落盘剩余写入并停止后台线程"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """后台线程主循环：攒批 → 写入"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+
+            batch: Dict[str, Tuple[bytes, bool]] = {item[0]: item[1:3]}
+            futures: Dict[str, List[Future]] = {item[0]: [item[3]]}
+            taken = 1
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is None:
+                    stop = True
+                    break
+                batch[item[0]] = item[1:3]
+                futures.setdefault(item[0], []).append(item[3])
+
+            try:
+                errors = self._write_batch(batch)
+            except Exception as e:
+                logger.error("❌ 批量写入失败: %s", e)
+                errors = {filepath: e for filepath in batch}
+            try:
+                self._resolve(futures, errors)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+            if stop:
+                return
+
+    @staticmethod
+    def _is_unchanged(filepath: str, data: bytes) -> bool:
+        """判断目标文件内容是否与待写入内容完全一致"""
+        try:
+            if os.path.getsize(filepath) != len(data):
+                return False
+            with open(filepath, "rb") as f:
+                return f.read() == data
+        except OSError:
+            return False
+
+    def _resolve(self, futures: Dict[str, List[Future]], errors: Dict[str, Exception]) -> None:
+        """记录失败路径并完成各次提交的 Future（同一路径被合并的多次提交共用最终结果）"""
+        with self._failed_lock:
+            self._failed.update(errors)
+            self._failed.difference_update(path for path in futures if path not in errors)
+        for filepath, pending in futures.items():
+            error = errors.get(filepath)
+            for future in pending:
+                if error is None:
+                    future.set_result(filepath)
+                else:
+                    future.set_exception(error)
+
+    def _write_batch(self, batch: Dict[str, Tuple[bytes, bool]]) -> Dict[str, Exception]:
+        """
+        写入一批文件：临时文件并 fsync → 原子替换 → 每个目录 fsync 一次
+
+        Returns:
+            写入失败的路径 → 异常（目录同步失败时，该目录下本批写入的文件都算失败）
+        """
+        errors: Dict[str, Exception] = {}
+        directories: Dict[str, List[str]] = {}
+        for filepath, (data, log_saved) in batch.items():
+            if self._is_unchanged(filepath, data):
+                if log_saved:
+                    logger.info("✅ 已保存到: %s（内容未变化）", filepath)
+                continue
+            directory = os.path.dirname(filepath)
+            tmp_path = os.path.join(directory, f".{os.path.basename(filepath)}.tmp")
+            try:
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, filepath)
+            except OSError as e:
+                logger.error("❌ 写入失败: %s - %s", filepath, e)
+                errors[filepath] = e
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                continue
+            directories.setdefault(directory or ".", []).append(filepath)
+            if log_saved:
+                logger.info("✅ 已保存到: %s", filepath)
+
+        # 重命名写在目录项中，目录同步后重命名本身才落盘（Windows 不支持打开目录，跳过）
+        if os.name == "nt":
+            return errors
+        for directory, filepaths in directories.items():
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                logger.error("❌ 目录同步失败: %s - %s", directory, e)
+                errors.update((filepath, e) for filepath in filepaths)
+        return errors
+
+
+_writer: Optional[BatchFileWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_file_writer() -> BatchFileWriter:
+    """获取进程级共享的写入器（首次调用时启动，退出时自动落盘）"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = BatchFileWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+
+def flush_writes() -> List[str]:
+    """
+    等待共享写入器中的所有写入落盘（未启动时直接返回）
+
+    Returns:
+        最后一次写入失败的路径（为空表示全部成功）
+    """
+    if _writer is None:
+        return []
+    return _writer.flush()
@@ -0,0 +1,108 @@
+"""
+结构化日志
+所有模块通过 get_logger() 获取 vps_scraper.* 日志器；
+日志记录经 QueueHandler 投递到后台线程统一输出，工作线程不阻塞在控制台 I/O 上，
+支持文本（与原 print 输出一致）与 JSON Lines 两种格式
+"""
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+
+# 项目根日志器名称
+LOGGER_NAME = "vps_scraper"
+
+# LogRecord 的标准属性（JSON 格式中其余属性视为 extra 字段输出）
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON：ts、level、logger、thread、msg 及 extra 字段"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+_listener: Optional[QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    获取模块日志器
+
+    Args:
+        name: 模块名（如 "scraper"、"zhipu"），实际日志器为 vps_scraper.<name>
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def setup_logging(
+    level: str = "INFO",
+    log_format: str = "text",
+    stream: Optional[TextIO] = None
+) -> None:
+    """
+    配置日志输出（可重复调用，后一次覆盖前一次）
+
+    Args:
+        level: 日志级别（DEBUG / INFO / WARNING / ERROR），--quiet 对应 WARNING
+        log_format: text（仅输出消息，与原 print 一致）或 json（JSON Lines）
+        stream: 输出流，默认 sys.stdout
+    """
+    global _listener
+
+    if _listener is not None:
+        _listener.stop()
+
+    handler = logging.StreamHandler(stream or sys.stdout)
+    if log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger(LOGGER_NAME)
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(QueueHandler(_queue))
+    root.setLevel(level.upper())
+    root.propagate = False
+
+    _listener = QueueListener(_queue, handler)
+    _listener.start()
+
+
+def flush_logs() -> None:
+    """等待已提交的日志全部输出（在直接 print 之前调用，保证输出顺序）"""
+    if _listener is not None:
+        _queue.join()
+
+
+def _shutdown() -> None:
+    """进程退出时输出剩余日志并停止后台线程"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# 默认配置：INFO 级别文本输出，未调用 setup_logging 时行为与原 print 一致
+setup_logging()
+atexit.register(_shutdown)
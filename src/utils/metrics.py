@@ -0,0 +1,219 @@
+"""
+运行指标
+计数器 + 分阶段延迟直方图（HDR 风格的对数-线性分桶，固定内存、相对误差约 3%），
+可导出 JSON 运行报告或 Prometheus 文本格式
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.file_writer import get_file_writer
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+
+# 报告中输出的分位数
+REPORT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+class LatencyHistogram:
+    """
+    HDR 风格延迟直方图（非线程安全，由 MetricsRegistry 加锁）
+
+    以微秒为单位记录：每个 2 的幂区间再线性划分为 SUB_BUCKETS 个子桶，
+    桶数随数值量级对数增长，分位数相对误差不超过 1/SUB_BUCKETS
+    """
+
+    SUB_BUCKETS = 32
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, int], int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+
+    def _bucket(self, value_us: int) -> Tuple[int, int]:
+        """计算数值所在的桶：(指数, 子桶)"""
+        if value_us < self.SUB_BUCKETS:
+            return 0, value_us
+        shift = value_us.bit_length() - self.SUB_BUCKETS.bit_length() + 1
+        return shift, value_us >> shift
+
+    def record(self, seconds: float) -> None:
+        """记录一次耗时（秒）"""
+        value_us = max(int(seconds * 1_000_000), 0)
+        key = self._bucket(value_us)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def quantile(self, q: float) -> float:
+        """获取分位数（秒），取所在桶的中点"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for shift, sub in sorted(self._buckets):
+            seen += self._buckets[(shift, sub)]
+            if seen >= rank:
+                low = sub << shift
+                high = ((sub + 1) << shift) - 1
+                value_us = min(max((low + high) / 2, self.min_us or 0), self.max_us)
+                return value_us / 1_000_000
+        return self.max_us / 1_000_000
+
+    def to_dict(self) -> Dict[str, float]:
+        """导出统计摘要（秒）"""
+        summary = {
+            "count": self.count,
+            "total": self.total_us / 1_000_000,
+            "mean": self.total_us / self.count / 1_000_000 if self.count else 0.0,
+            "min": (self.min_us or 0) / 1_000_000,
+            "max": self.max_us / 1_000_000,
+        }
+        for q in REPORT_QUANTILES:
+            summary[f"p{int(q * 100)}"] = self.quantile(q)
+        return summary
+
+
+class MetricsRegistry:
+    """
+    指标注册表（线程安全）
+
+    - incr(): 计数器（请求数、字节数、token 数、缓存命中等）
+    - timer() / observe(): 分阶段耗时
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._counters: Dict[str, float] = {}
+        self._stages: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """计数器累加"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """记录某阶段的一次耗时（秒）"""
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = LatencyHistogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """计时上下文：with metrics.timer("llm_call"): ..."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def report(self) -> Dict:
+        """生成运行报告"""
+        with self._lock:
+            return {
+                "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "wall_seconds": round(time.time() - self.started_at, 3),
+                "counters": dict(sorted(self._counters.items())),
+                "stages": {name: hist.to_dict() for name, hist in sorted(self._stages.items())},
+            }
+
+    def save_report(self, filepath: str, extra: Optional[Dict] = None) -> str:
+        """
+        将运行报告提交给后台写入器保存为 JSON
+
+        Args:
+            filepath: 输出文件路径
+            extra: 附加到报告中的其他部分（如 token 用量）
+        """
+        content = json.dumps({**self.report(), **(extra or {})}, indent=2, ensure_ascii=False)
+        get_file_writer().submit(filepath, content.encode("utf-8"))
+        return filepath
+
+    def summary_lines(self) -> List[str]:
+        """按累计耗时降序输出各阶段摘要（用于控制台）"""
+        stages = self.report()["stages"]
+        lines = []
+        for name, stat in sorted(stages.items(), key=lambda item: item[1]["total"], reverse=True):
+            lines.append(
+                f"{name:<16} {stat['count']:>6} 次  累计 {stat['total']:>8.2f}s  "
+                f"p50 {stat['p50'] * 1000:>8.1f}ms  p99 {stat['p99'] * 1000:>8.1f}ms"
+            )
+        return lines
+
+    def prometheus_text(self, prefix: str = "vps_scraper") -> str:
+        """导出 Prometheus 文本格式（阶段耗时以 summary 类型输出）"""
+        report = self.report()
+        lines = []
+        for name, value in report["counters"].items():
+            metric = f"{prefix}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        metric = f"{prefix}_stage_seconds"
+        lines.append(f"# TYPE {metric} summary")
+        for stage, stat in report["stages"].items():
+            for q in REPORT_QUANTILES:
+                lines.append(f'{metric}{{stage="{stage}",quantile="{q}"}} {stat[f"p{int(q * 100)}"]}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {stat["total"]}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {stat["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+        """
+        在后台线程启动 Prometheus 抓取端点（GET /metrics）
+
+        Args:
+            port: 监听端口
+            host: 监听地址（默认仅本机）
+
+        Returns:
+            HTTP 服务器实例（调用 shutdown() 停止）
+        """
+        # http.server 连带导入 email、ssl 等模块，只在启用抓取端点时加载
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # 抓取请求不输出到控制台
+                pass
+
+        server = ThreadingHTTPServer((host, port), _Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        return server
+
+
+_metrics = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """获取进程级共享的指标注册表"""
+    return _metrics
@@ -0,0 +1,149 @@
+"""
+优先级线程池
+任务按优先级出队（数值越小越先执行，相同时按提交顺序），让最新文章、新内容
+先于积压任务处理，回填、离线重处理、叙述字段补充等后台任务排在最后；
+任务执行期间当前线程的优先级类别可通过 current_priority() 读取，
+下游共享资源（如本地推理服务的请求调度器）据此排序
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple, Union
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.utils.metrics import get_metrics
+
+
+# 优先级类别
+PRIORITY_HIGH = 0  # 新文章、内容有变化的文章
+PRIORITY_NORMAL = 1  # 已处理过且内容未变化的文章
+PRIORITY_LOW = 2  # 后台任务：回填、离线重处理、叙述字段补充
+
+Priority = Union[int, Tuple[Any, ...]]
+
+_local = threading.local()
+
+
+def current_priority() -> int:
+    """当前线程正在执行的任务的优先级类别（不在优先级线程池中时为 PRIORITY_NORMAL）"""
+    return getattr(_local, "priority", PRIORITY_NORMAL)
+
+
+def priority_class(priority: Priority) -> int:
+    """优先级的类别：整数本身，或元组的第一个元素"""
+    return priority[0] if isinstance(priority, tuple) else priority
+
+
+class PriorityThreadPool:
+    """
+    按优先级调度的线程池（接口与 ThreadPoolExecutor 一致，submit 多一个 priority 参数）
+
+    - priority 为整数或元组，元组按字典序比较，如 (PRIORITY_HIGH, 按日期的名次)；
+      整数 p 等价于 (p,)
+    - 每个任务的排队耗时按类别记录为 queue_<name>_<类别> 阶段
+    """
+
+    def __init__(self, max_workers: int, name: str = "pool"):
+        """
+        初始化线程池（工作线程按需创建）
+
+        Args:
+            max_workers: 最大工作线程数
+            name: 名称（线程名与指标名）
+        """
+        self.max_workers = max(max_workers, 1)
+        self.name = name
+        self._queue: List[Tuple[Tuple[Any, ...], int, float, Future, Callable, tuple, dict]] = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], *args: Any, priority: Priority = PRIORITY_NORMAL, **kwargs: Any) -> Future:
+        """
+        提交任务
+
+        Args:
+            fn: 任务函数
+            priority: 优先级（数值越小越先执行）
+
+        Returns:
+            任务的 Future
+        """
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("线程池已关闭")
+            # 统一为元组，整数与元组优先级可以混用
+            key = priority if isinstance(priority, tuple) else (priority,)
+            heapq.heappush(self._queue, (key, next(self._order), time.perf_counter(), future, fn, args, kwargs))
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}_{len(self._threads)}",
+                    daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._cond.notify()
+        return future
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._shutdown:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if not self._queue:
+                    return
+                priority, _, queued_at, future, fn, args, kwargs = heapq.heappop(self._queue)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            get_metrics().observe(f"queue_{self.name}_{priority_class(priority)}", time.perf_counter() - queued_at)
+            _local.priority = priority_class(priority)
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                _local.priority = PRIORITY_NORMAL
+
+    def pending(self) -> int:
+        """排队中（尚未开始）的任务数"""
+        with self._cond:
+            return len(self._queue)
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False) -> None:
+        """
+        关闭线程池：不再接受新任务，已排队的任务继续执行
+
+        Args:
+            wait: 是否等待所有任务完成
+            cancel_futures: 是否取消尚未开始的任务
+        """
+        with self._cond:
+            self._shutdown = True
+            if cancel_futures:
+                for entry in self._queue:
+                    entry[3].cancel()
+                self._queue = []
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def __enter__(self) -> "PriorityThreadPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown(wait=True)
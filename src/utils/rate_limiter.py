@@ -0,0 +1,111 @@
+"""
+请求限速与进度统计
+令牌桶限制全局请求速率，多个工作线程共享同一个限速器；
+进度统计按观测到的吞吐量估算剩余时间
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限速器
+
+    - 令牌按 rate 个/秒匀速补充，最多积累 burst 个
+    - acquire() 取走一个令牌，令牌不足时阻塞等待
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """
+        初始化限速器
+
+        Args:
+            rate: 每秒请求数（<= 0 表示不限速）
+            burst: 允许的突发请求数，默认与 rate 相同（至少为 1）
+        """
+        self.rate = rate
+        self.burst = max(1, burst if burst is not None else int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """取走一个令牌（不足时阻塞到补充为止）"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ProgressMeter:
+    """
+    进度与剩余时间估算
+
+    吞吐量使用指数滑动平均，对速率波动（限速、重试）反应平滑
+    """
+
+    def __init__(self, total: int, done: int = 0, smoothing: float = 0.3):
+        """
+        初始化进度统计
+
+        Args:
+            total: 任务总数
+            done: 已完成数量（断点续跑时的起点，不计入吞吐量）
+            smoothing: 滑动平均系数（越大越偏向最近的速率）
+        """
+        self.total = total
+        self.done = done
+        self.smoothing = smoothing
+        self._rate: Optional[float] = None
+        self._last_time = time.monotonic()
+        self._last_done = done
+        self._lock = threading.Lock()
+
+    def advance(self, count: int = 1) -> None:
+        """记录完成 count 个任务"""
+        with self._lock:
+            self.done += count
+
+    @property
+    def rate(self) -> float:
+        """当前吞吐量（个/秒）"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_time
+            if elapsed >= 1.0:
+                instant = (self.done - self._last_done) / elapsed
+                if self._rate is None:
+                    self._rate = instant
+                else:
+                    self._rate = self.smoothing * instant + (1 - self.smoothing) * self._rate
+                self._last_time = now
+                self._last_done = self.done
+            return self._rate or 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        """预计剩余秒数（尚无吞吐量数据时返回 None）"""
+        rate = self.rate
+        if rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / rate
+
+    def format(self) -> str:
+        """格式化进度：完成数/总数、百分比、速率、剩余时间"""
+        percent = self.done / self.total * 100 if self.total else 100.0
+        eta = self.eta_seconds()
+        if eta is None:
+            eta_str = "--:--"
+        else:
+            minutes, seconds = divmod(int(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta_str = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+        return f"{self.done}/{self.total} ({percent:.1f}%) {self.rate:.1f} 篇/秒 剩余 {eta_str}"
@@ -0,0 +1,162 @@
+"""
+轻量级链路追踪
+在爬虫、页面提取与 AI 客户端中记录耗时区间（span），每篇文章一个 trace id，
+可导出为 Chrome Trace 格式（chrome://tracing、Perfetto 可直接打开）；
+未启用时 span() 返回共享的空上下文，几乎没有额外开销
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+# 未启用追踪时复用的空上下文
+_NULL_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    进程内追踪器（线程安全）
+
+    - trace(trace_id): 为当前线程设置 trace id（如文章编号），其中的 span 都会带上
+    - span(name, **attrs): 记录一个耗时区间，可嵌套
+    - export(filepath): 导出 Chrome Trace JSON
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        """启用追踪（之前的记录清空）"""
+        with self._lock:
+            self._events = []
+            self._thread_names = {}
+            self._origin = time.perf_counter()
+        self.enabled = True
+
+    def disable(self) -> None:
+        """停用追踪（已记录的事件保留，可继续导出）"""
+        self.enabled = False
+
+    @contextmanager
+    def _trace(self, trace_id: str) -> Iterator[None]:
+        previous = getattr(self._local, "trace_id", None)
+        self._local.trace_id = trace_id
+        try:
+            yield
+        finally:
+            self._local.trace_id = previous
+
+    def trace(self, trace_id: str):
+        """为当前线程设置 trace id 的上下文"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._trace(trace_id)
+
+    @contextmanager
+    def _span(self, name: str, attrs: Dict[str, Any]) -> Iterator[None]:
+        start = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            end = time.perf_counter()
+            args = dict(attrs)
+            trace_id = getattr(self._local, "trace_id", None)
+            if trace_id is not None:
+                args["trace_id"] = trace_id
+            if error:
+                args["error"] = error
+            thread = threading.current_thread()
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": round((start - self._origin) * 1_000_000, 1),
+                "dur": round((end - start) * 1_000_000, 1),
+                "pid": os.getpid(),
+                "tid": thread.ident,
+                "args": args,
+            }
+            with self._lock:
+                self._events.append(event)
+                self._thread_names.setdefault(thread.ident, thread.name)
+
+    def span(self, name: str, **attrs: Any):
+        """
+        记录一个耗时区间
+
+        Args:
+            name: 区间名称（如 http.get、zhipu.extract）
+            **attrs: 附加属性（如 url、字节数）
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, attrs)
+
+    def events(self) -> List[Dict[str, Any]]:
+        """获取已记录事件的副本"""
+        with self._lock:
+            return list(self._events)
+
+    def export(self, filepath: str) -> int:
+        """
+        导出 Chrome Trace JSON（临时文件 + 原子替换）
+
+        Args:
+            filepath: 输出文件路径
+
+        Returns:
+            导出的 span 数量
+        """
+        with self._lock:
+            events = list(self._events)
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._thread_names.items()
+            ]
+
+        directory = os.path.dirname(filepath)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        os.replace(tmp_path, filepath)
+        return len(events)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """获取进程级共享的追踪器"""
+    return _tracer
+
+
+def traced(name: str) -> Callable:
+    """
+    函数追踪装饰器：启用追踪时将整个调用记录为一个 span
+
+    Args:
+        name: span 名称
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracer.enabled:
+                return func(*args, **kwargs)
+            with _tracer.span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
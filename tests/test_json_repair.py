@@ -0,0 +1,143 @@
+"""
+LLM 输出 JSON 修复与分层提取合并测试：离线运行
+逻辑：构造常见的模型输出问题，验证本地修复与 Schema 类型转换，不访问网络、不消耗 API
+"""
+import json
+import unittest
+import sys
+from pathlib import Path
+
+# 确保项目根目录在 Python 路径中
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai_clients.json_repair import parse_llm_json, validate_article
+from src.ai_clients.zhipu_client import VPS_ARTICLE_SCHEMA, VPS_FAST_SCHEMA, merge_narrative
+from src.ai_clients.zhipu_client import SYSTEM_PROMPTS, build_system_prompt, render_schema, extraction_cache_key
+
+
+class TestParseLlmJson(unittest.TestCase):
+    """本地修复：代码块、多余文字、尾逗号、截断"""
+
+    def test_code_fence_and_trailing_text(self):
+        value, fixes = parse_llm_json('```json\n{"products": []}\n```')
+        self.assertEqual(value, {"products": []})
+        self.assertEqual(fixes, ["code_fence"])
+
+        value, fixes = parse_llm_json('结果如下：{"products": []} 以上。')
+        self.assertEqual(value, {"products": []})
+        self.assertEqual(fixes, ["trailing_text"])
+
+    def test_trailing_comma(self):
+        value, fixes = parse_llm_json('{"products": [{"vendor": "A",},],}')
+        self.assertEqual(value, {"products": [{"vendor": "A"}]})
+        self.assertIn("trailing_comma", fixes)
+
+    def test_trailing_comma_inside_string_kept(self):
+        content = '{"products": [{"vendor": "A", "summary": "支持 IPv6, } 与 \\"a, ]\\"",},]}'
+        value, fixes = parse_llm_json(content)
+        self.assertEqual(value["products"][0]["summary"], '支持 IPv6, } 与 "a, ]"')
+        self.assertIn("trailing_comma", fixes)
+
+    def test_truncated_keeps_complete_elements(self):
+        content = (
+            '{"products": [{"vendor": "A", "product_name": "P1", "plans": [{"name": "x"}]}, '
+            '{"vendor": "B", "product_name": "P2", "plans": [{"name": "y", "memory": {"val'
+        )
+        value, fixes = parse_llm_json(content)
+        self.assertEqual(fixes, ["truncated"])
+        self.assertEqual(value["products"][0]["plans"], [{"name": "x"}])
+        self.assertEqual(value["products"][1]["vendor"], "B")
+
+    def test_unrepairable(self):
+        with self.assertRaises(ValueError):
+            parse_llm_json("抱歉，无法提取")
+
+
+class TestValidateArticle(unittest.TestCase):
+    """Schema 类型转换与无效产品定位"""
+
+    def test_coerce_types_and_report_invalid_products(self):
+        result = {
+            "products": [
+                {
+                    "vendor": "WePC",
+                    "product_name": "加拿大VPS",
+                    "plans": [{
+                        "cpu": {"cores": "2核"},
+                        "memory": {"value": "1.5GB", "unit": "GB"},
+                        "traffic": {"value": "无限", "unit": "无限"},
+                        "price": [{"value": "$10.24", "currency": "USD"}],
+                    }],
+                    "features": "KVM",
+                },
+                "无效产品",
+                {"vendor": "RackNerd", "plans": []},
+            ]
+        }
+        coerced, invalid = validate_article(result, VPS_ARTICLE_SCHEMA)
+        plan = coerced["products"][0]["plans"][0]
+        self.assertEqual(plan["cpu"]["cores"], 2)
+        self.assertEqual(plan["memory"]["value"], 1.5)
+        self.assertEqual(plan["traffic"]["value"], -1)
+        self.assertEqual(plan["price"], [{"value": 10.24, "currency": "USD"}])
+        self.assertEqual(coerced["products"][0]["features"], ["KVM"])
+        self.assertEqual(invalid, [1, 2])
+
+
+class TestTwoTierExtraction(unittest.TestCase):
+    """分层提取：快速 Schema 不含叙述字段，叙述字段按商家 + 产品名合并"""
+
+    def test_fast_schema_drops_narrative_fields(self):
+        fast_product = VPS_FAST_SCHEMA["properties"]["products"]["items"]["properties"]
+        full_product = VPS_ARTICLE_SCHEMA["properties"]["products"]["items"]["properties"]
+        self.assertNotIn("features", fast_product)
+        self.assertIn("plans", fast_product)
+        self.assertIn("features", full_product)
+        self.assertNotIn("article_summary", VPS_FAST_SCHEMA["properties"])
+
+    def test_merge_narrative(self):
+        result = {"products": [
+            {"vendor": "WePC", "product_name": "加拿大VPS", "plans": []},
+            {"vendor": "RackNerd", "product_name": "KVM", "plans": []},
+        ]}
+        narrative = {
+            "products": [{"vendor": "RackNerd", "product_name": "KVM", "features": ["便宜"], "summary": None}],
+            "article_summary": "两家商家的促销",
+        }
+        self.assertEqual(merge_narrative(result, narrative), 1)
+        self.assertEqual(result["products"][1]["features"], ["便宜"])
+        self.assertNotIn("summary", result["products"][1])
+        self.assertNotIn("features", result["products"][0])
+        self.assertEqual(result["article_summary"], "两家商家的促销")
+
+
+class TestSystemPrompt(unittest.TestCase):
+    """系统提示词：紧凑 Schema 骨架，导入时构建一次且字节稳定（命中前缀缓存）"""
+
+    def test_compact_schema_skeleton(self):
+        skeleton = json.loads(render_schema(VPS_ARTICLE_SCHEMA))
+        product = skeleton["products"][0]
+        self.assertEqual(set(product), set(VPS_ARTICLE_SCHEMA["properties"]["products"]["items"]["properties"]))
+        self.assertEqual(product["vendor"], "string|VPS 商家名称")
+        self.assertIsInstance(product["plans"], list)
+        self.assertNotIn("\n", render_schema(VPS_ARTICLE_SCHEMA))
+        self.assertNotIn('": ', render_schema(VPS_ARTICLE_SCHEMA))
+        self.assertLess(len(render_schema(VPS_ARTICLE_SCHEMA)), len(render_schema(VPS_ARTICLE_SCHEMA, "pretty")) / 2)
+
+    def test_prompts_stable_per_tier(self):
+        for tier, prompt in SYSTEM_PROMPTS.items():
+            self.assertEqual(build_system_prompt(tier=tier), prompt)
+        self.assertIn("必填字段", SYSTEM_PROMPTS["full"])
+        self.assertNotIn('"features"', SYSTEM_PROMPTS["fast"])
+        self.assertIn('"type": "object"', build_system_prompt("pretty"))
+
+    def test_cache_key_follows_tier_and_model(self):
+        key = extraction_cache_key("正文", "glm-4.7")
+        self.assertEqual(key, extraction_cache_key("正文", "glm-4.7"))
+        self.assertNotEqual(key, extraction_cache_key("正文", "glm-4.7", tier="fast"))
+        self.assertNotEqual(key, extraction_cache_key("正文", "glm-4.5-air"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
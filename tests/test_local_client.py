@@ -0,0 +1,121 @@
+"""
+本地推理调度器与优先级线程池测试：离线运行
+逻辑：限制在途请求数，验证排队请求先按优先级、再按预估 token 数从小到大发送；
+优先级线程池按优先级出队，不访问网络
+"""
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# 确保项目根目录在 Python 路径中
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.ai_clients.local_client import RequestScheduler
+from src.utils.priority_pool import PriorityThreadPool, current_priority, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+
+class TestRequestScheduler(unittest.TestCase):
+    """在途上限与短请求优先"""
+
+    def _wait_queued(self, scheduler: RequestScheduler, count: int) -> None:
+        deadline = time.time() + 5
+        while len(scheduler._waiting) < count and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(scheduler._waiting), count)
+
+    def test_shortest_request_first(self):
+        scheduler = RequestScheduler(max_inflight=1)
+        order = []
+
+        def request(cost: int) -> None:
+            with scheduler.slot(cost):
+                order.append(cost)
+
+        threads = [threading.Thread(target=request, args=(cost,)) for cost in (300, 100, 200)]
+        with scheduler.slot(0):
+            for i, thread in enumerate(threads, 1):
+                thread.start()
+                self._wait_queued(scheduler, i)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(order, [100, 200, 300])
+
+    def test_priority_before_cost(self):
+        scheduler = RequestScheduler(max_inflight=1)
+        order = []
+
+        def request(cost: int, priority: int) -> None:
+            with scheduler.slot(cost, priority=priority):
+                order.append((priority, cost))
+
+        requests = [(100, PRIORITY_LOW), (300, PRIORITY_HIGH), (200, PRIORITY_NORMAL)]
+        threads = [threading.Thread(target=request, args=args) for args in requests]
+        with scheduler.slot(0):
+            for i, thread in enumerate(threads, 1):
+                thread.start()
+                self._wait_queued(scheduler, i)
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(order, [(PRIORITY_HIGH, 300), (PRIORITY_NORMAL, 200), (PRIORITY_LOW, 100)])
+
+    def test_inflight_limit(self):
+        scheduler = RequestScheduler(max_inflight=2)
+        peak = []
+        lock = threading.Lock()
+
+        def request() -> None:
+            with scheduler.slot(10):
+                with lock:
+                    peak.append(scheduler.inflight)
+                time.sleep(0.02)
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+        self.assertEqual(len(peak), 6)
+        self.assertLessEqual(max(peak), 2)
+
+
+class TestPriorityThreadPool(unittest.TestCase):
+    """按优先级出队，任务内可读取优先级类别"""
+
+    def test_priority_order(self):
+        order = []
+        gate = threading.Event()
+        with PriorityThreadPool(1, "test") as pool:
+            pool.submit(gate.wait)
+            for priority in [(PRIORITY_LOW, 0), (PRIORITY_NORMAL, 2), (PRIORITY_HIGH, 1), (PRIORITY_NORMAL, 1)]:
+                pool.submit(lambda p=priority: order.append((p, current_priority())), priority=priority)
+            gate.set()
+        self.assertEqual(order, [
+            ((PRIORITY_HIGH, 1), PRIORITY_HIGH),
+            ((PRIORITY_NORMAL, 1), PRIORITY_NORMAL),
+            ((PRIORITY_NORMAL, 2), PRIORITY_NORMAL),
+            ((PRIORITY_LOW, 0), PRIORITY_LOW),
+        ])
+        self.assertEqual(current_priority(), PRIORITY_NORMAL)
+
+    def test_exception_and_cancel(self):
+        gate = threading.Event()
+        pool = PriorityThreadPool(1, "test")
+        pool.submit(gate.wait)
+        failing = pool.submit(lambda: 1 / 0)
+        pending = pool.submit(lambda: None, priority=PRIORITY_LOW)
+        pool.shutdown(wait=False, cancel_futures=True)
+        gate.set()
+        self.assertTrue(failing.cancelled())
+        self.assertTrue(pending.cancelled())
+
+        with PriorityThreadPool(2, "test") as pool:
+            future = pool.submit(lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            future.result()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
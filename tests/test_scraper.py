@@ -2,16 +2,48 @@
 爬虫测试：精简版
 逻辑：测试两种爬取方式能获取内容 → 只用 AI 跑一次提取
 目的：减少 API 消耗，如果 AI 提取能工作，说明 API Key 配置正确
+另含替换会话请求的离线测试（回填等），不访问网络
 """
+import io
+import os
+import tempfile
 import unittest
 import sys
+from datetime import datetime
 from pathlib import Path
 
+import requests
+
 # 确保项目根目录在 Python 路径中
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.scrapers import GWVPSScraper
+from src.storage import PageStore
+from src.storage.page_store import PAGE_SUFFIX
+from src.utils import get_file_writer
+from config import OUTPUT_CONFIG
+
+
+class _FakeResponse:
+    """离线测试用响应（只实现爬虫用到的属性）"""
+
+    def __init__(self, url: str, status_code: int = 200, content: bytes = b"<html>page</html>"):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.raw = io.BytesIO(content)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
 
 
 class TestScraper(unittest.TestCase):
@@ -113,5 +145,206 @@ class TestScraper(unittest.TestCase):
             print("✅ AI 提取测试通过（返回结果但无产品数据）")
 
 
+class TestBackfill(unittest.TestCase):
+    """全站回填测试（离线）：ID 为 3 的倍数视为不存在（404）"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.saved_checkpoint = OUTPUT_CONFIG["backfill_checkpoint"]
+        OUTPUT_CONFIG["backfill_checkpoint"] = os.path.join(self.tmp_dir.name, "backfill.json")
+        self.scraper = GWVPSScraper()
+        self.scraper.page_store = PageStore(
+            os.path.join(self.tmp_dir.name, "html"), os.path.join(self.tmp_dir.name, "html.zdict")
+        )
+        self.requested = []
+        self.scraper.session.get = self._fake_get
+
+    def tearDown(self):
+        OUTPUT_CONFIG["backfill_checkpoint"] = self.saved_checkpoint
+        self.scraper.close()
+        self.tmp_dir.cleanup()
+
+    def _fake_get(self, url, **kwargs):
+        article_id = int(url.rsplit("/", 1)[1].split(".")[0])
+        self.requested.append(article_id)
+        return _FakeResponse(url, 404 if article_id % 3 == 0 else 200)
+
+    def test_stored_pages_counted_and_not_refetched(self):
+        """页面存储中已有的 ID 不再请求，记为已保存，回填完成后没有剩余 ID"""
+        self.scraper.page_store.put_bytes("2", b"<html>old</html>", wait=True)
+        stats = self.scraper.backfill(1, 10, threads=2, rate=0)
+        self.assertNotIn(2, self.requested)
+        self.assertEqual(stats, {"stored": 7, "missing": 3, "failed": 0, "remaining": 0})
+
+    def test_write_failure_retried_next_run(self):
+        """页面写入失败的 ID 计为失败且不记入断点，下次运行重新请求"""
+        writer = get_file_writer()
+        write_batch = writer._write_batch
+        failing = os.path.join(self.scraper.page_store.store_dir, f"5{PAGE_SUFFIX}")
+
+        def fail_one(batch):
+            errors = write_batch({path: value for path, value in batch.items() if path != failing})
+            if failing in batch:
+                errors[failing] = OSError("disk full")
+            return errors
+
+        writer._write_batch = fail_one
+        try:
+            stats = self.scraper.backfill(1, 10, threads=2, rate=0)
+        finally:
+            writer._write_batch = write_batch
+        self.assertEqual((stats["failed"], stats["remaining"]), (1, 1))
+        self.assertNotIn("5", self.scraper.page_store)
+
+        self.requested.clear()
+        stats = self.scraper.backfill(1, 10, threads=2, rate=0)
+        self.assertEqual(self.requested, [5])
+        self.assertEqual((stats["stored"], stats["remaining"]), (7, 0))
+
+
+def _rss(*items) -> bytes:
+    """构造 RSS：items 为 (链接, 标题, pubDate)"""
+    body = "".join(
+        f"<item><title>{title}</title><link>{link}</link><pubDate>{date}</pubDate></item>"
+        for link, title, date in items
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{body}</channel></rss>'.encode("utf-8")
+
+
+def _sitemap(root: str, *entries) -> bytes:
+    """构造 sitemap：root 为 sitemapindex 或 urlset，entries 为 (loc, lastmod)"""
+    tag = "sitemap" if root == "sitemapindex" else "url"
+    body = "".join(f"<{tag}><loc>{loc}</loc><lastmod>{lastmod}</lastmod></{tag}>" for loc, lastmod in entries)
+    return (
+        f'<?xml version="1.0"?><{root} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</{root}>'
+    ).encode("utf-8")
+
+
+class TestDiscovery(unittest.TestCase):
+    """RSS / sitemap 文章发现测试（离线）：未登记的地址返回 404"""
+
+    BASE = "https://example.com"
+    CUTOFF = datetime(2026, 1, 10)
+
+    def setUp(self):
+        self.scraper = GWVPSScraper()
+        self.scraper.base_url = self.BASE
+        self.pages = {}
+        self.requested = []
+        self.scraper.session.get = self._fake_get
+
+    def tearDown(self):
+        self.scraper.close()
+
+    def _fake_get(self, url, **kwargs):
+        self.requested.append(url)
+        content = self.pages.get(url)
+        return _FakeResponse(url, 404 if content is None else 200, content or b"")
+
+    def test_feed_stops_at_cutoff(self):
+        """RSS 按发布时间倒序读取，遇到早于截止日期的文章即停止，不再请求下一页"""
+        self.pages[f"{self.BASE}/feed/"] = _rss(
+            (f"{self.BASE}/3.html", "新文章", "Mon, 12 Jan 2026 08:00:00 +0800"),
+            (f"{self.BASE}/2.html", "", "Sat, 10 Jan 2026 08:00:00 +0800"),
+            (f"{self.BASE}/1.html", "旧文章", "Thu, 01 Jan 2026 08:00:00 +0800"),
+        )
+        articles = self.scraper._discover_from_feed(self.CUTOFF)
+        self.assertEqual(articles, [
+            {"title": "新文章", "link": f"{self.BASE}/3.html", "date": "2026-01-12"},
+            {"title": f"{self.BASE}/2.html", "link": f"{self.BASE}/2.html", "date": "2026-01-10"},
+        ])
+        self.assertEqual(self.requested, [f"{self.BASE}/feed/"])
+
+    def test_feed_page_404_ends_feed(self):
+        """超出末页的 ?paged=N 返回 404 视为 feed 已读完；首页 404 仍视为发现失败"""
+        self.pages[f"{self.BASE}/feed/"] = _rss(
+            (f"{self.BASE}/3.html", "新文章", "Mon, 12 Jan 2026 08:00:00 +0800"),
+        )
+        articles = self.scraper._discover_from_feed(self.CUTOFF)
+        self.assertEqual([article["link"] for article in articles], [f"{self.BASE}/3.html"])
+        self.assertEqual(self.requested[-1], f"{self.BASE}/feed/?paged=2")
+
+        del self.pages[f"{self.BASE}/feed/"]
+        with self.assertRaises(requests.HTTPError):
+            self.scraper._discover_from_feed(self.CUTOFF)
+
+    def test_sitemap_filters_by_lastmod(self):
+        """只展开 lastmod 不早于截止日期的文章 sitemap，文章按 lastmod 过滤且不含标题"""
+        self.pages[f"{self.BASE}/sitemap.xml"] = _sitemap(
+            "sitemapindex",
+            (f"{self.BASE}/post-sitemap2.xml", "2026-01-12T08:00:00+00:00"),
+            (f"{self.BASE}/post-sitemap1.xml", "2025-12-01T08:00:00+00:00"),
+            (f"{self.BASE}/page-sitemap.xml", "2026-01-12T08:00:00+00:00"),
+        )
+        self.pages[f"{self.BASE}/post-sitemap2.xml"] = _sitemap(
+            "urlset",
+            (f"{self.BASE}/12.html", "2026-01-12T08:00:00+00:00"),
+            (f"{self.BASE}/11.html", "2026-01-09T08:00:00+00:00"),
+            (f"{self.BASE}/about/", "2026-01-12T08:00:00+00:00"),
+        )
+        articles = self.scraper._discover_from_sitemap(self.CUTOFF)
+        self.assertEqual(articles, [{"title": "", "link": f"{self.BASE}/12.html", "date": "2026-01-12"}])
+        self.assertNotIn(f"{self.BASE}/post-sitemap1.xml", self.requested)
+        self.assertNotIn(f"{self.BASE}/page-sitemap.xml", self.requested)
+
+    def test_need_titles_skips_sitemap(self):
+        """需要标题时不使用 sitemap；RSS 失败后回退到列表页爬取"""
+        self.pages[f"{self.BASE}/sitemap.xml"] = _sitemap("urlset", (f"{self.BASE}/12.html", "2026-01-12"))
+        self.assertIsNone(self.scraper._discover_recent(self.CUTOFF, need_titles=True))
+        self.assertNotIn(f"{self.BASE}/sitemap.xml", self.requested)
+        self.assertEqual(len(self.scraper._discover_recent(self.CUTOFF)), 1)
+
+
+class TestConditionalGet(unittest.TestCase):
+    """条件 GET（--watch 轮询首页）：带上次的 ETag / Last-Modified，未变化时 304 不返回正文"""
+
+    URL = "https://example.com/"
+
+    def setUp(self):
+        self.scraper = GWVPSScraper()
+        self.version = "v1"
+        self.status = None
+        self.sent_headers = []
+        self.scraper.session.get = self._fake_get
+
+    def tearDown(self):
+        self.scraper.close()
+
+    def _fake_get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.sent_headers.append(dict(headers))
+        if self.status is not None:
+            return _FakeResponse(url, self.status)
+        etag = f'"{self.version}"'
+        if headers.get("If-None-Match") == etag:
+            return _FakeResponse(url, 304, b"")
+        response = _FakeResponse(url, 200, f"<html>{self.version}</html>".encode("utf-8"))
+        response.headers = {"ETag": etag, "Last-Modified": "Mon, 12 Jan 2026 08:00:00 GMT"}
+        return response
+
+    def test_not_modified_returns_none(self):
+        self.assertEqual(self.scraper._request_if_changed(self.URL), b"<html>v1</html>")
+        self.assertEqual(self.sent_headers[0], {})
+
+        self.assertIsNone(self.scraper._request_if_changed(self.URL))
+        self.assertEqual(self.sent_headers[1], {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 12 Jan 2026 08:00:00 GMT",
+        })
+
+        self.version = "v2"
+        self.assertEqual(self.scraper._request_if_changed(self.URL), b"<html>v2</html>")
+        self.assertIsNone(self.scraper._request_if_changed(self.URL))
+        self.assertEqual(self.sent_headers[-1]["If-None-Match"], '"v2"')
+
+    def test_error_status_raises_and_keeps_validators(self):
+        self.scraper._request_if_changed(self.URL)
+        self.status = 503
+        with self.assertRaises(requests.HTTPError):
+            self.scraper._request_if_changed(self.URL)
+        self.status = None
+        self.assertIsNone(self.scraper._request_if_changed(self.URL))
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
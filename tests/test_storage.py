@@ -0,0 +1,518 @@
+"""
+存储层测试：离线运行
+逻辑：使用临时目录验证本地存储组件，不访问网络、不消耗 API
+"""
+import json
+import unittest
+import shutil
+import sys
+import tempfile
+import os
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+# 确保项目根目录在 Python 路径中
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.storage import PriceHistory, plan_fingerprint, ContentArchive, PageStore, BackfillCheckpoint, RunJournal, PlanIndex, SearchIndex, ResultSink
+from src.utils import BatchFileWriter, flush_writes
+
+
+def _make_result(price: float, date: str, url: str) -> dict:
+    """构造一条最小的 AI 提取结果"""
+    return {
+        "products": [{
+            "vendor": "WePC",
+            "product_name": "加拿大VPS",
+            "location": "加拿大密西沙加",
+            "plans": [{
+                "name": "基础套餐",
+                "cpu": {"cores": 1, "model": None},
+                "memory": {"value": 512, "unit": "MB"},
+                "price": [
+                    {"value": price, "currency": "CAD", "period": "月"},
+                    {"value": price * 10, "currency": "CAD", "period": "年"},
+                ],
+            }],
+        }],
+        "publish_date": date,
+        "source_url": url,
+    }
+
+
+class TestPriceHistory(unittest.TestCase):
+    """价格历史存储测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.history = PriceHistory(os.path.join(self.tmp_dir.name, "history.db"))
+
+    def tearDown(self):
+        self.history.close()
+        self.tmp_dir.cleanup()
+
+    def test_fingerprint_ignores_price(self):
+        """同一套餐调价后指纹不变，不同周期指纹不同"""
+        plan_a = _make_result(12.9, "2026-01-01", "a")["products"][0]
+        plan_b = _make_result(9.9, "2026-02-01", "b")["products"][0]
+        self.assertEqual(
+            plan_fingerprint(plan_a, plan_a["plans"][0], "月"),
+            plan_fingerprint(plan_b, plan_b["plans"][0], "月"),
+        )
+        self.assertNotEqual(
+            plan_fingerprint(plan_a, plan_a["plans"][0], "月"),
+            plan_fingerprint(plan_a, plan_a["plans"][0], "年"),
+        )
+
+    def test_record_and_query_range(self):
+        """追加记录去重，并支持按商家与日期范围查询"""
+        results = [
+            _make_result(12.9, "2026-01-01", "https://example.com/1.html"),
+            _make_result(9.9, "2026-02-01", "https://example.com/2.html"),
+        ]
+        self.assertEqual(self.history.record_results(results), 4)
+        # 重复导入不产生新数据点
+        self.assertEqual(self.history.record_results(results), 0)
+
+        points = self.history.query(vendor="wepc")
+        self.assertEqual(len(points), 4)
+
+        points = self.history.query(vendor="WePC", since="2026-01-15")
+        self.assertEqual(len(points), 2)
+        self.assertEqual(sorted(p["price"] for p in points), [9.9, 99.0])
+
+
+class TestContentArchive(unittest.TestCase):
+    """内容寻址归档测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.tmp_dir.name, "data")
+        self.archive = ContentArchive(os.path.join(self.data_dir, "old"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, rel_path: str, content: str) -> None:
+        path = os.path.join(self.data_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_dedup_restore_and_diff(self):
+        """未变化文件不产生新对象，清单可恢复与对比"""
+        self._write("raw/1.json", '{"a": 1}')
+        self._write("raw/2.json", '{"b": 2}')
+        first = self.archive.archive_dirs(self.data_dir, ["raw"], run_id="run1")
+        self.assertEqual(first["new_objects"], 2)
+        self.assertFalse(os.listdir(os.path.join(self.data_dir, "raw")))
+
+        self._write("raw/1.json", '{"a": 1}')
+        self._write("raw/3.json", '{"c": 3}')
+        second = self.archive.archive_dirs(self.data_dir, ["raw"], run_id="run2")
+        self.assertEqual(second["new_objects"], 1)
+
+        self.assertEqual(self.archive.list_runs(), ["run1", "run2"])
+        self.assertEqual(self.archive.read_file("run1", "raw/2.json"), b'{"b": 2}')
+        diff = self.archive.diff_runs("run1", "run2")
+        self.assertEqual(diff["added"], ["raw/3.json"])
+        self.assertEqual(diff["removed"], ["raw/2.json"])
+        self.assertEqual(diff["changed"], [])
+
+        restore_dir = os.path.join(self.tmp_dir.name, "restore")
+        self.assertEqual(self.archive.restore_run("run2", restore_dir), 2)
+        self.assertTrue(os.path.exists(os.path.join(restore_dir, "raw", "3.json")))
+
+    def test_keep_dirs_snapshot_only(self):
+        """keep_dirs 中的目录只做快照，源文件保留"""
+        self._write("raw/1.json", '{"a": 1}')
+        self._write("html/1.html.zst", "page")
+        manifest = self.archive.archive_dirs(self.data_dir, ["raw", "html"], run_id="run1", keep_dirs=["html"])
+        self.assertIn("html/1.html.zst", manifest["files"])
+        self.assertFalse(os.listdir(os.path.join(self.data_dir, "raw")))
+        self.assertEqual(os.listdir(os.path.join(self.data_dir, "html")), ["1.html.zst"])
+
+    def test_extra_files_snapshot_dictionary(self):
+        """页面字典随快照归档且不删除，之后替换字典不影响快照中的版本"""
+        self._write("html/1.html.zst", "page")
+        self._write("html.zdict", "dict-v1")
+        dict_path = os.path.join(self.data_dir, "html.zdict")
+        manifest = self.archive.archive_dirs(
+            self.data_dir, ["html"], run_id="run1", keep_dirs=["html"],
+            extra_files={"html.zdict": dict_path, "missing.zdict": dict_path + ".missing"}
+        )
+        self.assertIn("html.zdict", manifest["files"])
+        self.assertNotIn("missing.zdict", manifest["files"])
+        self.assertTrue(os.path.exists(dict_path))
+
+        self._write("html.zdict", "dict-v2")
+        restore_dir = os.path.join(self.tmp_dir.name, "restore")
+        self.archive.restore_run("run1", restore_dir)
+        with open(os.path.join(restore_dir, "html.zdict"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "dict-v1")
+
+    def test_run_id_never_overwrites_manifest(self):
+        """同一秒内的默认运行 ID 追加序号，指定的运行 ID 已存在时拒绝覆盖"""
+        fixed = datetime(2026, 1, 1, 12, 0, 0)
+        with mock.patch("src.storage.archive.datetime") as fake_datetime:
+            fake_datetime.now.return_value = fixed
+            for i in range(3):
+                self._write(f"raw/{i}.json", str(i))
+                self.archive.archive_dirs(self.data_dir, ["raw"])
+        runs = self.archive.list_runs()
+        self.assertEqual(runs, ["20260101_120000", "20260101_120000_2", "20260101_120000_3"])
+        self.assertEqual(self.archive.load_manifest(runs[0])["files"], {"raw/0.json": mock.ANY})
+        self.assertEqual(self.archive.load_manifest(runs[2])["run_id"], runs[2])
+
+        self._write("raw/9.json", "9")
+        with self.assertRaises(FileExistsError):
+            self.archive.archive_dirs(self.data_dir, ["raw"], run_id=runs[0])
+        self.assertTrue(os.path.exists(os.path.join(self.data_dir, "raw", "9.json")))
+        self.assertEqual(list(self.archive.load_manifest(runs[0])["files"]), ["raw/0.json"])
+        self.assertEqual(sorted(os.listdir(self.archive.manifests_dir)), [f"{run}.json" for run in runs])
+
+
+class TestBatchFileWriter(unittest.TestCase):
+    """批量原子写入器测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.writer = BatchFileWriter(batch_size=8, flush_interval=0.05)
+
+    def tearDown(self):
+        self.writer.close()
+        self.tmp_dir.cleanup()
+
+    def test_batch_write_and_skip_identical(self):
+        """批量写入落盘、同路径后写覆盖先写、相同内容不重写"""
+        paths = [os.path.join(self.tmp_dir.name, "raw", f"{i}.json") for i in range(20)]
+        for path in paths:
+            self.writer.submit(path, b"old")
+            self.writer.submit(path, b"new")
+        self.writer.flush()
+
+        for path in paths:
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"new")
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(os.path.dirname(paths[0]))))
+
+        mtime = os.stat(paths[0]).st_mtime_ns
+        self.writer.submit(paths[0], b"new")
+        self.writer.flush()
+        self.assertEqual(os.stat(paths[0]).st_mtime_ns, mtime)
+
+    def test_failed_file_does_not_block_batch(self):
+        """同批中某个文件替换失败时，其余文件照常写入，不留下临时文件，失败通过 Future 与 flush() 报告"""
+        blocked = os.path.join(self.tmp_dir.name, "blocked.json")
+        os.makedirs(os.path.join(blocked, "child"))
+        ok = os.path.join(self.tmp_dir.name, "ok.json")
+        blocked_future = self.writer.submit(blocked, b"x")
+        ok_future = self.writer.submit(ok, b"y")
+        self.assertEqual(self.writer.flush(), [blocked])
+
+        with open(ok, "rb") as f:
+            self.assertEqual(f.read(), b"y")
+        self.assertEqual(ok_future.result(), ok)
+        self.assertIsInstance(blocked_future.exception(), OSError)
+        self.assertTrue(os.path.isdir(blocked))
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(self.tmp_dir.name)))
+
+        # 该路径再次写入成功后不再报告为失败
+        shutil.rmtree(blocked)
+        self.writer.submit(blocked, b"x")
+        self.assertEqual(self.writer.flush(), [])
+
+
+class TestPageStore(unittest.TestCase):
+    """压缩页面存储测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = PageStore(
+            os.path.join(self.tmp_dir.name, "html"),
+            os.path.join(self.tmp_dir.name, "html.zdict"),
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _page(self, i: int) -> str:
+        return (
+            "<html><head><title>狗汪 VPS 测评</title></head><body>"
+            + "<nav>首页 | 测评 | 优惠</nav>" * 20
+            + f"<article><h1>文章 {i}</h1><p>{'内容' * (i + 10)}</p></article>"
+            + "<footer>版权所有 狗汪 VPS 测评网</footer>" * 20
+            + "</body></html>"
+        )
+
+    def test_roundtrip_before_and_after_dictionary(self):
+        """字典训练前后写入的页面都能正确读取"""
+        for i in range(40):
+            self.store.put(str(i), self._page(i))
+        flush_writes()
+        self.assertEqual(len(self.store.page_ids()), 40)
+
+        self.assertTrue(self.store.train_dictionary(min_samples=16, dict_size=4096))
+        self.store.put("100", self._page(100))
+        flush_writes()
+
+        self.assertEqual(self.store.get("3"), self._page(3))
+        self.assertEqual(self.store.get("100"), self._page(100))
+        page = self.store.open("100")
+        self.assertLess(len(page.raw()), len(self._page(100).encode("utf-8")))
+        self.assertIsNone(self.store.get("missing"))
+
+
+class TestBackfillCheckpoint(unittest.TestCase):
+    """全站回填断点测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "backfill.json")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_resume_skips_done_ids(self):
+        """已完成 ID 合并为区间保存，重新加载后只产出未完成的 ID"""
+        checkpoint = BackfillCheckpoint(self.path)
+        checkpoint.set_range(1, 10)
+        for article_id in (10, 9, 8, 6, 5, 1):
+            checkpoint.mark_done(article_id, stored=article_id % 2 == 0)
+        checkpoint.save()
+
+        resumed = BackfillCheckpoint(self.path)
+        self.assertEqual(resumed.to_dict()["done"], [[1, 1], [5, 6], [8, 10]])
+        self.assertEqual((resumed.stored, resumed.missing), (3, 3))
+        self.assertEqual(list(resumed.iter_pending(1, 10)), [7, 4, 3, 2])
+        self.assertEqual(list(resumed.iter_pending(4, 12)), [12, 11, 7, 4])
+        self.assertEqual(resumed.done_count(), 6)
+
+
+class TestRunJournal(unittest.TestCase):
+    """Pipeline 运行日志测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.runs_dir = os.path.join(self.tmp_dir.name, "runs")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_replay_pending_after_crash(self):
+        """回放后只剩未保存的文章，截断的最后一行被忽略"""
+        saved_path = os.path.join(self.tmp_dir.name, "1.json")
+        with open(saved_path, "w", encoding="utf-8") as f:
+            f.write('{"vendor": "WePC"}')
+
+        articles = [{"title": f"文章 {i}", "link": f"https://example.com/{i}.html"} for i in range(3)]
+        with RunJournal("run1", self.runs_dir) as journal:
+            journal.start({"days": 3})
+            journal.discovered(articles)
+            journal.record(articles[0]["link"], "fetched")
+            journal.record(articles[1]["link"], "fetched")
+            journal.record(articles[1]["link"], "saved", file=saved_path)
+            journal.record(articles[0]["link"], "failed", error="quota")
+        with open(os.path.join(self.runs_dir, "run1.jsonl"), "a", encoding="utf-8") as f:
+            f.write('{"ts": 1, "stage": "sav')
+
+        with RunJournal("run1", self.runs_dir) as resumed:
+            self.assertEqual(resumed.params, {"days": 3})
+            self.assertEqual(resumed.stage_of(articles[0]["link"]), "fetched")
+            self.assertEqual(
+                [a["link"] for a in resumed.pending_articles()],
+                [articles[0]["link"], articles[2]["link"]],
+            )
+            self.assertEqual(resumed.saved_results(), [{"vendor": "WePC"}])
+            self.assertFalse(resumed.finished)
+
+
+class TestPlanIndex(unittest.TestCase):
+    """套餐查询索引测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.raw_dir = os.path.join(self.tmp_dir.name, "raw")
+        os.makedirs(self.raw_dir)
+        results = [_make_result(5, "2026-01-01", "https://example.com/1.html"), _make_result(10, "2026-01-02", "https://example.com/2.html")]
+        results[1]["products"][0]["vendor"] = "RackNerd"
+        results[1]["products"][0]["location"] = "美国洛杉矶"
+        results[1]["products"][0]["plans"][0]["memory"] = {"value": 2, "unit": "GB"}
+        for i, result in enumerate(results, 1):
+            with open(os.path.join(self.raw_dir, f"{i}.json"), "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+        country_dict = {"Canada": ["加拿大"], "United States": ["美国", "Los Angeles"]}
+        self.index = PlanIndex(self.raw_dir, country_dict=country_dict)
+        self.index.load()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_filters_and_pagination(self):
+        """筛选规则与看板一致：年价取最低的可折算周期，内存折算为 GB"""
+        self.assertEqual(self.index.query()["total"], 2)
+        self.assertEqual(self.index.query(region="Canada")["items"][0]["vendor"], "WePC")
+        self.assertEqual(self.index.query(min_ram=1)["items"][0]["vendor"], "RackNerd")
+        self.assertEqual(self.index.query(max_price=50)["items"][0]["yearly_price"], 50)
+        self.assertEqual(self.index.query(vendor="WePC", min_ram=1)["total"], 0)
+
+        page = self.index.query(sort="date", page=2, page_size=1)
+        self.assertEqual((page["total"], len(page["items"])), (2, 1))
+        self.assertEqual(page["items"][0]["source_url"], "https://example.com/1.html")
+        with self.assertRaises(ValueError):
+            self.index.query(sort="unknown")
+
+    def test_etag_changes_with_data(self):
+        """ETag 随查询参数与数据版本变化"""
+        status, body, etag = self.index.handle("/api/plans?region=Canada")
+        self.assertEqual((status, body["total"]), (200, 1))
+        self.assertEqual(self.index.handle("/api/plans?region=Canada")[2], etag)
+        self.assertNotEqual(self.index.handle("/api/plans?region=Japan")[2], etag)
+        self.assertEqual(self.index.handle("/api/plans?min_ram=abc")[0], 400)
+        self.assertEqual(self.index.handle("/api/unknown")[0], 404)
+
+        with open(os.path.join(self.raw_dir, "3.json"), "w", encoding="utf-8") as f:
+            json.dump(_make_result(7, "2026-01-03", "https://example.com/3.html"), f)
+        self.assertTrue(self.index.reload_if_changed(min_interval=0))
+        status, body, new_etag = self.index.handle("/api/plans?region=Canada")
+        self.assertEqual(body["total"], 2)
+        self.assertNotEqual(new_etag, etag)
+
+
+class TestSearchIndex(unittest.TestCase):
+    """全文检索索引测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.index = SearchIndex(os.path.join(self.tmp_dir.name, "search.db"))
+
+    def tearDown(self):
+        self.index.close()
+        self.tmp_dir.cleanup()
+
+    def test_cjk_search_ranking_and_incremental(self):
+        """中文按子串匹配，标题命中排在正文命中之前，内容未变化时跳过"""
+        first = _make_result(5, "2026-01-01", "https://example.com/1.html")
+        first["article_title"] = "WePC 加拿大 VPS 促销"
+        first["products"][0]["features"] = ["CN2 GIA 线路"]
+        second = _make_result(10, "2026-01-02", "https://example.com/2.html")
+        second["article_title"] = "RackNerd 年付促销"
+        self.assertTrue(self.index.add("1", first, "适合建站"))
+        self.assertTrue(self.index.add("2", second, "机房位于加拿大多伦多，适合建站"))
+        self.assertFalse(self.index.add("1", first, "适合建站"))
+
+        self.assertEqual([r["doc_id"] for r in self.index.search("加拿大")], ["1", "2"])
+        self.assertEqual([r["doc_id"] for r in self.index.search("cn2 gia")], ["1"])
+        self.assertEqual([r["doc_id"] for r in self.index.search("多伦多 建站")], ["2"])
+        self.assertEqual(self.index.search("大阪"), [])
+        self.assertEqual(self.index.search("，"), [])
+
+        # 未提供正文时只更新标题与提取字段，保留已索引的正文
+        second["products"][0]["features"] = ["大阪机房"]
+        self.assertTrue(self.index.add("2", second))
+        self.assertFalse(self.index.add("2", second))
+        self.assertEqual([r["doc_id"] for r in self.index.search("大阪")], ["2"])
+        self.assertEqual([r["doc_id"] for r in self.index.search("多伦多")], ["2"])
+        self.assertTrue(self.index.add("2", second, "机房位于日本大阪"))
+        self.assertEqual(self.index.search("多伦多"), [])
+        self.assertEqual(len(self.index), 2)
+
+        export_path = os.path.join(self.tmp_dir.name, "search_index.json")
+        self.assertEqual(self.index.export(export_path), 2)
+        with open(export_path, "r", encoding="utf-8") as f:
+            exported = json.load(f)
+        self.assertIn("加拿", exported["postings"])
+        self.assertFalse(os.path.exists(f"{export_path}.tmp"))
+
+    def test_rebuild_keeps_body_of_missing_pages(self):
+        """重建索引时页面已不在存储中的文章保留原有正文"""
+        raw_dir = os.path.join(self.tmp_dir.name, "raw")
+        os.makedirs(raw_dir)
+        for doc_id in ("1", "2"):
+            with open(os.path.join(raw_dir, f"{doc_id}.json"), "w", encoding="utf-8") as f:
+                json.dump(_make_result(5, "2026-01-01", f"https://example.com/{doc_id}.html"), f)
+        bodies = {"1": "机房位于多伦多", "2": "机房位于大阪"}
+        self.assertEqual(self.index.import_raw_dir(raw_dir, text_loader=bodies.get), 2)
+
+        del bodies["2"]
+        self.assertEqual(self.index.import_raw_dir(raw_dir, text_loader=bodies.get), 0)
+        self.assertEqual([r["doc_id"] for r in self.index.search("大阪")], ["2"])
+
+
+class TestResultSink(unittest.TestCase):
+    """提取结果汇集测试"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, "history.db")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _results(self, count: int) -> list:
+        return [_make_result(10 + i, "2026-01-%02d" % (i + 1), f"https://example.com/{i}.html") for i in range(count)]
+
+    def test_collect_keeps_results(self):
+        """收集模式保留结果、调用回调，不写入价格历史"""
+        seen = []
+        sink = ResultSink(on_result=seen.append, history_db=self.db_path)
+        for result in self._results(3):
+            sink.add(result)
+        self.assertEqual(sink.close(), 0)
+        self.assertEqual((sink.count, len(sink.results), len(seen)), (3, 3, 3))
+        self.assertFalse(os.path.exists(self.db_path))
+
+    def test_stream_records_history_in_batches(self):
+        """流式模式不保留结果，价格历史按批写入，关闭时写入剩余部分"""
+        seen = []
+        sink = ResultSink(stream=True, on_result=seen.append, batch_size=2, history_db=self.db_path)
+        for result in self._results(3):
+            sink.add(result)
+        self.assertEqual(sink.results, [])
+        self.assertEqual(sink.history_added, 4)
+        # 续跑时之前的结果只补录价格历史（重复的数据点被忽略）
+        sink.record_history(iter(self._results(4)))
+        self.assertEqual(sink.close(), 8)
+        self.assertEqual((sink.count, len(seen)), (3, 3))
+
+        with PriceHistory(self.db_path) as history:
+            self.assertEqual(len(history.query(vendor="WePC")), 8)
+
+
+class TestLazyExports(unittest.TestCase):
+    """src.storage / src.scrapers 按需导出：首次访问才导入子模块，未知名称抛出 AttributeError"""
+
+    def test_unknown_attribute(self):
+        import src.storage
+        import src.scrapers
+        with self.assertRaises(AttributeError):
+            src.storage.NoSuchComponent
+        self.assertFalse(hasattr(src.scrapers, "NoSuchScraper"))
+        with self.assertRaises(ImportError):
+            from src.storage import NoSuchComponent  # noqa: F401
+
+    def test_exports_resolve(self):
+        import src.storage
+        for name in src.storage.__all__:
+            value = getattr(src.storage, name)
+            self.assertIs(vars(src.storage)[name], value)
+
+    def test_import_does_not_load_dependencies(self):
+        """导入包与 PlanIndex 不加载 zstandard、requests 与 http.server"""
+        code = (
+            "import sys, src.storage, src.scrapers\n"
+            "from src.storage import PlanIndex\n"
+            "print(sorted(name for name in ('zstandard', 'requests', 'http.server', 'src.storage.page_store') "
+            "if name in sys.modules))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=str(project_root), capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip().splitlines()[-1], "[]")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
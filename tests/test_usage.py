@@ -0,0 +1,224 @@
+"""
+用量统计与预算控制测试：离线运行
+逻辑：按价格表记录调用用量，验证接近上限时切换低价模型、达到上限时拒绝调用；
+按套餐行数预估 max_tokens；
+提取时模拟模型调用（不访问网络、不消耗 API），验证截断重试与补充提取的每次调用前都检查预算
+"""
+import json
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+# 确保项目根目录在 Python 路径中
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from config import AI_CONFIG
+from src.ai_clients import zhipu_client
+from src.ai_clients.usage import UsageTracker, get_usage_tracker
+
+
+def _product(name: str) -> dict:
+    return {
+        "vendor": "A",
+        "product_name": name,
+        "location": "LA",
+        "plans": [{"name": "S", "price": {"amount": 1, "currency": "USD", "period": "月"}}],
+    }
+
+
+class TestUsageTracker(unittest.TestCase):
+    """用量记录与预算控制"""
+
+    def setUp(self):
+        self.budget_config = dict(AI_CONFIG["budget"])
+        AI_CONFIG["budget"].update({"max_tokens": None, "max_cost": None, "soft_limit": 0.8, "throttle_seconds": 0})
+        self.tracker = UsageTracker()
+
+    def tearDown(self):
+        AI_CONFIG["budget"].clear()
+        AI_CONFIG["budget"].update(self.budget_config)
+
+    def test_record_cost_and_article_totals(self):
+        with self.tracker.article("42"):
+            call = self.tracker.record("zhipu", "glm-4.7", 1_000_000, 500_000, reserved=600_000, cached=250_000)
+        self.tracker.record("zhipu", "glm-4.7", 1000, 0)
+
+        # 缓存命中部分按 cached_input 计价：0.75M × 4 + 0.25M × 0.8 + 0.5M × 16
+        self.assertAlmostEqual(call["cost"], 3.0 + 0.2 + 8.0)
+        article = self.tracker.article_usage("42")
+        self.assertEqual(article["calls"], 1)
+        self.assertEqual(article["cached_tokens"], 250_000)
+        totals = self.tracker.report()["totals"]
+        self.assertEqual(totals["calls"], 2)
+        self.assertEqual(totals["prompt_tokens"], 1_001_000)
+        self.assertEqual(totals["reserved_tokens"], 600_000)
+
+    def test_admit_below_soft_limit(self):
+        self.assertEqual(self.tracker.admit("zhipu", "glm-4.7"), "glm-4.7")
+        self.tracker.set_budget(max_tokens=1000)
+        self.tracker.record("zhipu", "glm-4.7", 500, 200)
+        self.assertEqual(self.tracker.admit("zhipu", "glm-4.7"), "glm-4.7")
+        self.assertEqual(self.tracker.admit("zhipu", "glm-4.7", priority="low"), "glm-4.7")
+
+    def test_downgrade_at_soft_limit(self):
+        self.tracker.set_budget(max_tokens=1000)
+        self.tracker.record("zhipu", "glm-4.7", 600, 200)
+
+        self.assertEqual(self.tracker.admit("zhipu", "glm-4.7"), AI_CONFIG["zhipu"]["fallback_model"])
+        # 低优先级调用在 soft_limit 之后直接放弃
+        self.assertIsNone(self.tracker.admit("zhipu", "glm-4.7", priority="low"))
+
+        # 没有低价模型可切换时限速后仍使用原模型
+        with mock.patch.dict(AI_CONFIG["zhipu"], {"fallback_model": None}):
+            self.assertEqual(self.tracker.admit("zhipu", "glm-4.7"), "glm-4.7")
+
+    def test_exhausted_budget(self):
+        self.tracker.set_budget(max_cost=0.01)
+        self.assertFalse(self.tracker.would_exceed("zhipu", "glm-4.7", 500, 250))
+        # 按最坏情况计：1000 × 4 + 1000 × 16 = 0.02 元，超出上限
+        self.assertTrue(self.tracker.would_exceed("zhipu", "glm-4.7", 1000, 1000))
+
+        self.tracker.record("zhipu", "glm-4.7", 2000, 500)
+        self.assertIsNone(self.tracker.admit("zhipu", "glm-4.7"))
+        self.assertTrue(self.tracker.would_exceed("zhipu", "glm-4.7", 1, 1))
+
+
+class TestChatUsage(unittest.TestCase):
+    """_chat 按响应中的 usage 记录用量，命中前缀缓存的输入 token 按 cached_input 计价"""
+
+    def setUp(self):
+        self.tracker = get_usage_tracker()
+        self.tracker.reset()
+        self.params = {}
+        response = SimpleNamespace(
+            usage=SimpleNamespace(
+                prompt_tokens=1000,
+                completion_tokens=200,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+            ),
+            choices=[SimpleNamespace(message=SimpleNamespace(content="{}"), finish_reason="length")],
+        )
+
+        def create(**params):
+            self.params = params
+            return response
+
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    def tearDown(self):
+        self.tracker.reset()
+
+    def test_cached_tokens_recorded(self):
+        messages = [{"role": "system", "content": zhipu_client.SYSTEM_PROMPT}, {"role": "user", "content": "正文"}]
+        content, truncated = zhipu_client._chat(self.client, "glm-4.7", messages, 1024)
+
+        self.assertEqual((content, truncated), ("{}", True))
+        self.assertIs(self.params["messages"][0]["content"], zhipu_client.SYSTEM_PROMPTS["full"])
+        totals = self.tracker.report()["totals"]
+        self.assertEqual((totals["prompt_tokens"], totals["cached_tokens"], totals["reserved_tokens"]), (1000, 800, 1024))
+        # 200 × 4 + 800 × 0.8 + 200 × 16（元 / 百万 token）
+        self.assertAlmostEqual(totals["cost"], (200 * 4 + 800 * 0.8 + 200 * 16) / 1_000_000)
+        self.assertTrue(any("命中率 80%" in line for line in self.tracker.summary_lines()))
+
+
+class TestOutputBudget(unittest.TestCase):
+    """max_tokens 按价格行数预估：(base + per_row × 行数) × margin，限制在 [min, max_tokens]"""
+
+    def setUp(self):
+        self.budget = AI_CONFIG["zhipu"]["output_budget"]
+
+    def test_scales_with_price_rows(self):
+        rows = ["$10.99/月", "¥99 / 年", "20 USD", "12元/月", "€5/mo"]
+        text = "\n".join(["套餐对比", "1 核 / 1GB"] + rows + ["线路说明：CN2 GIA"])
+        expected = (self.budget["base"] + self.budget["per_row"] * len(rows)) * self.budget["margin"]
+        self.assertEqual(zhipu_client.estimate_output_tokens(text), int(expected))
+
+    def test_minimum_and_ceiling(self):
+        self.assertEqual(zhipu_client.estimate_output_tokens("没有价格的文章"), self.budget["min"])
+        text = "\n".join(["$1/月"] * 1000)
+        self.assertEqual(zhipu_client.estimate_output_tokens(text), AI_CONFIG["zhipu"]["max_tokens"])
+
+    def test_only_input_window_counted(self):
+        # 超出 MAX_INPUT_CHARS 的部分不会送入模型，其中的价格行不计入
+        padding = "x" * zhipu_client.MAX_INPUT_CHARS
+        self.assertEqual(
+            zhipu_client.estimate_output_tokens(padding + "\n" + "\n".join(["$1/月"] * 20)),
+            self.budget["min"],
+        )
+
+    def test_narrative_scales_with_products(self):
+        products = [{"vendor": "A", "product_name": str(i)} for i in range(10)]
+        expected = (self.budget["base"] + self.budget["per_product"] * 10) * self.budget["margin"]
+        self.assertEqual(zhipu_client.estimate_narrative_tokens(products), int(expected))
+
+
+class TestExtractionBudget(unittest.TestCase):
+    """提取过程中每次调用模型前都检查预算（显式指定模型时同样生效）"""
+
+    def setUp(self):
+        self.tracker = get_usage_tracker()
+        self.budget = (self.tracker.max_tokens, self.tracker.max_cost)
+        self.tracker.reset()
+        self.calls = []
+        self.patches = [
+            mock.patch.object(zhipu_client, "_create_client", return_value=object()),
+            mock.patch.object(zhipu_client, "_chat", side_effect=self._fake_chat),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.responses = []
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.tracker.set_budget(*self.budget)
+        self.tracker.reset()
+
+    def _fake_chat(self, client, model, messages, max_tokens, provider="zhipu"):
+        """按预估输入与用满的 max_tokens 记录用量，依次返回预设的输出"""
+        self.calls.append(max_tokens)
+        self.tracker.record(provider, model, zhipu_client.estimate_prompt_tokens(messages), max_tokens)
+        return self.responses.pop(0)
+
+    @staticmethod
+    def _first_call(text: str):
+        """首次调用的预估输入 token 数与 max_tokens"""
+        messages = [
+            {"role": "system", "content": zhipu_client.SYSTEM_PROMPTS["full"]},
+            {"role": "user", "content": f"请从以下 VPS 测评文章中提取结构化信息：\n\n{text}"},
+        ]
+        return zhipu_client.estimate_prompt_tokens(messages), zhipu_client.estimate_output_tokens(text)
+
+    def test_truncation_retries_stop_at_budget(self):
+        text = "测评正文"
+        prompt, first = self._first_call(text)
+        # 预算够前两次调用（max_tokens 与加倍后的重试），第三次（再次加倍）会超出
+        self.tracker.set_budget(max_tokens=3 * (prompt + first))
+        self.responses = [("无法修复的截断输出", True)] * 5
+
+        result = zhipu_client.extract_vps_info(text, model="glm-4.7")
+
+        self.assertIsNone(result)
+        self.assertEqual(self.calls, [first, first * 2])
+        totals = self.tracker.report()["totals"]
+        self.assertLessEqual(totals["prompt_tokens"] + totals["completion_tokens"], self.tracker.max_tokens)
+
+    def test_completion_stops_with_partial_result(self):
+        prompt, first = self._first_call("测评正文")
+        # 补充请求的输入比首次更长、max_tokens 加倍，预算只够首次调用
+        self.tracker.set_budget(max_tokens=2 * prompt + 3 * first - 1)
+        output = json.dumps({"products": [_product("P1"), _product("P2")]}, ensure_ascii=False)
+        self.responses = [(output, True)]
+
+        result = zhipu_client.extract_vps_info("测评正文", model="glm-4.7")
+
+        # 输出被截断且预算不够补充提取：丢弃可能不完整的最后一个产品，返回已有的有效产品
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual([product["product_name"] for product in result["products"]], ["P1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
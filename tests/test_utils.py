@@ -0,0 +1,195 @@
+"""
+工具模块测试：离线运行
+逻辑：验证运行指标的延迟直方图与导出格式、链路追踪的 span 嵌套与 Chrome Trace 导出、
+结构化日志的后台输出与格式，不访问网络、不消耗 API
+"""
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+import sys
+from pathlib import Path
+
+# 确保项目根目录在 Python 路径中
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import MetricsRegistry, LatencyHistogram, Tracer, get_tracer, traced
+from src.utils import get_logger, setup_logging, flush_logs
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """对数-线性分桶：固定内存、分位数相对误差不超过 1/SUB_BUCKETS"""
+
+    def test_small_values_exact(self):
+        histogram = LatencyHistogram()
+        for value_us in (3, 3, 7, 31):
+            histogram.record(value_us / 1_000_000)
+        self.assertEqual(histogram._bucket(31), (0, 31))
+        self.assertEqual(histogram.quantile(0.5), 3 / 1_000_000)
+        self.assertEqual(histogram.quantile(1.0), 31 / 1_000_000)
+        self.assertEqual(histogram.to_dict()["min"], 3 / 1_000_000)
+
+    def test_bucket_boundaries(self):
+        histogram = LatencyHistogram()
+        # 桶宽随量级翻倍：[32, 64) 每桶 2 微秒，[64, 128) 每桶 4 微秒
+        self.assertEqual(histogram._bucket(32), (1, 16))
+        self.assertEqual(histogram._bucket(33), (1, 16))
+        self.assertEqual(histogram._bucket(63), (1, 31))
+        self.assertEqual(histogram._bucket(64), (2, 16))
+        self.assertEqual(histogram._bucket(67), (2, 16))
+        self.assertEqual(histogram._bucket(68), (2, 17))
+
+    def test_quantile_relative_error(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 10001):
+            histogram.record(ms / 1000)
+        for q in (0.5, 0.9, 0.99):
+            expected = q * 10
+            self.assertLess(abs(histogram.quantile(q) - expected) / expected, 1 / LatencyHistogram.SUB_BUCKETS)
+        self.assertEqual(histogram.to_dict()["max"], 10.0)
+        # 一万个不同取值只占用与量级成正比的桶数
+        self.assertLess(len(histogram._buckets), LatencyHistogram.SUB_BUCKETS * 15)
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """计数器、分阶段耗时与 Prometheus 文本导出"""
+
+    def test_report_and_prometheus_text(self):
+        metrics = MetricsRegistry()
+        metrics.incr("http_requests")
+        metrics.incr("http_requests", 2)
+        metrics.observe("fetch", 0.5)
+        metrics.observe("fetch", 1.5)
+
+        report = metrics.report()
+        self.assertEqual(report["counters"], {"http_requests": 3})
+        self.assertEqual(report["stages"]["fetch"]["count"], 2)
+        self.assertAlmostEqual(report["stages"]["fetch"]["total"], 2.0)
+
+        lines = metrics.prometheus_text(prefix="test").splitlines()
+        self.assertIn("# TYPE test_http_requests_total counter", lines)
+        self.assertIn("test_http_requests_total 3", lines)
+        self.assertIn("# TYPE test_stage_seconds summary", lines)
+        self.assertIn('test_stage_seconds_count{stage="fetch"} 2', lines)
+        self.assertIn('test_stage_seconds_sum{stage="fetch"} 2.0', lines)
+        quantiles = [line for line in lines if line.startswith('test_stage_seconds{stage="fetch",quantile=')]
+        self.assertEqual(len(quantiles), 3)
+
+    def test_timer_records_on_exception(self):
+        metrics = MetricsRegistry()
+        with self.assertRaises(RuntimeError):
+            with metrics.timer("parse"):
+                raise RuntimeError("boom")
+        self.assertEqual(metrics.report()["stages"]["parse"]["count"], 1)
+
+
+class TestTracer(unittest.TestCase):
+    """span 嵌套、trace id 与 Chrome Trace 导出"""
+
+    def test_disabled_records_nothing(self):
+        tracer = Tracer()
+        with tracer.trace("1"), tracer.span("fetch"):
+            pass
+        self.assertEqual(tracer.events(), [])
+
+    def test_nested_spans(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.trace("8810"):
+            with tracer.span("article"):
+                with tracer.span("http.get", url="https://example.com/8810.html"):
+                    pass
+                with self.assertRaises(ValueError):
+                    with tracer.span("parse"):
+                        raise ValueError("bad html")
+        with tracer.span("finish"):
+            pass
+
+        events = {event["name"]: event for event in tracer.events()}
+        # 内层先结束先记录，区间落在外层区间之内
+        self.assertEqual([event["name"] for event in tracer.events()], ["http.get", "parse", "article", "finish"])
+        outer, inner = events["article"], events["http.get"]
+        self.assertGreaterEqual(inner["ts"], outer["ts"])
+        self.assertLessEqual(inner["ts"] + inner["dur"], outer["ts"] + outer["dur"] + 0.1)
+        self.assertEqual(inner["args"], {"url": "https://example.com/8810.html", "trace_id": "8810"})
+        self.assertEqual(events["parse"]["args"], {"trace_id": "8810", "error": "ValueError"})
+        self.assertNotIn("trace_id", events["finish"]["args"])
+
+    def test_export_chrome_trace(self):
+        tracer = Tracer()
+        tracer.enable()
+        with tracer.span("fetch"):
+            pass
+        tracer.disable()
+        with tracer.span("ignored"):
+            pass
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "traces", "run.json")
+            self.assertEqual(tracer.export(path), 1)
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+            with open(path, "r", encoding="utf-8") as f:
+                exported = json.load(f)
+        phases = [event["ph"] for event in exported["traceEvents"]]
+        self.assertEqual(phases, ["M", "X"])
+        self.assertEqual(exported["traceEvents"][0]["name"], "thread_name")
+        self.assertEqual(exported["traceEvents"][1]["name"], "fetch")
+
+    def test_traced_decorator(self):
+        tracer = get_tracer()
+        enabled = tracer.enabled
+
+        @traced("work")
+        def work(value):
+            return value * 2
+
+        tracer.enable()
+        try:
+            self.assertEqual(work(21), 42)
+        finally:
+            tracer.enabled = enabled
+        self.assertEqual([event["name"] for event in tracer.events()], ["work"])
+
+
+class TestLogging(unittest.TestCase):
+    """日志经队列由后台线程输出：级别过滤、文本与 JSON Lines 格式"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = get_logger("test")
+
+    def tearDown(self):
+        setup_logging()
+
+    def test_text_format_and_level(self):
+        setup_logging(level="WARNING", stream=self.stream)
+        self.logger.info("📄 不输出")
+        self.logger.warning("⚠️ 页面未存储: %s", "8810")
+        flush_logs()
+        self.assertEqual(self.stream.getvalue(), "⚠️ 页面未存储: 8810\n")
+
+    def test_json_lines_from_worker_thread(self):
+        setup_logging(log_format="json", stream=self.stream)
+        worker = threading.Thread(
+            target=lambda: self.logger.info("✅ 已保存 %s", "8810.json", extra={"article_id": "8810"}),
+            name="extract-0",
+        )
+        worker.start()
+        worker.join()
+        flush_logs()
+
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        entry = json.loads(lines[0])
+        self.assertEqual(entry["msg"], "✅ 已保存 8810.json")
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "vps_scraper.test")
+        self.assertEqual(entry["thread"], "extract-0")
+        self.assertEqual(entry["article_id"], "8810")
+
+
+if __name__ == "__main__":
+    unittest.main()